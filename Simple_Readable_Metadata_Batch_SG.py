@@ -0,0 +1,174 @@
+import os
+import fnmatch
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import torch
+import folder_paths
+from .Simple_Readable_Metadata_MAX_SG import SimpleReadableMetadataMAXSG
+from .Simple_Readable_Metadata_Document_SG import outputs_connected
+from .Simple_Readable_Metadata_Listing_SG import IMAGE_EXTENSIONS
+
+SORT_KEYS = {
+    "name": lambda entry: entry[0].lower(),
+    "date_modified": lambda entry: entry[1].st_mtime_ns,
+    "file_size": lambda entry: entry[1].st_size,
+}
+# Upper bound on decode threads, PIL releases the GIL while decoding so this scales with cores
+MAX_WORKERS = 32
+
+_thread_state = threading.local()
+
+
+def _extractor():
+    """Per-thread MAX node instance (it keeps per-image state on self while formatting)"""
+    node = getattr(_thread_state, "node", None)
+    if node is None:
+        node = _thread_state.node = SimpleReadableMetadataMAXSG()
+    return node
+
+
+def resolve_directory(directory):
+    """Empty means the ComfyUI input folder, relative paths are taken from it"""
+    input_dir = folder_paths.get_input_directory()
+    if not directory or not directory.strip():
+        return input_dir
+    return os.path.join(input_dir, os.path.expanduser(directory.strip()))
+
+
+def list_images(directory, pattern="*", sort_by="name", reverse=False, limit=0):
+    """(path, stat) for image files in directory matching pattern, sorted and limited"""
+    entries = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            name = entry.name
+            if not name.lower().endswith(IMAGE_EXTENSIONS) or not fnmatch.fnmatch(name, pattern or "*"):
+                continue
+            if entry.is_file():
+                entries.append((entry.path, entry.stat()))
+    entries.sort(key=SORT_KEYS.get(sort_by, SORT_KEYS["name"]), reverse=reverse)
+    if limit > 0:
+        entries = entries[:limit]
+    return entries
+
+
+class SimpleReadableMetadataBatchSG:
+    """Load and analyze every image of a folder in parallel, with per-image metadata as list outputs"""
+
+    CATEGORY = "image/analysis"
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "directory": ("STRING", {"default": "", "tooltip": "Folder to load, empty = ComfyUI input folder, relative paths start there"}),
+                "pattern": ("STRING", {"default": "*", "tooltip": "Filename glob, e.g. *.png or ComfyUI_*"}),
+                "sort_by": (list(SORT_KEYS),),
+                "reverse": ("BOOLEAN", {"default": False}),
+                "limit": ("INT", {"default": 0, "min": 0, "max": 100000, "tooltip": "0 = all files"}),
+                "workers": ("INT", {"default": 0, "min": 0, "max": MAX_WORKERS, "tooltip": "Decode threads, 0 = one per CPU core"}),
+                "emoji_in_readable_text": ("BOOLEAN", {"default": True}),
+            },
+            "hidden": {
+                "prompt": "PROMPT",
+                "unique_id": "UNIQUE_ID",
+            },
+        }
+
+    RETURN_TYPES = ("IMAGE", "MASK", "STRING", "STRING", "STRING", "INT", "STRING", "STRING", "INT")
+    RETURN_NAMES = ("images", "masks", "Simple_Readable_Metadata", "Positive_Prompt", "Negative_Prompt", "seed", "model", "file_name_text", "count")
+    OUTPUT_IS_LIST = (True, True, True, True, True, True, True, True, False)
+    OUTPUT_TOOLTIPS = (
+        "One image batch per distinct image size",
+        "Masks, batched like images",
+        "Readable metadata text, one per file",
+        "Positive prompt, one per file",
+        "Negative prompt, one per file",
+        "Seed, one per file (0 if unknown)",
+        "Model name, one per file",
+        "File name without extension, one per file",
+        "Number of files analyzed",
+    )
+    FUNCTION = "load_batch"
+
+    # Positions of the image and mask outputs in RETURN_TYPES
+    PIXEL_OUTPUTS = (0, 1)
+
+    @classmethod
+    def IS_CHANGED(cls, directory, pattern, sort_by, reverse, limit, workers, emoji_in_readable_text, prompt=None, unique_id=None):
+        # Listing signature: any added, removed or rewritten file re-runs the node
+        h = hashlib.blake2b(digest_size=16)
+        try:
+            for path, st in list_images(resolve_directory(directory), pattern, sort_by, reverse, limit):
+                h.update(f"{path}\0{st.st_size}\0{st.st_mtime_ns}\n".encode("utf-8", errors="surrogateescape"))
+        except OSError as e:
+            return str(e)
+        # Not keyed on the connected outputs: ComfyUI passes an empty PROMPT here, the decode is decided at execution
+        return h.hexdigest()
+
+    @classmethod
+    def VALIDATE_INPUTS(cls, directory):
+        if not os.path.isdir(resolve_directory(directory)):
+            return "Directory not found: {}".format(directory)
+        return True
+
+    def analyze_file(self, image_path, emoji_in_readable_text, decode):
+        """Run the MAX node pipeline on one file, returns its outputs plus the model name, or None on failure"""
+        try:
+            result, model_name = _extractor().analyze(image_path, "off", emoji_in_readable_text, "always" if decode else "never")
+            return result["result"], model_name
+        except Exception as e:
+            print(f"Error analyzing {image_path}: {e}")
+            return None
+
+    def load_batch(self, directory, pattern="*", sort_by="name", reverse=False, limit=0, workers=0,
+                   emoji_in_readable_text=True, prompt=None, unique_id=None):
+        """Analyze all matching images with a bounded thread pool, keeping the listing order"""
+        files = [path for path, _ in list_images(resolve_directory(directory), pattern, sort_by, reverse, limit)]
+        decode = outputs_connected(prompt, unique_id, self.PIXEL_OUTPUTS)
+
+        workers = workers or (os.cpu_count() or 1)
+        workers = max(1, min(workers, MAX_WORKERS, len(files) or 1))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="srm-batch") as pool:
+            analyzed = list(pool.map(lambda path: self.analyze_file(path, emoji_in_readable_text, decode), files))
+
+        texts, positives, negatives, seeds, models, names = [], [], [], [], [], []
+        # Stack same-sized images into one batch each, in order of first appearance
+        groups = {}
+        for item in analyzed:
+            if item is None:
+                continue
+            result, model_name = item
+            image_tensor, mask = result[1], result[2]
+            if decode:
+                images, masks = groups.setdefault(tuple(image_tensor.shape[1:3]), ([], []))
+                images.append(image_tensor)
+                masks.append(mask.unsqueeze(0))
+            texts.append(result[0])
+            positives.append(result[9])
+            negatives.append(result[10])
+            seeds.append(result[11])
+            models.append(model_name)
+            names.append(result[16])
+
+        if groups:
+            image_batches = [torch.cat(images, dim=0) for images, _ in groups.values()]
+            mask_batches = [torch.cat(masks, dim=0) for _, masks in groups.values()]
+        else:
+            # Nothing reads the images (or nothing loaded): cheap placeholders
+            image_batches = [torch.zeros((1, 64, 64, 3), dtype=torch.float32, device="cpu")]
+            mask_batches = [torch.zeros((1, 64, 64), dtype=torch.float32, device="cpu")]
+
+        return (image_batches, mask_batches, texts, positives, negatives, seeds, models, names, len(texts))
+
+
+# Node registration
+NODE_CLASS_MAPPINGS = {
+    "SimpleReadableMetadataBatchSG": SimpleReadableMetadataBatchSG
+}
+
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "SimpleReadableMetadataBatchSG": "Simple Readable Metadata Batch-SG"
+}
+
+__all__ = ["NODE_CLASS_MAPPINGS", "NODE_DISPLAY_NAME_MAPPINGS"]
@@ -0,0 +1,247 @@
+import os
+import sys
+import json
+import time
+import atexit
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Content fingerprints for IS_CHANGED.
+# A file is only re-hashed when its (size, mtime_ns, inode) stat tuple changes; digests are kept
+# in a small JSON file so a ComfyUI restart doesn't rehash the whole input folder. New digests are
+# written at most every SAVE_INTERVAL_SECONDS and at exit, not once per hashed file.
+
+HASH_CHUNK_SIZE = 1024 * 1024
+# Memory budget of the in-process node result cache (readable text, params and decoded tensors),
+# in MB from the SRM_RESULT_CACHE_MB environment variable; 0 turns the cache off
+RESULT_CACHE_ENV = "SRM_RESULT_CACHE_MB"
+RESULT_CACHE_DEFAULT_MB = 64
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "srm_fingerprint_cache.json")
+SAVE_INTERVAL_SECONDS = 10.0
+
+
+def hash_file(path, chunk_size=HASH_CHUNK_SIZE):
+    """Stream the file through blake2b in fixed-size chunks"""
+    h = hashlib.blake2b(digest_size=32)
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def stat_key(st):
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+class FingerprintCache:
+    """Persistent path -> content digest cache, validated by stat tuple"""
+
+    def __init__(self, cache_path=DEFAULT_CACHE_PATH):
+        self.cache_path = cache_path
+        self._entries = None
+        self._dirty = False
+        self._last_save = 0.0
+        self._lock = threading.Lock()
+        # Serializes writers of the JSON file, so a slow write doesn't hold up lookups
+        self._save_lock = threading.Lock()
+
+    def _load(self):
+        """Entries of the JSON file, minus those whose file no longer exists"""
+        entries = {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                for path, (size, mtime_ns, ino, digest) in json.load(f).items():
+                    if os.path.exists(path):
+                        entries[path] = ((size, mtime_ns, ino), digest)
+                    else:
+                        self._dirty = True
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Ignoring unreadable fingerprint cache {self.cache_path}: {e}")
+        return entries
+
+    def flush(self):
+        """Write the entries to the JSON file if any changed since the last write"""
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty or self._entries is None:
+                    return
+                data = {path: [*key, digest] for path, (key, digest) in self._entries.items()}
+                self._dirty = False
+                self._last_save = time.monotonic()
+            tmp_path = f"{self.cache_path}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.cache_path)
+            except OSError as e:
+                print(f"Could not write fingerprint cache {self.cache_path}: {e}")
+
+    def lookup(self, path):
+        """Content digest of path if it is cached and the file is unchanged, else None; never hashes"""
+        path = os.path.abspath(path)
+        key = stat_key(os.stat(path))
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+            cached = self._entries.get(path)
+        return cached[1] if cached and cached[0] == key else None
+
+    def fingerprint(self, path):
+        """Return the content digest of path, hashing only if the file changed since last seen"""
+        path = os.path.abspath(path)
+        key = stat_key(os.stat(path))
+
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+            cached = self._entries.get(path)
+            if cached and cached[0] == key:
+                return cached[1]
+
+        digest = hash_file(path)
+
+        with self._lock:
+            self._entries[path] = (key, digest)
+            self._dirty = True
+            due = time.monotonic() - self._last_save >= SAVE_INTERVAL_SECONDS
+        if due:
+            self.flush()
+        return digest
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def _shared_cache():
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                cache = FingerprintCache()
+                # Digests hashed since the last interval write
+                atexit.register(cache.flush)
+                _default_cache = cache
+    return _default_cache
+
+
+def file_fingerprint(path):
+    """Content fingerprint of a file through the shared on-disk cache"""
+    return _shared_cache().fingerprint(path)
+
+
+def known_fingerprint(path):
+    """Fingerprint of a file if the shared cache already has it for the current file, else None"""
+    return _shared_cache().lookup(path)
+
+
+def _result_cache_max_bytes():
+    value = os.environ.get(RESULT_CACHE_ENV, "").strip()
+    try:
+        megabytes = float(value) if value else RESULT_CACHE_DEFAULT_MB
+    except ValueError:
+        print(f"Ignoring invalid {RESULT_CACHE_ENV}={value!r}, using {RESULT_CACHE_DEFAULT_MB}MB")
+        megabytes = RESULT_CACHE_DEFAULT_MB
+    return max(0, int(megabytes * 1024 * 1024))
+
+
+RESULT_CACHE_MAX_BYTES = _result_cache_max_bytes()
+
+
+def copy_tensors(value):
+    """value with every tensor/array in it cloned, so callers can't modify what the cache holds"""
+    if hasattr(value, "clone"):
+        return value.clone()
+    if hasattr(value, "copy") and hasattr(value, "nbytes"):
+        return value.copy()
+    if isinstance(value, dict):
+        return {k: copy_tensors(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(copy_tensors(v) for v in value)
+    return value
+
+
+def estimate_size(value):
+    """Approximate memory held by a node result: tensor/array buffers plus strings and containers"""
+    if hasattr(value, "element_size") and hasattr(value, "nelement"):
+        return value.element_size() * value.nelement()
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """Thread-safe LRU of node results, evicted by total size rather than entry count
+
+    Tensors are copied on the way in and out: downstream nodes may modify IMAGE/MASK in place, and
+    that must not reach the cached entry.
+    """
+
+    def __init__(self, max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[0]
+        return copy_tensors(value)
+
+    def put(self, key, value):
+        """Store value under key; values larger than the whole budget are not cached"""
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return False
+        value = copy_tensors(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Counters for inspection, e.g. from a ComfyUI console"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Shared by the image loader nodes, keys start with the node name
+result_cache = ResultCache()
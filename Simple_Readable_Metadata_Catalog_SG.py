@@ -0,0 +1,383 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import folder_paths
+from PIL import Image
+from .Simple_Readable_Metadata_MAX_SG import SimpleReadableMetadataMAXSG
+from .Simple_Readable_Metadata_VIDEO_SG import SimpleReadableMetadataVideoSG
+from .Simple_Readable_Metadata_Batch_SG import resolve_directory
+from .Simple_Readable_Metadata_Listing_SG import IMAGE_EXTENSIONS, VIDEO_EXTENSIONS
+from .Simple_Readable_Metadata_Reader_SG import read_image_header
+from .Simple_Readable_Metadata_Document_SG import MetadataDocument
+from .Simple_Readable_Metadata_Cache_SG import known_fingerprint
+
+# Persistent metadata catalog: one SQLite row per image/video, extracted with the MAX node's logic.
+# A refresh stats the folder and only re-extracts files whose size or mtime changed,
+# so "what was this generated with" becomes an indexed query instead of a folder scan.
+
+CATALOG_NAME = "srm_catalog.sqlite"
+EXIF_ORIENTATION = 0x0112
+# Rows written per transaction during a refresh, an interrupted refresh keeps what it committed
+COMMIT_EVERY = 500
+MAX_WORKERS = 16
+
+COLUMNS = ("path", "size", "mtime_ns", "fingerprint", "kind", "format", "width", "height", "metadata_format",
+           "model", "seed", "steps", "cfg", "sampler", "scheduler", "loras", "positive", "negative", "indexed_at")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    fingerprint TEXT,
+    kind TEXT,
+    format TEXT,
+    width INTEGER,
+    height INTEGER,
+    metadata_format TEXT,
+    model TEXT,
+    seed INTEGER,
+    steps INTEGER,
+    cfg REAL,
+    sampler TEXT,
+    scheduler TEXT,
+    loras TEXT,
+    positive TEXT,
+    negative TEXT,
+    indexed_at REAL
+);
+CREATE TABLE IF NOT EXISTS loras (
+    path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    strength REAL
+);
+CREATE INDEX IF NOT EXISTS idx_files_model ON files(model);
+CREATE INDEX IF NOT EXISTS idx_files_seed ON files(seed);
+CREATE INDEX IF NOT EXISTS idx_loras_name ON loras(name);
+CREATE INDEX IF NOT EXISTS idx_loras_path ON loras(path);
+"""
+
+
+def default_catalog_path():
+    """srm_catalog.sqlite next to (not inside) the ComfyUI input folder"""
+    input_dir = os.path.abspath(folder_paths.get_input_directory())
+    return os.path.join(os.path.dirname(input_dir), CATALOG_NAME)
+
+
+def _as_int(value):
+    try:
+        return int(float(value))
+    except (ValueError, TypeError):
+        return None
+
+
+def _as_float(value):
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _as_text(value):
+    if value is None or value == 'N/A' or isinstance(value, (list, dict)):
+        return None
+    return str(value)
+
+
+class MetadataCatalog:
+    """SQLite index of the generation metadata of a folder, refreshed incrementally"""
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or default_catalog_path()
+        self._extractor = SimpleReadableMetadataMAXSG()
+        self._video = SimpleReadableMetadataVideoSG()
+        self._lock = threading.Lock()
+
+    def connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    # ================================ EXTRACTION ================================
+
+    def _image_document(self, path):
+        """(document, format, width, height) of an image, header-only where the reader supports the format"""
+        header = read_image_header(path)
+        if header is not None:
+            source = header
+            doc = MetadataDocument.from_image(header)
+            orientation = header.getexif().get(EXIF_ORIENTATION)
+        else:
+            with Image.open(path) as source:
+                doc = MetadataDocument.from_image(source)
+                orientation = source.getexif().get(EXIF_ORIENTATION)
+        width, height = source.size
+        if orientation in (5, 6, 7, 8):
+            width, height = height, width
+        return doc, source.format, width, height
+
+    def _video_document(self, path):
+        """(document, format, width, height) of a video from its container tags"""
+        cap = cv2.VideoCapture(path)
+        try:
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or None
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or None
+        finally:
+            cap.release()
+
+        raw = self._video.extract_raw_video_metadata(path)
+        info = {}
+        if raw:
+            info = {"prompt": raw} if raw.lstrip().startswith("{") else {"parameters": raw}
+        doc = MetadataDocument.from_image(SimpleNamespace(info=info))
+        return doc, os.path.splitext(path)[1].lstrip('.').upper(), width, height
+
+    def _loras(self, doc):
+        """(name, strength) pairs from the prompt graph, or from <lora:...> tags for A1111 text"""
+        loras = []
+        if doc.prompt:
+            graph = doc.prompt_graph
+            for name, strength in self._extractor.extract_loras(graph):
+                if not isinstance(name, str):
+                    name = graph.resolve_value(name)
+                if isinstance(name, str) and name:
+                    loras.append((os.path.basename(name), _as_float(strength)))
+        elif doc.format == "webui":
+            for name, strength in doc.parameters.loras:
+                loras.append((name.strip(), _as_float(strength)))
+        return loras
+
+    def extract_row(self, path, st):
+        """Catalog row for one file, or None if it can't be read"""
+        try:
+            kind = "video" if path.lower().endswith(VIDEO_EXTENSIONS) else "image"
+            if kind == "video":
+                doc, fmt, width, height = self._video_document(path)
+            else:
+                doc, fmt, width, height = self._image_document(path)
+
+            node = self._extractor
+            params = node.extract_generation_params(doc)
+            metadata_format = doc.format if doc else "unknown"
+            positive, negative = node.extract_individual_params(doc, metadata_format) if doc else ("", "")
+            loras = self._loras(doc) if doc else []
+
+            return {
+                "path": path,
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                # Only digests the loader nodes already computed: hashing every file here would read the whole folder
+                "fingerprint": known_fingerprint(path),
+                "kind": kind,
+                "format": fmt,
+                "width": width,
+                "height": height,
+                "metadata_format": metadata_format,
+                "model": _as_text(node.extract_model_name(doc)),
+                "seed": _as_int(params['seed']),
+                "steps": _as_int(params['steps']),
+                "cfg": _as_float(params['cfg']),
+                "sampler": _as_text(params['sampler']),
+                "scheduler": _as_text(params['scheduler']),
+                "loras": json.dumps(loras),
+                "positive": positive or None,
+                "negative": negative or None,
+                "indexed_at": time.time(),
+            }
+        except Exception as e:
+            print(f"Error cataloging {path}: {e}")
+            return None
+
+    # ================================ REFRESH ================================
+
+    def scan(self, directory, recursive=False):
+        """path -> stat for every image/video under directory"""
+        found = {}
+        extensions = IMAGE_EXTENSIONS + VIDEO_EXTENSIONS
+        pending = [directory]
+        while pending:
+            with os.scandir(pending.pop()) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        if recursive:
+                            pending.append(entry.path)
+                    elif entry.name.lower().endswith(extensions) and entry.is_file():
+                        found[os.path.abspath(entry.path)] = entry.stat()
+        return found
+
+    def _write(self, conn, rows):
+        with conn:
+            conn.executemany(f"INSERT OR REPLACE INTO files ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                             [tuple(row[c] for c in COLUMNS) for row in rows])
+            conn.executemany("DELETE FROM loras WHERE path = ?", [(row["path"],) for row in rows])
+            conn.executemany("INSERT INTO loras (path, name, strength) VALUES (?, ?, ?)",
+                             [(row["path"], name, strength) for row in rows for name, strength in json.loads(row["loras"])])
+
+    def refresh(self, directory=None, recursive=False, workers=0):
+        """Bring the catalog in line with directory; returns counts of added/updated/removed/unchanged files"""
+        directory = os.path.abspath(directory or folder_paths.get_input_directory())
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0, "failed": 0}
+
+        with self._lock:
+            conn = self.connect()
+            try:
+                prefix = os.path.join(directory, "")
+                known = {}
+                for path, size, mtime_ns in conn.execute("SELECT path, size, mtime_ns FROM files WHERE substr(path, 1, ?) = ?",
+                                                         (len(prefix), prefix)):
+                    if recursive or os.path.dirname(path) == directory:
+                        known[path] = (size, mtime_ns)
+
+                found = self.scan(directory, recursive)
+                changed = []
+                for path, st in found.items():
+                    old = known.get(path)
+                    if old == (st.st_size, st.st_mtime_ns):
+                        stats["unchanged"] += 1
+                    else:
+                        changed.append((path, st))
+
+                removed = [(path,) for path in known if path not in found]
+                if removed:
+                    with conn:
+                        conn.executemany("DELETE FROM files WHERE path = ?", removed)
+                        conn.executemany("DELETE FROM loras WHERE path = ?", removed)
+                    stats["removed"] = len(removed)
+
+                workers = max(1, min(workers or (os.cpu_count() or 1), MAX_WORKERS))
+                rows = []
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="srm-catalog") as pool:
+                    for (path, _), row in zip(changed, pool.map(lambda item: self.extract_row(*item), changed)):
+                        if row is None:
+                            stats["failed"] += 1
+                            continue
+                        stats["updated" if path in known else "added"] += 1
+                        rows.append(row)
+                        if len(rows) >= COMMIT_EVERY:
+                            self._write(conn, rows)
+                            rows = []
+                if rows:
+                    self._write(conn, rows)
+            finally:
+                conn.close()
+        return stats
+
+    # ================================ QUERIES ================================
+
+    def get(self, path):
+        """Row of one file as a dict, or None if it isn't cataloged"""
+        conn = self.connect()
+        try:
+            row = conn.execute("SELECT * FROM files WHERE path = ?", (os.path.abspath(path),)).fetchone()
+            return dict(row) if row else None
+        finally:
+            conn.close()
+
+    def search(self, model=None, lora=None, prompt=None, seed=None, directory=None, limit=100):
+        """Rows matching every given filter (substring match, case-insensitive), newest first"""
+        clauses, args = [], []
+        if directory:
+            prefix = os.path.join(os.path.abspath(directory), "")
+            clauses.append("substr(files.path, 1, ?) = ?")
+            args.extend([len(prefix), prefix])
+        if model:
+            clauses.append("files.model LIKE ?")
+            args.append(f"%{model}%")
+        if lora:
+            clauses.append("files.path IN (SELECT path FROM loras WHERE name LIKE ?)")
+            args.append(f"%{lora}%")
+        if prompt:
+            clauses.append("(files.positive LIKE ? OR files.negative LIKE ?)")
+            args.extend([f"%{prompt}%", f"%{prompt}%"])
+        if seed is not None:
+            clauses.append("files.seed = ?")
+            args.append(seed)
+
+        query = "SELECT * FROM files"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY mtime_ns DESC"
+        if limit > 0:
+            query += f" LIMIT {int(limit)}"
+
+        conn = self.connect()
+        try:
+            return [dict(row) for row in conn.execute(query, args)]
+        finally:
+            conn.close()
+
+
+_default_catalog = None
+
+
+def metadata_catalog():
+    """Shared catalog at the default location"""
+    global _default_catalog
+    if _default_catalog is None:
+        _default_catalog = MetadataCatalog()
+    return _default_catalog
+
+
+class SimpleReadableMetadataCatalogSG:
+    """Refresh the metadata catalog of a folder and search it by model, LoRA or prompt text"""
+
+    CATEGORY = "image/analysis"
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "directory": ("STRING", {"default": "", "tooltip": "Folder to catalog, empty = ComfyUI input folder, relative paths start there"}),
+                "recursive": ("BOOLEAN", {"default": False}),
+                "model_filter": ("STRING", {"default": ""}),
+                "lora_filter": ("STRING", {"default": ""}),
+                "prompt_filter": ("STRING", {"default": ""}),
+                "limit": ("INT", {"default": 100, "min": 0, "max": 100000, "tooltip": "0 = all matches"}),
+            },
+        }
+
+    RETURN_TYPES = ("STRING", "STRING", "INT")
+    RETURN_NAMES = ("catalog_text", "file_paths", "count")
+    FUNCTION = "refresh_and_search"
+    OUTPUT_NODE = True
+
+    @classmethod
+    def IS_CHANGED(cls, **kwargs):
+        # The refresh itself is the change check (stat only), so always run it
+        return float("nan")
+
+    def refresh_and_search(self, directory, recursive, model_filter, lora_filter, prompt_filter, limit):
+        catalog = metadata_catalog()
+        directory = resolve_directory(directory)
+        stats = catalog.refresh(directory, recursive)
+        rows = catalog.search(model_filter.strip(), lora_filter.strip(), prompt_filter.strip(), directory=directory, limit=limit)
+
+        summary = (f"Catalog: {catalog.db_path}\n"
+                   f"Added {stats['added']} | Updated {stats['updated']} | Removed {stats['removed']} | "
+                   f"Unchanged {stats['unchanged']} | Failed {stats['failed']}\n"
+                   f"Matches: {len(rows)}")
+        lines = [summary, ""]
+        for row in rows:
+            loras = ", ".join(name for name, _ in json.loads(row["loras"] or "[]"))
+            lines.append(f"{os.path.basename(row['path'])} | {row['model'] or 'N/A'} | Seed: {row['seed'] if row['seed'] is not None else 'N/A'}"
+                         + (f" | LoRA: {loras}" if loras else ""))
+        return ("\n".join(lines), "\n".join(row["path"] for row in rows), len(rows))
+
+
+# Node registration
+NODE_CLASS_MAPPINGS = {
+    "SimpleReadableMetadataCatalogSG": SimpleReadableMetadataCatalogSG
+}
+
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "SimpleReadableMetadataCatalogSG": "Simple Readable Metadata Catalog-SG"
+}
+
+__all__ = ["NODE_CLASS_MAPPINGS", "NODE_DISPLAY_NAME_MAPPINGS"]
@@ -0,0 +1,651 @@
+import os
+import struct
+
+# In-process reader for the metadata tags and stream properties of video containers, used instead
+# of spawning ffprobe or decoding the clip. Only header boxes/elements are read; media data (mdat,
+# Clusters) is skipped with seeks.
+#
+#   ISO-BMFF (MP4/MOV/M4V): moov/udta/meta/ilst items (ffmpeg's "comment" is ©cmt), mdta keys
+#                           (moov/meta/keys + ilst) and QuickTime udta text atoms (©cmt, ©des ...);
+#                           mvhd/mdhd durations, stsz sample count, stts frame rate and the stsd sample
+#                           entry (codec, size, pixel format from avcC/hvcC/av1C/vpcC)
+#   Matroska/WebM:          Segment/Tags/Tag/SimpleTag (TagName/TagString), Info (duration) and the
+#                           first video TrackEntry, located via the SeekHead when written after the Clusters
+
+ISO_TOP_LEVEL = (b"ftyp", b"moov", b"mdat", b"free", b"skip", b"wide", b"pnot", b"uuid")
+# Largest single box/element read into memory, a workflow JSON is well below this
+MAX_READ_BYTES = 64 * 1024 * 1024
+MAX_BOXES = 100_000
+
+# iTunes-style item names -> tag names as ffmpeg/ffprobe report them
+ITUNES_TAGS = {
+    b"\xa9cmt": "comment",
+    b"\xa9des": "description",
+    b"desc": "description",
+    b"ldes": "synopsis",
+    b"\xa9nam": "title",
+    b"\xa9too": "encoder",
+    b"\xa9ART": "artist",
+    b"\xa9day": "date",
+}
+# ilst "data" box type indicators for text
+DATA_TYPE_UTF8 = 1
+DATA_TYPE_UTF16 = 2
+
+# Sample entry / CodecID -> codec name as ffprobe reports it
+ISO_CODECS = {
+    b"avc1": "h264", b"avc3": "h264", b"hvc1": "hevc", b"hev1": "hevc", b"av01": "av1",
+    b"vp09": "vp9", b"vp08": "vp8", b"mp4v": "mpeg4", b"mjpa": "mjpeg", b"jpeg": "mjpeg",
+    b"apch": "prores", b"apcn": "prores", b"apcs": "prores", b"apco": "prores", b"ap4h": "prores",
+}
+MKV_CODECS = {
+    "V_MPEG4/ISO/AVC": "h264", "V_MPEGH/ISO/HEVC": "hevc", "V_AV1": "av1", "V_VP9": "vp9", "V_VP8": "vp8",
+    "V_MPEG4/ISO/SP": "mpeg4", "V_MPEG4/ISO/ASP": "mpeg4", "V_MPEG4/ISO/AP": "mpeg4",
+    "V_MJPEG": "mjpeg", "V_PRORES": "prores", "V_UNCOMPRESSED": "rawvideo",
+}
+# Codecs with a single pixel format, for which no configuration record says so
+FIXED_PIX_FMTS = {"mpeg4": "yuv420p", "vp8": "yuv420p"}
+# VisualSampleEntry fields before its child boxes (avcC, hvcC ...)
+VISUAL_SAMPLE_ENTRY_SIZE = 78
+# H.264 profiles whose SPS carries chroma_format_idc and bit depths
+H264_HIGH_PROFILES = (100, 110, 122, 244, 44, 83, 86, 118, 128, 138, 139, 134, 135)
+
+EBML_HEADER = 0x1A45DFA3
+MKV_SEGMENT = 0x18538067
+MKV_SEEK_HEAD = 0x114D9B74
+MKV_SEEK = 0x4DBB
+MKV_SEEK_ID = 0x53AB
+MKV_SEEK_POSITION = 0x53AC
+MKV_CLUSTER = 0x1F43B675
+MKV_TAGS = 0x1254C367
+MKV_TAG = 0x7373
+MKV_TARGETS = 0x63C0
+MKV_TAG_TRACK_UID = 0x63C5
+MKV_SIMPLE_TAG = 0x67C8
+MKV_TAG_NAME = 0x45A3
+MKV_TAG_STRING = 0x4487
+MKV_INFO = 0x1549A966
+MKV_TIMECODE_SCALE = 0x2AD7B1
+MKV_DURATION = 0x4489
+MKV_TRACKS = 0x1654AE6B
+MKV_TRACK_ENTRY = 0xAE
+MKV_TRACK_TYPE = 0x83
+MKV_CODEC_ID = 0x86
+MKV_CODEC_PRIVATE = 0x63A2
+MKV_DEFAULT_DURATION = 0x23E383
+MKV_VIDEO = 0xE0
+MKV_PIXEL_WIDTH = 0xB0
+MKV_PIXEL_HEIGHT = 0xBA
+MKV_COLOUR = 0x55B0
+MKV_BITS_PER_CHANNEL = 0x55B2
+MKV_CHROMA_SUBSAMPLING_HORZ = 0x55B3
+MKV_CHROMA_SUBSAMPLING_VERT = 0x55B4
+MKV_TRACK_TYPE_VIDEO = 1
+
+
+class ContainerInfo:
+    """Tags and video stream properties of a container, None where the headers don't say
+
+    format      : "mp4" or "matroska"
+    tags        : (name, value) pairs of the file-level tags, in file order
+    stream_tags : (name, value) pairs of track-level tags
+    duration    : seconds (container duration, else the video track's)
+    frame_count : frames in the video track (Matroska: from its statistics tags or duration x fps)
+    fps         : nominal frame rate of the video track
+    codec, pix_fmt, width, height : of the first video track, named like ffprobe does
+    bit_rate    : overall bits per second (file size / duration)
+    """
+
+    __slots__ = ("format", "tags", "stream_tags", "duration", "frame_count", "fps",
+                 "codec", "pix_fmt", "width", "height", "bit_rate")
+
+    def __init__(self, format):
+        self.format = format
+        self.tags = []
+        self.stream_tags = []
+        self.duration = None
+        self.frame_count = None
+        self.fps = None
+        self.codec = None
+        self.pix_fmt = None
+        self.width = None
+        self.height = None
+        self.bit_rate = None
+
+
+def _read_range(f, start, end):
+    if end - start > MAX_READ_BYTES:
+        return None
+    f.seek(start)
+    return f.read(end - start)
+
+
+# ==================================== PIXEL FORMAT ========================================
+
+def _pix_fmt(chroma_format, bit_depth):
+    """ffmpeg pix_fmt name for a chroma format (0 = mono, 1 = 4:2:0, 2 = 4:2:2, 3 = 4:4:4) and bit depth"""
+    base = {0: "gray", 1: "yuv420p", 2: "yuv422p", 3: "yuv444p"}.get(chroma_format)
+    if base is None:
+        return None
+    if bit_depth and bit_depth > 8:
+        return f"{base}{bit_depth}le"
+    return base
+
+
+class _BitReader:
+    """MSB-first bit reader with Exp-Golomb codes, for the start of an H.264 SPS"""
+
+    def __init__(self, data):
+        # Drop emulation prevention bytes (00 00 03 -> 00 00)
+        self.data = data.replace(b"\x00\x00\x03", b"\x00\x00")
+        self.pos = 0
+
+    def bit(self):
+        byte = self.data[self.pos >> 3]
+        bit = (byte >> (7 - (self.pos & 7))) & 1
+        self.pos += 1
+        return bit
+
+    def bits(self, n):
+        value = 0
+        for _ in range(n):
+            value = (value << 1) | self.bit()
+        return value
+
+    def ue(self):
+        zeros = 0
+        while self.bit() == 0:
+            zeros += 1
+            if zeros > 31:
+                raise ValueError("Invalid Exp-Golomb code")
+        return (1 << zeros) - 1 + self.bits(zeros)
+
+
+def _avcc_pix_fmt(avcc):
+    """pix_fmt from an avcC record: chroma format and bit depth of its first SPS"""
+    if len(avcc) < 8 or avcc[5] & 0x1F == 0:
+        return None
+    sps_length = struct.unpack_from(">H", avcc, 6)[0]
+    sps = avcc[8:8 + sps_length]
+    if len(sps) < 4:
+        return None
+    profile = sps[1]
+    if profile not in H264_HIGH_PROFILES:
+        return "yuv420p"
+    try:
+        reader = _BitReader(sps[4:])
+        reader.ue()  # seq_parameter_set_id
+        chroma_format = reader.ue()
+        if chroma_format == 3:
+            reader.bit()  # separate_colour_plane_flag
+        return _pix_fmt(chroma_format, reader.ue() + 8)
+    except (IndexError, ValueError):
+        return None
+
+
+def _hvcc_pix_fmt(hvcc):
+    if len(hvcc) < 18:
+        return None
+    return _pix_fmt(hvcc[16] & 0x03, (hvcc[17] & 0x07) + 8)
+
+
+def _av1c_pix_fmt(av1c):
+    if len(av1c) < 3:
+        return None
+    flags = av1c[2]
+    bit_depth = (12 if flags & 0x20 else 10) if flags & 0x40 else 8
+    if flags & 0x10:
+        return _pix_fmt(0, bit_depth)
+    subsampling_x, subsampling_y = flags & 0x08, flags & 0x04
+    return _pix_fmt(1 if subsampling_y else 2 if subsampling_x else 3, bit_depth)
+
+
+def _vpcc_pix_fmt(vpcc):
+    # Full box: version/flags, profile, level, then bitDepth (4 bits) | chromaSubsampling (3) | fullRange (1)
+    if len(vpcc) < 7:
+        return None
+    chroma = (vpcc[6] >> 1) & 0x07
+    return _pix_fmt({0: 1, 1: 1, 2: 2, 3: 3}.get(chroma), vpcc[6] >> 4)
+
+
+# ==================================== ISO-BMFF ========================================
+
+def _boxes(f, start, end):
+    """(type, payload start, box end) of the boxes between start and end, read header by header"""
+    pos = start
+    for _ in range(MAX_BOXES):
+        if pos + 8 > end:
+            return
+        f.seek(pos)
+        header = f.read(16)
+        if len(header) < 8:
+            return
+        size, kind = struct.unpack(">I4s", header[:8])
+        header_size = 8
+        if size == 1:
+            if len(header) < 16:
+                return
+            size = struct.unpack(">Q", header[8:16])[0]
+            header_size = 16
+        elif size == 0:
+            size = end - pos
+        if size < header_size:
+            return
+        yield kind, pos + header_size, min(pos + size, end)
+        pos += size
+
+
+def _buffer_boxes(data):
+    """Same as _boxes for a box payload already in memory"""
+    pos = 0
+    while pos + 8 <= len(data):
+        size, kind = struct.unpack_from(">I4s", data, pos)
+        header_size = 8
+        if size == 1 and pos + 16 <= len(data):
+            size = struct.unpack_from(">Q", data, pos + 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = len(data) - pos
+        if size < header_size:
+            return
+        yield kind, data[pos + header_size:pos + size]
+        pos += size
+
+
+def _item_name(kind):
+    if kind in ITUNES_TAGS:
+        return ITUNES_TAGS[kind]
+    return kind.decode("latin-1").lstrip("\xa9")
+
+
+def _data_text(payload):
+    """Text of an ilst "data" box payload (type indicator, locale, value), None for non-text values"""
+    if len(payload) < 8:
+        return None
+    data_type = struct.unpack_from(">I", payload)[0] & 0xFFFFFF
+    if data_type == DATA_TYPE_UTF8:
+        return payload[8:].decode("utf-8", errors="ignore")
+    if data_type == DATA_TYPE_UTF16:
+        return payload[8:].decode("utf-16-be", errors="ignore")
+    return None
+
+
+def _read_keys(payload):
+    """mdta key names of a "keys" box, index 1 first"""
+    keys = []
+    if len(payload) < 8:
+        return keys
+    count = struct.unpack_from(">I", payload, 4)[0]
+    pos = 8
+    for _ in range(count):
+        if pos + 8 > len(payload):
+            break
+        size = struct.unpack_from(">I", payload, pos)[0]
+        if size < 8:
+            break
+        name = payload[pos + 8:pos + size].decode("utf-8", errors="ignore")
+        # "com.apple.quicktime.comment" -> "comment"; ffmpeg's own keys ("prompt") have no namespace
+        keys.append(name.rsplit(".", 1)[-1] if name.startswith("com.apple.quicktime.") else name)
+        pos += size
+    return keys
+
+
+def _read_meta(f, start, end, tags):
+    # ISO meta is a full box (4 bytes version/flags), QuickTime's isn't: its first child follows directly
+    f.seek(start + 4)
+    if f.read(4) != b"hdlr":
+        start += 4
+
+    keys = []
+    ilst = None
+    for kind, child_start, child_end in _boxes(f, start, end):
+        if kind == b"keys":
+            keys = _read_keys(_read_range(f, child_start, child_end) or b"")
+        elif kind == b"ilst":
+            ilst = (child_start, child_end)
+    if ilst is None:
+        return
+
+    for kind, item_start, item_end in _boxes(f, *ilst):
+        payload = _read_range(f, item_start, item_end)
+        if payload is None:
+            continue
+        name, value = None, None
+        for child, child_payload in _buffer_boxes(payload):
+            if child == b"data" and value is None:
+                value = _data_text(child_payload)
+            elif child == b"name":
+                name = child_payload[4:].decode("utf-8", errors="ignore")
+        if value is None:
+            continue
+        if name is None:
+            index = struct.unpack(">I", kind)[0]
+            if keys and 1 <= index <= len(keys):
+                name = keys[index - 1]
+            else:
+                name = _item_name(kind)
+        tags.append((name, value))
+
+
+def _read_udta(f, start, end, tags):
+    for kind, child_start, child_end in _boxes(f, start, end):
+        if kind == b"meta":
+            _read_meta(f, child_start, child_end, tags)
+        elif kind[:1] == b"\xa9":
+            # QuickTime user data text: (u16 length, u16 language, text), first entry only
+            payload = _read_range(f, child_start, child_end)
+            if not payload or len(payload) < 4:
+                continue
+            length = struct.unpack_from(">H", payload)[0]
+            text = payload[4:4 + length] if 4 + length <= len(payload) else payload
+            tags.append((_item_name(kind), text.decode("utf-8", errors="ignore")))
+
+
+def _header_duration(payload):
+    """(timescale, duration) of an mvhd/mdhd payload"""
+    if payload[:1] == b"\x01":
+        if len(payload) < 32:
+            return None, None
+        return struct.unpack_from(">IQ", payload, 20)
+    if len(payload) < 20:
+        return None, None
+    return struct.unpack_from(">II", payload, 12)
+
+
+def _read_sample_entry(entry_kind, entry, info):
+    """Codec, size and pixel format from a VisualSampleEntry payload"""
+    info.codec = ISO_CODECS.get(entry_kind, entry_kind.decode("latin-1").strip())
+    if len(entry) >= 28:
+        info.width, info.height = struct.unpack_from(">HH", entry, 24)
+    parsers = {b"avcC": _avcc_pix_fmt, b"hvcC": _hvcc_pix_fmt, b"av1C": _av1c_pix_fmt, b"vpcC": _vpcc_pix_fmt}
+    for child, payload in _buffer_boxes(entry[VISUAL_SAMPLE_ENTRY_SIZE:]):
+        if child in parsers:
+            info.pix_fmt = parsers[child](payload)
+            break
+
+
+def _read_video_trak(f, start, end, info):
+    """Stream properties from a trak box; False if it isn't a video track"""
+    mdia = next(((s, e) for kind, s, e in _boxes(f, start, end) if kind == b"mdia"), None)
+    if mdia is None:
+        return False
+    boxes = {kind: (s, e) for kind, s, e in _boxes(f, *mdia)}
+    hdlr = _read_range(f, *boxes[b"hdlr"]) if b"hdlr" in boxes else b""
+    if hdlr[8:12] != b"vide":
+        return False
+
+    timescale, duration = None, None
+    if b"mdhd" in boxes:
+        timescale, duration = _header_duration(_read_range(f, *boxes[b"mdhd"]) or b"")
+    stbl = None
+    if b"minf" in boxes:
+        stbl = next(((s, e) for kind, s, e in _boxes(f, *boxes[b"minf"]) if kind == b"stbl"), None)
+    if stbl is not None:
+        for kind, s, e in _boxes(f, *stbl):
+            if kind == b"stsd":
+                stsd = _read_range(f, s, e) or b""
+                for entry_kind, entry in _buffer_boxes(stsd[8:]):
+                    _read_sample_entry(entry_kind, entry, info)
+                    break
+            elif kind == b"stsz":
+                # Only the header: the per-sample size table can be megabytes
+                f.seek(s)
+                header = f.read(12)
+                if len(header) == 12:
+                    info.frame_count = struct.unpack_from(">I", header, 8)[0]
+            elif kind == b"stts" and timescale:
+                f.seek(s)
+                header = f.read(16)
+                if len(header) == 16:
+                    entries, _, delta = struct.unpack_from(">III", header, 4)
+                    # A single (count, delta) run means a constant frame rate
+                    if entries == 1 and delta:
+                        info.fps = timescale / delta
+
+    if timescale and duration:
+        track_duration = duration / timescale
+        if info.duration is None:
+            info.duration = track_duration
+        if info.fps is None and info.frame_count:
+            info.fps = info.frame_count / track_duration
+    return True
+
+
+def _read_iso(f, file_size):
+    info = ContainerInfo("mp4")
+    for kind, start, end in _boxes(f, 0, file_size):
+        if kind != b"moov":
+            continue
+        video_found = False
+        for child, child_start, child_end in _boxes(f, start, end):
+            if child == b"mvhd":
+                timescale, duration = _header_duration(_read_range(f, child_start, child_end) or b"")
+                if timescale and duration:
+                    info.duration = duration / timescale
+            elif child == b"udta":
+                _read_udta(f, child_start, child_end, info.tags)
+            elif child == b"meta":
+                _read_meta(f, child_start, child_end, info.tags)
+            elif child == b"trak":
+                if not video_found:
+                    video_found = _read_video_trak(f, child_start, child_end, info)
+                for box, box_start, box_end in _boxes(f, child_start, child_end):
+                    if box == b"udta":
+                        _read_udta(f, box_start, box_end, info.stream_tags)
+        break
+    return info
+
+
+# ==================================== MATROSKA ========================================
+
+def _vint(data, pos, keep_marker=False):
+    """(value, next pos, unknown size) of the EBML variable-length integer at pos"""
+    first = data[pos]
+    if first == 0:
+        raise ValueError("Invalid EBML integer")
+    length = 9 - first.bit_length()
+    if pos + length > len(data):
+        raise ValueError("Truncated EBML integer")
+    value = first if keep_marker else first & ((1 << (8 - length)) - 1)
+    for byte in data[pos + 1:pos + length]:
+        value = (value << 8) | byte
+    unknown = not keep_marker and value == (1 << (7 * length)) - 1
+    return value, pos + length, unknown
+
+
+def _element_header(data, pos):
+    """(id, size or None if unknown, data pos) of the element starting at pos"""
+    element_id, pos, _ = _vint(data, pos, keep_marker=True)
+    size, pos, unknown = _vint(data, pos)
+    return element_id, None if unknown else size, pos
+
+
+def _elements(data):
+    """(id, payload) of the elements in an in-memory master element payload"""
+    pos = 0
+    while pos < len(data):
+        element_id, size, pos = _element_header(data, pos)
+        if size is None:
+            size = len(data) - pos
+        yield element_id, data[pos:pos + size]
+        pos += size
+
+
+def _file_element(f, pos):
+    f.seek(pos)
+    header = f.read(12)
+    if not header:
+        return None
+    element_id, size, offset = _element_header(header, 0)
+    return element_id, size, pos + offset
+
+
+def _uint(data):
+    return int.from_bytes(data, "big") if data else 0
+
+
+def _simple_tags(data, tags):
+    """Append (TagName, TagString) of a SimpleTag, then those of its nested SimpleTags"""
+    name, value, nested = None, None, []
+    for element_id, payload in _elements(data):
+        if element_id == MKV_TAG_NAME:
+            name = payload.decode("utf-8", errors="ignore")
+        elif element_id == MKV_TAG_STRING:
+            value = payload.decode("utf-8", errors="ignore")
+        elif element_id == MKV_SIMPLE_TAG:
+            _simple_tags(payload, nested)
+    if name is not None and value is not None:
+        tags.append((name, value))
+    tags.extend(nested)
+
+
+def _read_tags(data, info):
+    for element_id, tag in _elements(data):
+        if element_id != MKV_TAG:
+            continue
+        # Tags targeting a track are stream tags, tags without a target apply to the file
+        tags = info.tags
+        found = []
+        for child_id, payload in _elements(tag):
+            if child_id == MKV_TARGETS:
+                if any(target_id == MKV_TAG_TRACK_UID for target_id, _ in _elements(payload)):
+                    tags = info.stream_tags
+            elif child_id == MKV_SIMPLE_TAG:
+                _simple_tags(payload, found)
+        tags.extend(found)
+
+
+def _float(data):
+    if len(data) == 4:
+        return struct.unpack(">f", data)[0]
+    if len(data) == 8:
+        return struct.unpack(">d", data)[0]
+    return None
+
+
+def _read_info(data, info):
+    scale, duration = 1_000_000, None
+    for element_id, payload in _elements(data):
+        if element_id == MKV_TIMECODE_SCALE:
+            scale = _uint(payload) or scale
+        elif element_id == MKV_DURATION:
+            duration = _float(payload)
+    if duration:
+        info.duration = duration * scale / 1e9
+
+
+def _read_tracks(data, info):
+    for element_id, entry in _elements(data):
+        if element_id != MKV_TRACK_ENTRY:
+            continue
+        fields = dict(_elements(entry))
+        if _uint(fields.get(MKV_TRACK_TYPE, b"")) != MKV_TRACK_TYPE_VIDEO:
+            continue
+        codec_id = fields.get(MKV_CODEC_ID, b"").decode("ascii", errors="ignore").rstrip("\x00")
+        info.codec = MKV_CODECS.get(codec_id, codec_id.lower() or None)
+        default_duration = _uint(fields.get(MKV_DEFAULT_DURATION, b""))
+        if default_duration:
+            info.fps = 1e9 / default_duration
+
+        video = dict(_elements(fields.get(MKV_VIDEO, b"")))
+        info.width = _uint(video.get(MKV_PIXEL_WIDTH, b"")) or None
+        info.height = _uint(video.get(MKV_PIXEL_HEIGHT, b"")) or None
+        colour = dict(_elements(video.get(MKV_COLOUR, b"")))
+        if MKV_CHROMA_SUBSAMPLING_HORZ in colour:
+            horizontal = _uint(colour[MKV_CHROMA_SUBSAMPLING_HORZ])
+            vertical = _uint(colour.get(MKV_CHROMA_SUBSAMPLING_VERT, b""))
+            info.pix_fmt = _pix_fmt(1 if vertical else 2 if horizontal else 3,
+                                    _uint(colour.get(MKV_BITS_PER_CHANNEL, b"")))
+        else:
+            private = fields.get(MKV_CODEC_PRIVATE, b"")
+            parser = {"h264": _avcc_pix_fmt, "hevc": _hvcc_pix_fmt, "av1": _av1c_pix_fmt}.get(info.codec)
+            if parser is not None and private:
+                # Matroska's CodecPrivate holds the same avcC/hvcC/av1C record as the MP4 box
+                info.pix_fmt = parser(private)
+        break
+
+
+def _read_matroska(f, file_size):
+    info = ContainerInfo("matroska")
+    element = _file_element(f, 0)
+    if element is None or element[0] != EBML_HEADER or element[1] is None:
+        return info
+    element = _file_element(f, element[2] + element[1])
+    if element is None or element[0] != MKV_SEGMENT:
+        return info
+    segment_start = element[2]
+    segment_end = file_size if element[1] is None else min(file_size, segment_start + element[1])
+
+    readers = {MKV_INFO: _read_info, MKV_TRACKS: _read_tracks, MKV_TAGS: _read_tags}
+
+    # Walk the Segment's top-level elements up to the first Cluster, then follow the SeekHead
+    read, pending = set(), []
+    pos = segment_start
+    while pos < segment_end:
+        element = _file_element(f, pos)
+        if element is None:
+            break
+        element_id, size, data_pos = element
+        if element_id == MKV_CLUSTER or size is None:
+            break
+        if element_id == MKV_SEEK_HEAD or element_id in readers:
+            data = _read_range(f, data_pos, data_pos + size)
+            if data is not None:
+                read.add(pos)
+                if element_id in readers:
+                    readers[element_id](data, info)
+                else:
+                    for seek_id, seek in _elements(data):
+                        if seek_id != MKV_SEEK:
+                            continue
+                        target, position = None, None
+                        for child_id, payload in _elements(seek):
+                            if child_id == MKV_SEEK_ID:
+                                target = _uint(payload)
+                            elif child_id == MKV_SEEK_POSITION:
+                                position = segment_start + _uint(payload)
+                        if target in readers and position is not None:
+                            pending.append(position)
+        pos = data_pos + size
+
+    for pos in pending:
+        if pos in read or pos >= segment_end:
+            continue
+        element = _file_element(f, pos)
+        if element is None or element[0] not in readers or element[1] is None:
+            continue
+        data = _read_range(f, element[2], element[2] + element[1])
+        if data is not None:
+            read.add(pos)
+            readers[element[0]](data, info)
+
+    # Matroska has no frame count field; mkvmerge/ffmpeg statistics tags carry it, else estimate
+    for name, value in info.stream_tags:
+        if name.upper().startswith("NUMBER_OF_FRAMES") and value.strip().isdigit():
+            info.frame_count = int(value)
+            break
+    if info.frame_count is None and info.duration and info.fps:
+        info.frame_count = round(info.duration * info.fps)
+    return info
+
+
+def read_container(path):
+    """ContainerInfo of an MP4/MOV or Matroska/WebM file, None for other formats or unreadable files"""
+    try:
+        file_size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            head = f.read(8)
+            if head[:4] == b"\x1a\x45\xdf\xa3":
+                info = _read_matroska(f, file_size)
+            elif len(head) == 8 and head[4:8] in ISO_TOP_LEVEL:
+                info = _read_iso(f, file_size)
+            else:
+                return None
+    except (OSError, ValueError, IndexError, struct.error) as e:
+        print(f"Error reading container tags of {path}: {e}")
+        return None
+    if info.pix_fmt is None:
+        info.pix_fmt = FIXED_PIX_FMTS.get(info.codec)
+    if info.duration:
+        info.bit_rate = int(file_size * 8 / info.duration)
+    return info
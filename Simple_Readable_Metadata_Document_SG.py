@@ -0,0 +1,441 @@
+import json
+from functools import cached_property
+from .Simple_Readable_Metadata_Parameters_SG import parse_parameters
+from .Simple_Readable_Metadata_Exif_SG import parse_exif
+
+# Parse-once container for the metadata of one file.
+# Holds the raw text, the parsed JSON and the detected format so every extraction stage
+# (model, generation params, readable text, prompts) works from the same parsed object.
+
+NO_METADATA = "No metadata found in image"
+NO_KNOWN_METADATA = "No ComfyUI or WebUI format metadata found. Image may be from a different source."
+
+_UNSET = object()
+
+MODEL_CLASS_KEYWORDS = ['checkpoint', 'unet', 'clip', 'vae', 'model']
+
+# Node categories answered by PromptGraph.nodes_in(), as predicates over (class_type, class_type.lower()).
+# Each predicate runs once per distinct class_type, not once per node.
+NODE_CATEGORIES = {
+    "latent": lambda ct, lower: "LatentImage" in ct or "EmptyLatent" in ct,
+    "loader": lambda ct, lower: "Loader" in ct,
+    "ksampler": lambda ct, lower: ct == "KSampler",
+    "noise": lambda ct, lower: "Noise" in ct,
+    "scheduler": lambda ct, lower: "Scheduler" in ct,
+    "cfg": lambda ct, lower: "CFG" in ct,
+    "sampler": lambda ct, lower: "Sampler" in ct,
+    "text_encode": lambda ct, lower: "CLIPTextEncode" in ct or "TextEncode" in ct or "Prompt" in ct,
+    "clip_text_encode": lambda ct, lower: "CLIPTextEncode" in ct,
+    "lora": lambda ct, lower: "lora" in lower,
+    "model": lambda ct, lower: "lora" not in lower and ("load" in lower or any(k in lower for k in MODEL_CLASS_KEYWORDS)),
+}
+
+
+# Inputs read (in order) when following links to the prompt text
+TEXT_INPUT_KEYS = ["text", "t5xxl", "clip_l", "clip_g", "text_g", "text_l", "prompt", "string"]
+# Inputs of value nodes (string primitives, "easy int", SavePositivePromptSG, ...) that carry their output
+VALUE_INPUT_KEYS = ["value", "string", "text", "String", "Text", "STRING", "int", "float", "number", "prompt"]
+CONCAT_CLASS_KEYWORDS = ["concat", "join", "combine", "append"]
+CONCAT_DELIMITER_KEYS = ["delimiter", "separator", "joiner"]
+# Conditioning nodes whose output carries no prompt text
+EMPTY_CONDITIONING_KEYWORDS = ["ZeroOut"]
+
+
+def _exif_marker_payload(exif, marker):
+    """Decoded text after "<marker>:" (e.g. prompt, workflow) in a parsed EXIF block, or None"""
+    payload = exif.marker_payload(marker) if exif is not None else None
+    if payload is None:
+        return None
+    return str(payload, 'utf-8', errors='ignore')
+
+
+def _parse_info_exif(info):
+    """ExifBlock of the raw EXIF bytes in an info dict, or None"""
+    exif_bytes = info.get("exif")
+    if isinstance(exif_bytes, (bytes, bytearray)):
+        return parse_exif(exif_bytes)
+    return None
+
+
+def _prompt_from_info(info):
+    """Parsed ComfyUI prompt from a PNG 'prompt' chunk or WebP EXIF 'prompt:' marker, or None"""
+    try:
+        if "prompt" in info:
+            try:
+                prompt_str = info["prompt"]
+                if isinstance(prompt_str, str):
+                    return json.loads(prompt_str)
+                return prompt_str
+            except:
+                pass
+
+        if "exif" in info:
+            try:
+                prompt_data = _exif_marker_payload(_parse_info_exif(info), "prompt")
+                if prompt_data is not None:
+                    try:
+                        return json.loads(prompt_data)
+                    except:
+                        pass
+            except Exception as e:
+                print(f"Error parsing WebP EXIF for prompt: {e}")
+    except Exception as e:
+        print(f"Error extracting prompt data: {e}")
+    return None
+
+
+def is_node_reference(value):
+    """Check if a value is a node reference like ['node_id', output_index]"""
+    return (isinstance(value, list) and len(value) == 2
+            and isinstance(value[0], (str, int)) and isinstance(value[1], int))
+
+
+class PromptGraph:
+    """Index over a ComfyUI prompt graph, built in a single pass.
+
+    nodes     : (node_id, node_data, class_type, inputs) for every node, in workflow order
+    by_class  : class_type -> positions in nodes
+    by_id     : str(node_id) -> node entry
+    consumers : (node_id, output_index) -> [(consumer_id, input_name)] reverse links
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.nodes = []
+        self.by_id = {}
+        self.by_class = {}
+        self.consumers = {}
+        self._resolved = {}
+        self._resolving = set()
+        self._sampler_prompts = None
+        self._categories = {name: [] for name in NODE_CATEGORIES}
+        class_categories = {}
+
+        for node_id, node_data in data.items():
+            if not isinstance(node_data, dict):
+                continue
+            class_type = node_data.get("class_type", "")
+            inputs = node_data.get("inputs", {})
+            if not isinstance(inputs, dict):
+                inputs = {}
+            entry = (node_id, node_data, class_type, inputs)
+            position = len(self.nodes)
+            self.nodes.append(entry)
+            self.by_id[str(node_id)] = entry
+
+            key = class_type if isinstance(class_type, str) else ""
+            self.by_class.setdefault(key, []).append(position)
+
+            categories = class_categories.get(key)
+            if categories is None:
+                lower = key.lower()
+                categories = [name for name, matches in NODE_CATEGORIES.items() if matches(key, lower)]
+                class_categories[key] = categories
+            for name in categories:
+                self._categories[name].append(entry)
+
+            for input_name, value in inputs.items():
+                if is_node_reference(value):
+                    self.consumers.setdefault((str(value[0]), value[1]), []).append((node_id, input_name))
+
+    def nodes_in(self, category):
+        """Nodes of a NODE_CATEGORIES category, in workflow order"""
+        return self._categories[category]
+
+    def nodes_of_class(self, class_type):
+        return [self.nodes[position] for position in self.by_class.get(class_type, [])]
+
+    def consumers_of(self, node_id, output_index=None):
+        """Nodes reading from node_id (optionally only from one of its outputs)"""
+        node_id = str(node_id)
+        if output_index is not None:
+            return self.consumers.get((node_id, output_index), [])
+        return [link for (source, _), links in self.consumers.items() if source == node_id for link in links]
+
+    def _follow(self, kind, reference, resolve):
+        """Memoized, cycle-safe resolution of the node output a reference points at"""
+        key = (kind, str(reference[0]), reference[1])
+        if key in self._resolved:
+            return self._resolved[key]
+        entry = self.by_id.get(key[1])
+        if entry is None or key in self._resolving:
+            return None
+        self._resolving.add(key)
+        try:
+            result = resolve(entry, reference[1])
+        finally:
+            self._resolving.discard(key)
+        self._resolved[key] = result
+        return result
+
+    def resolve_value(self, value):
+        """Follow node references back to the literal value feeding an input.
+
+        Understands value nodes (string primitives, "easy int", SavePositivePromptSG...) and string
+        concat nodes. Literals are returned as-is; unresolvable or cyclic links give None.
+        """
+        if not is_node_reference(value):
+            return value
+        return self._follow("value", value, self._node_value)
+
+    def _node_value(self, entry, output_index):
+        node_id, node_data, class_type, inputs = entry
+        lower = class_type.lower() if isinstance(class_type, str) else ""
+
+        # Text encoders output CONDITIONING, not the text on their inputs
+        if "textencode" in lower:
+            return None
+
+        if "conditioning" not in lower and any(k in lower for k in CONCAT_CLASS_KEYWORDS):
+            delimiter = ""
+            parts = []
+            for name, value in inputs.items():
+                if name in CONCAT_DELIMITER_KEYS:
+                    delimiter = self.resolve_value(value)
+                elif name.lower().startswith(("string", "text")):
+                    part = self.resolve_value(value)
+                    if isinstance(part, str) and part:
+                        parts.append(part)
+            if parts:
+                return (delimiter if isinstance(delimiter, str) else "").join(parts)
+
+        for name in VALUE_INPUT_KEYS:
+            if name in inputs:
+                return self.resolve_value(inputs[name])
+        return None
+
+    def resolve_conditioning(self, value):
+        """Prompt texts behind a CONDITIONING link, followed through combine/passthrough nodes to the text encoders"""
+        if not is_node_reference(value):
+            return []
+        return self._follow("conditioning", value, self._node_conditioning) or []
+
+    def _node_conditioning(self, entry, output_index):
+        node_id, node_data, class_type, inputs = entry
+        if isinstance(class_type, str) and any(k in class_type for k in EMPTY_CONDITIONING_KEYWORDS):
+            return []
+
+        # Nodes like ControlNetApplyAdvanced pass positive/negative through as outputs 0/1
+        if "positive" in inputs and "negative" in inputs:
+            return self.resolve_conditioning(inputs["negative" if output_index == 1 else "positive"])
+
+        links = [value for name, value in inputs.items() if "conditioning" in name.lower() and is_node_reference(value)]
+        texts = []
+        if links:
+            for link in links:
+                texts.extend(t for t in self.resolve_conditioning(link) if t not in texts)
+            return texts
+
+        # Text encoder: the prompt is its first non-empty (possibly linked) text input
+        for name in TEXT_INPUT_KEYS:
+            if name in inputs:
+                text = self.resolve_value(inputs[name])
+                if isinstance(text, str) and text.strip():
+                    return [text.strip()]
+        return []
+
+    def sampler_prompts(self):
+        """(positive, negative) prompt text found by following each sampler's conditioning links.
+
+        SamplerCustomAdvanced-style samplers are followed through their guider node.
+        Texts from several samplers/encoders are de-duplicated and joined with newlines.
+        """
+        if self._sampler_prompts is not None:
+            return self._sampler_prompts
+
+        positive, negative = [], []
+        for node_id, node_data, class_type, inputs in self.nodes_in("sampler"):
+            if is_node_reference(inputs.get("guider")):
+                guider = self.by_id.get(str(inputs["guider"][0]))
+                if guider is None:
+                    continue
+                inputs = guider[3]
+                links = (inputs.get("positive", inputs.get("conditioning")), inputs.get("negative"))
+            else:
+                links = (inputs.get("positive"), inputs.get("negative"))
+
+            for link, texts in zip(links, (positive, negative)):
+                texts.extend(t for t in self.resolve_conditioning(link) if t not in texts)
+
+        self._sampler_prompts = ("\n".join(positive), "\n".join(negative))
+        return self._sampler_prompts
+
+
+def outputs_connected(prompt, unique_id, output_indices):
+    """Whether any node in the executing prompt reads one of unique_id's outputs.
+
+    Returns True when it can't be told (no hidden PROMPT/UNIQUE_ID), so callers err on the side of doing the work.
+    """
+    if not isinstance(prompt, dict) or unique_id is None:
+        return True
+    graph = PromptGraph(prompt)
+    return any(graph.consumers_of(unique_id, index) for index in output_indices)
+
+
+class MetadataDocument:
+    """Metadata of a single image/video, parsed once and shared by all extraction stages.
+
+    raw      : metadata text as shown in the metadata_raw output
+    info     : PNG text chunks / container tags the document was built from
+    text     : raw with surrounding whitespace and any "Prompt:" prefix removed
+    data     : parsed JSON of text, or None if it isn't JSON
+    format   : "comfyui", "webui" or "unknown"
+    parameters : tokenized A1111/Forge parameters (WebUIParameters, empty unless webui)
+    prompt   : parsed ComfyUI prompt graph used for model/sampler lookups, or None
+    workflow : parsed ComfyUI UI workflow, or None
+    graph    : PromptGraph index over data (None unless data is a dict)
+    prompt_graph : PromptGraph index over prompt
+    """
+
+    def __init__(self, raw, info=None, data=_UNSET, prompt=_UNSET):
+        self.raw = raw
+        self.info = info if info is not None else {}
+        self.parse_error = None
+        if data is not _UNSET:
+            self.__dict__["data"] = data
+        if prompt is not _UNSET:
+            self.__dict__["prompt"] = prompt
+
+    def __bool__(self):
+        return bool(self.raw)
+
+    @classmethod
+    def coerce(cls, value):
+        """Wrap a raw metadata string (or bytes) in a document; documents pass through unchanged"""
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, (bytes, bytearray)):
+            value = value.decode("utf-8", errors="ignore")
+        elif value is None:
+            value = ""
+        elif not isinstance(value, str):
+            value = str(value)
+        return cls(value)
+
+    @classmethod
+    def from_image(cls, img):
+        """Build the document from a PIL image or ImageHeader, picking the raw metadata to expose
+
+        Priority: ComfyUI 'prompt' chunk, A1111/Forge 'parameters', WebP EXIF prompt/workflow markers,
+        EXIF UserComment.
+        """
+        info = img.info if hasattr(img, 'info') else {}
+        if not info:
+            return cls(NO_METADATA, info, data=None, prompt=None)
+
+        # Check for ComfyUI prompt metadata (works for PNG)
+        if "prompt" in info:
+            try:
+                prompt_data = info["prompt"]
+                if isinstance(prompt_data, str):
+                    parsed = json.loads(prompt_data)
+                    return cls(prompt_data, info, data=parsed, prompt=parsed)
+                return cls(json.dumps(prompt_data), info, data=prompt_data, prompt=prompt_data)
+            except:
+                pass
+
+        # Check for A1111/Forge parameters (works for PNG)
+        if "parameters" in info:
+            return cls(info["parameters"], info)
+
+        # Check for EXIF data in WebP/JPEG: the IFDs are walked once and only the matching value is decoded
+        exif = _parse_info_exif(info)
+        if exif is not None:
+            try:
+                prompt_data = _exif_marker_payload(exif, "prompt")
+                if prompt_data is not None:
+                    try:
+                        parsed = json.loads(prompt_data)
+                        return cls(prompt_data, info, data=parsed, prompt=parsed)
+                    except:
+                        pass
+
+                # If no valid prompt found, fall back to the workflow
+                workflow_data = _exif_marker_payload(exif, "workflow")
+                if workflow_data is not None:
+                    try:
+                        wrapped = {"workflow": json.loads(workflow_data)}
+                        return cls(json.dumps(wrapped), info, data=wrapped, prompt=None)
+                    except:
+                        pass
+
+                # Standard EXIF UserComment tag (0x9286), charset prefix removed
+                user_comment = exif.user_comment()
+                if user_comment:
+                    return cls(user_comment, info)
+
+            except Exception as e:
+                print(f"Error parsing WebP EXIF metadata: {e}")
+
+        # Fallback: UserComment through PIL, for images without a raw EXIF block (e.g. TIFF)
+        elif hasattr(img, 'getexif'):
+            try:
+                exif_data = img.getexif()
+                if exif_data:
+                    user_comment = exif_data.get(0x9286)
+                    if user_comment:
+                        if isinstance(user_comment, bytes):
+                            user_comment = user_comment.decode('utf-8', errors='ignore')
+                        return cls(user_comment, info)
+            except Exception as e:
+                print(f"Error reading EXIF via getexif(): {e}")
+
+        return cls(NO_KNOWN_METADATA, info, data=None)
+
+    @cached_property
+    def text(self):
+        text = self.raw.strip()
+        if text.startswith("Prompt:"):
+            text = text[7:].strip()
+        return text
+
+    @cached_property
+    def data(self):
+        try:
+            return json.loads(self.text)
+        except (json.JSONDecodeError, TypeError) as e:
+            self.parse_error = e
+            return None
+
+    @cached_property
+    def format(self):
+        """Detect whether the metadata is ComfyUI JSON or WebUI text format"""
+        if self.data is not None:
+            return "comfyui"
+        if self.parameters:
+            return "webui"
+        return "unknown"
+
+    @cached_property
+    def parameters(self):
+        """A1111/Forge 'parameters' chunk (or the raw text) tokenized once"""
+        text = self.info.get("parameters")
+        if not isinstance(text, str):
+            text = self.text
+        return parse_parameters(text)
+
+    @cached_property
+    def prompt(self):
+        return _prompt_from_info(self.info)
+
+    @cached_property
+    def workflow(self):
+        workflow = self.info.get("workflow")
+        if isinstance(workflow, str):
+            return json.loads(workflow)
+        return workflow
+
+    @cached_property
+    def graph(self):
+        if isinstance(self.data, dict):
+            return PromptGraph(self.data)
+        return None
+
+    @cached_property
+    def prompt_graph(self):
+        prompt = self.prompt
+        if prompt is self.data:
+            return self.graph
+        if isinstance(prompt, dict):
+            return PromptGraph(prompt)
+        return None
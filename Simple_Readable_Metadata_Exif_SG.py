@@ -0,0 +1,151 @@
+import struct
+
+# Minimal TIFF/IFD walker for the EXIF blocks of WebP, JPEG and PNG (eXIf) files.
+# Works on a memoryview of the EXIF bytes: only the IFD entries are unpacked, and text values are
+# handed back as slices of the original buffer, so pulling the "prompt:"/"workflow:" JSON out of a
+# large EXIF block costs one decode of that payload and nothing else.
+
+EXIF_PREFIX = b"Exif\x00\x00"
+
+TAG_IMAGE_DESCRIPTION = 0x010E
+TAG_MAKE = 0x010F
+TAG_MODEL = 0x0110
+TAG_ORIENTATION = 0x0112
+TAG_EXIF_IFD = 0x8769
+TAG_USER_COMMENT = 0x9286
+
+TYPE_ASCII = 2
+TYPE_SHORT = 3
+TYPE_LONG = 4
+TYPE_UNDEFINED = 7
+TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4, 10: 8, 11: 4, 12: 8}
+TEXT_TYPES = (TYPE_ASCII, TYPE_UNDEFINED)
+
+# UserComment starts with an 8-byte character code
+USER_COMMENT_ASCII = b"ASCII\x00\x00\x00"
+USER_COMMENT_UNICODE = b"UNICODE\x00"
+USER_COMMENT_UNDEFINED = b"\x00" * 8
+
+# IFD entry limit, a corrupt count shouldn't make us walk megabytes of garbage
+MAX_IFD_ENTRIES = 1024
+
+
+class ExifBlock:
+    """IFD0 and Exif-IFD entries of an EXIF block, with values read lazily as memoryview slices"""
+
+    def __init__(self, data):
+        self.data = data if isinstance(data, bytes) else bytes(data)
+        # Start of the TIFF header within data, all IFD offsets are relative to it
+        self.base = 6 if self.data.startswith(EXIF_PREFIX) else 0
+        self.buffer = memoryview(self.data)[self.base:]
+        byte_order = self.buffer[:2].tobytes()
+        if byte_order == b"II":
+            self.endian = "<"
+        elif byte_order == b"MM":
+            self.endian = ">"
+        else:
+            raise ValueError("Not a TIFF/EXIF block")
+
+        # tag -> (type, count, value offset), IFD0 first, in file order
+        self.entries = {}
+        magic, ifd0 = struct.unpack_from(self.endian + "HI", self.buffer, 2)
+        if magic != 42:
+            raise ValueError("Bad TIFF magic")
+        self._read_ifd(ifd0)
+        exif_ifd = self.integer(TAG_EXIF_IFD)
+        if exif_ifd:
+            self._read_ifd(exif_ifd)
+
+    def _read_ifd(self, offset):
+        buffer = self.buffer
+        if offset + 2 > len(buffer):
+            return
+        count = min(struct.unpack_from(self.endian + "H", buffer, offset)[0], MAX_IFD_ENTRIES)
+        entry = struct.Struct(self.endian + "HHII")
+        pos = offset + 2
+        for _ in range(count):
+            if pos + 12 > len(buffer):
+                break
+            tag, kind, n, value = entry.unpack_from(buffer, pos)
+            size = TYPE_SIZES.get(kind, 1) * n
+            # Values of 4 bytes or less are stored in the entry itself
+            value_offset = pos + 8 if size <= 4 else value
+            if value_offset + size <= len(buffer):
+                self.entries.setdefault(tag, (kind, n, value_offset))
+            pos += 12
+
+    def raw(self, tag):
+        """Value bytes of tag as a memoryview slice, or None"""
+        entry = self.entries.get(tag)
+        if entry is None:
+            return None
+        kind, n, offset = entry
+        return self.buffer[offset:offset + TYPE_SIZES.get(kind, 1) * n]
+
+    def integer(self, tag):
+        entry = self.entries.get(tag)
+        if entry is None or entry[0] not in (TYPE_SHORT, TYPE_LONG):
+            return None
+        return struct.unpack_from(self.endian + ("H" if entry[0] == TYPE_SHORT else "I"), self.buffer, entry[2])[0]
+
+    def text(self, tag):
+        """ASCII/UNDEFINED value up to its NUL terminator, as a memoryview slice"""
+        entry = self.entries.get(tag)
+        if entry is None or entry[0] not in TEXT_TYPES:
+            return None
+        kind, n, offset = entry
+        end = self.data.find(b"\x00", self.base + offset, self.base + offset + n)
+        return self.buffer[offset:offset + n if end == -1 else end - self.base]
+
+    def orientation(self):
+        return self.integer(TAG_ORIENTATION)
+
+    def user_comment(self):
+        """UserComment decoded according to its character code prefix, or None"""
+        value = self.raw(TAG_USER_COMMENT)
+        if value is None or len(value) < 8:
+            return None
+        code, payload = value[:8].tobytes(), value[8:]
+        if code == USER_COMMENT_UNICODE:
+            head = payload[:2].tobytes()
+            if head in (b"\xff\xfe", b"\xfe\xff"):
+                encoding = "utf-16"
+            elif len(head) == 2 and (head[0] == 0) != (head[1] == 0):
+                # Writers disagree on the byte order (A1111/piexif always use big-endian); for the usual
+                # Latin text the zero byte of the first character gives it away
+                encoding = "utf-16-be" if head[0] == 0 else "utf-16-le"
+            else:
+                encoding = "utf-16-le" if self.endian == "<" else "utf-16-be"
+            text = str(payload, encoding, errors="ignore")
+        elif code in (USER_COMMENT_ASCII, USER_COMMENT_UNDEFINED):
+            text = str(payload, "utf-8", errors="ignore")
+        else:
+            # Unknown code (JIS, or a writer that skipped the prefix): keep the whole value
+            text = str(value, "utf-8", errors="ignore")
+        return text.rstrip("\x00 ") or None
+
+    def marker_payload(self, marker):
+        """Text after "<marker>:" in the first text tag of IFD0 starting with it (ComfyUI WebP/JPEG layout)
+
+        ComfyUI writes "prompt:{...}" and "workflow:{...}" into Model/Make/ImageDescription, counting
+        down from 0x0110 for extra keys, so every text entry of IFD0 is checked. Matching is
+        case-insensitive ("Prompt:" is used by some savers). Returns a memoryview slice or None.
+        """
+        prefix = marker.lower().encode("ascii") + b":"
+        for tag, (kind, n, offset) in self.entries.items():
+            if kind not in TEXT_TYPES or n <= len(prefix) or tag == TAG_USER_COMMENT:
+                continue
+            if self.buffer[offset:offset + len(prefix)].tobytes().lower() == prefix:
+                return self.text(tag)[len(prefix):]
+        return None
+
+
+def parse_exif(data):
+    """ExifBlock for raw EXIF bytes (with or without the "Exif\\0\\0" prefix), or None if unreadable"""
+    if not data:
+        return None
+    try:
+        return ExifBlock(data)
+    except (ValueError, struct.error) as e:
+        print(f"Error parsing EXIF block: {e}")
+        return None
@@ -0,0 +1,610 @@
+import os
+import json
+import math
+import hashlib
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+import torch
+import folder_paths
+from PIL import Image, ImageSequence
+from .Simple_Readable_Metadata_Cache_SG import file_fingerprint
+
+# Frame sampling engine for the VIDEO node.
+# Which frames are kept is decided on presentation timestamps (TimeSelection): a start/end range and a
+# target rate, so fractional rate ratios and variable frame rate files sample correctly.
+# Frames that won't be kept are only grab()bed (demuxed and decoded, but never colour-converted or
+# copied out); kept frames are retrieve()d. Gaps of several seconds are crossed with a
+# CAP_PROP_POS_FRAMES seek instead. Each seek is checked against the frame timestamp, and if
+# the container can't seek accurately (sparse keyframes, broken index) the capture is reopened
+# and decoding continues sequentially, so the selected frames are always the same.
+# Kept frames are written straight into one preallocated IMAGE tensor (FrameBuffer), sized from the
+# container frame count, instead of being collected as separate tensors and stacked.
+# fit_memory_budget() plans max_frames / resize_long_edge so that tensor stays within a byte budget.
+# decode_selected_frames() can split the kept frames into contiguous segments decoded by one capture per thread
+# (cv2 releases the GIL while decoding), each writing its own slots of the shared tensor.
+# FrameCache keeps decoded, resized clips on disk as uint8 .npy files; a repeat load memory-maps the
+# file and converts it to the IMAGE tensor without opening a decoder.
+# Animated WebP/GIF/APNG files, which cv2 can't (fully) decode, go through AnimatedImage: PIL's
+# ImageSequence iteration with the running sum of the per-frame durations as timestamps, so the same
+# TimeSelection rules apply and kept frames land in the same FrameBuffer.
+
+# Seek instead of grabbing once a gap spans this many seconds: a seek decodes forward from the previous
+# keyframe, so it only pays off for gaps longer than a typical keyframe interval
+SEEK_MIN_GAP_SECONDS = 4.0
+SEEK_MIN_GAP_FRAMES = 64
+# A seek that lands more than this many frames away from the target disables seeking for the clip
+SEEK_TOLERANCE_FRAMES = 0.5
+# A timestamp within this many frames of index / fps is taken as exactly on the constant frame rate grid
+NOMINAL_TOLERANCE_FRAMES = 0.25
+# Slack when placing a frame in a rate slot, so float noise can't move it across a slot boundary
+SLOT_EPSILON = 1e-6
+
+# TimeSelection judge decisions
+SKIP, KEEP, KEEP_LAST, STOP = range(4)
+
+# Output IMAGE dtypes; float16 halves the clip's footprint in ComfyUI's node cache
+OUTPUT_DTYPES = {"float32": torch.float32, "float16": torch.float16}
+BUDGET_STRATEGIES = ["reduce frames", "reduce resolution"]
+# "reduce resolution" never scales the long edge below this, it caps the frame count instead
+MIN_BUDGET_LONG_EDGE = 64
+# Parallel decoding uses fewer threads rather than segments shorter than this
+MIN_SEGMENT_FRAMES = 16
+MAX_DECODE_THREADS = 32
+FRAME_CACHE_DIR = "srm_frame_cache"
+# Animation frame durations at or below this are shown for the default instead, as browsers do
+MIN_ANIMATION_DURATION_MS = 10
+DEFAULT_ANIMATION_DURATION_MS = 100
+
+
+class TimeMismatch(Exception):
+    """Raised while decoding by frame index when a frame's timestamp is off the constant frame rate grid"""
+
+
+class TimeSelection:
+    """Which frames of a clip to keep, judged on their presentation timestamps (ms)
+
+    A frame is in range if the middle of its display interval lies in [start_ms, end_ms) (end_ms 0 = end of
+    clip). With rate below fps the range is cut into 1/rate slots from start_ms and the first frame shown
+    in each slot is kept, which hits fractional ratios (30 -> 12 fps) where an every-n-th-frame stride
+    can't. At most max_frames frames are kept (0 = all); target_rate is the rate of the kept frames.
+    """
+
+    def __init__(self, fps, rate=0, start_ms=0.0, end_ms=0.0, max_frames=0):
+        self.fps = fps or 0.0
+        self.target_rate = rate if 0 < rate < self.fps else self.fps
+        self.half_frame_ms = 500.0 / self.fps if self.fps else 0.0
+        self.interval_ms = 1000.0 / rate if 0 < rate < self.fps else None
+        self.start_ms = max(0.0, start_ms)
+        self.end_ms = end_ms if end_ms > self.start_ms else None
+        self.max_frames = max_frames
+
+    def nominal_ms(self, index):
+        return index * 1000.0 / self.fps if self.fps else 0.0
+
+    def timestamp(self, index, pts_ms):
+        """pts_ms, snapped to index's nominal timestamp when it is within rounding of it"""
+        nominal = self.nominal_ms(index)
+        if abs(pts_ms - nominal) <= NOMINAL_TOLERANCE_FRAMES * 2 * self.half_frame_ms:
+            return nominal
+        return pts_ms
+
+    def first_index(self):
+        """Nominal index of a frame at or just before the start of the range, where decoding can begin"""
+        if not self.fps:
+            return 0
+        return max(0, math.ceil(self.start_ms * self.fps / 1000.0 - 0.5) - 1)
+
+    def judge(self):
+        """New judge(timestamp_ms) -> SKIP / KEEP / KEEP_LAST / STOP for one pass through the clip"""
+        state = {"kept": 0, "slot": None}
+
+        def judge(timestamp_ms):
+            middle = timestamp_ms + self.half_frame_ms
+            if self.end_ms is not None and middle >= self.end_ms:
+                return STOP
+            if middle < self.start_ms:
+                return SKIP
+            if self.interval_ms is not None:
+                slot = math.floor((middle - self.start_ms) / self.interval_ms + SLOT_EPSILON)
+                if slot == state["slot"]:
+                    return SKIP
+                state["slot"] = slot
+            state["kept"] += 1
+            return KEEP_LAST if self.max_frames > 0 and state["kept"] >= self.max_frames else KEEP
+
+        return judge
+
+    def nominal_indices(self, frame_count=None):
+        """Indices kept on the constant frame rate grid (timestamp = index / fps), up to frame_count frames"""
+        judge = self.judge()
+        indices = itertools.count(self.first_index()) if frame_count is None else range(self.first_index(), frame_count)
+        for index in indices:
+            decision = judge(self.nominal_ms(index))
+            if decision == STOP:
+                return
+            if decision != SKIP:
+                yield index
+            if decision == KEEP_LAST:
+                return
+
+    def expected_count(self, frame_count):
+        """Number of frames kept from a clip of frame_count frames (max_frames, or 0, if unknown)"""
+        if frame_count <= 0 or not self.fps:
+            return self.max_frames
+        return sum(1 for _ in self.nominal_indices(frame_count))
+
+
+def resized_size(width, height, long_edge=0):
+    """(width, height) after scaling the long edge down to long_edge (0 = original size)"""
+    if long_edge > 0 and max(width, height) > long_edge:
+        scale = long_edge / max(width, height)
+        return int(width * scale), int(height * scale)
+    return width, height
+
+
+def fit_memory_budget(budget_mb, frames, width, height, dtype, strategy, max_frames=0, long_edge=0):
+    """(max_frames, long_edge) that keep a (frames, height, width, 3) output within budget_mb
+
+    frames is the number of frames that would be kept (0 if unknown). "reduce resolution" scales the
+    long edge down so every frame still fits; "reduce frames", or an unknown frame count, caps max_frames.
+    """
+    itemsize = torch.empty((0,), dtype=dtype).element_size()
+    out_width, out_height = resized_size(width, height, long_edge)
+    budget = budget_mb * 1024 * 1024
+    if budget <= 0 or out_width <= 0 or out_height <= 0:
+        return max_frames, long_edge
+    if max_frames > 0:
+        frames = min(frames, max_frames) if frames else max_frames
+
+    if strategy == "reduce resolution" and frames > 0:
+        scale = math.sqrt(budget / (frames * out_width * out_height * 3 * itemsize))
+        if scale < 1:
+            long_edge = max(MIN_BUDGET_LONG_EDGE, int(max(out_width, out_height) * scale))
+            out_width, out_height = resized_size(width, height, long_edge)
+
+    fit = max(1, budget // (out_width * out_height * 3 * itemsize))
+    if frames <= 0 or frames > fit:
+        max_frames = fit
+    return max_frames, long_edge
+
+
+class FrameBuffer:
+    """(N, H, W, 3) float IMAGE tensor filled in place, one RGB uint8 frame at a time
+
+    Allocated on the first frame (its size after resizing), with room for capacity frames. Container frame
+    counts are estimates: if more frames arrive the tensor grows, if fewer, tensor() returns a view of
+    the filled part.
+    """
+
+    def __init__(self, capacity=0, dtype=torch.float32):
+        self.capacity = max(1, capacity)
+        self.dtype = dtype
+        self.count = 0
+        self._tensor = None
+        self._array = None
+        self._lock = threading.Lock()
+        # Per-thread RGB scratch frame
+        self._local = threading.local()
+
+    def _allocate(self, capacity, height, width):
+        tensor = torch.empty((capacity, height, width, 3), dtype=self.dtype)
+        if self._tensor is not None:
+            tensor[:self.count] = self._tensor[:self.count]
+        self._tensor = tensor
+        # numpy view of the same storage, so frames are converted directly into the output
+        self._array = tensor.numpy()
+
+    def _ensure(self, height, width):
+        if self._tensor is None:
+            with self._lock:
+                if self._tensor is None:
+                    self._allocate(self.capacity, height, width)
+
+    def store(self, slot, frame):
+        """Convert a BGR uint8 frame to RGB into slot (< capacity); threads may fill different slots"""
+        height, width = frame.shape[:2]
+        self._ensure(height, width)
+        if self.dtype == torch.uint8:
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._array[slot])
+            return
+        rgb = getattr(self._local, "rgb", None)
+        if rgb is None or rgb.shape[:2] != (height, width):
+            rgb = self._local.rgb = np.empty((height, width, 3), dtype=np.uint8)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+        np.divide(rgb, np.float32(255.0), out=self._array[slot], casting="unsafe")
+
+    def append_bgr(self, frame):
+        """Convert a BGR uint8 frame to RGB and store it as the next float frame"""
+        if self._tensor is not None and self.count == self._tensor.shape[0]:
+            self._allocate(self.count * 2, *frame.shape[:2])
+        self.store(self.count, frame)
+        self.count += 1
+
+    def append_rgb(self, frame):
+        """Store an RGB uint8 frame as the next frame, no colour conversion"""
+        if self._tensor is not None and self.count == self._tensor.shape[0]:
+            self._allocate(self.count * 2, *frame.shape[:2])
+        self._ensure(*frame.shape[:2])
+        if self.dtype == torch.uint8:
+            self._array[self.count] = frame
+        else:
+            np.divide(frame, np.float32(255.0), out=self._array[self.count], casting="unsafe")
+        self.count += 1
+
+    def tensor(self):
+        if self._tensor is None:
+            return None
+        return self._tensor[:self.count]
+
+
+def ones_mask(count, height, width):
+    """All-ones (N, H, W) mask as an expanded view of a single element, no per-pixel storage
+
+    All elements share that one element, so the mask is read-only in practice: in-place writes fail or
+    change every frame. Consumers that modify masks in place must clone() it first.
+    """
+    return torch.ones((1, 1, 1), dtype=torch.float32).expand(count, height, width)
+
+
+def rgb_to_image(rgb, dtype=torch.float32):
+    """(N, H, W, 3) uint8 RGB array (e.g. memory-mapped) -> IMAGE tensor, converted frame by frame"""
+    tensor = torch.empty(tuple(rgb.shape), dtype=dtype)
+    array = tensor.numpy()
+    for i in range(rgb.shape[0]):
+        np.divide(rgb[i], np.float32(255.0), out=array[i], casting="unsafe")
+    return tensor
+
+
+class FrameSampler:
+    """Decode selected frames of a video with one cv2.VideoCapture, skipping the rest as cheaply as possible"""
+
+    def __init__(self, video_path, fps=None):
+        self.video_path = video_path
+        self.cap = None
+        self.fps = fps
+        # Index of the frame the next grab() returns, i.e. frames consumed so far
+        self.position = 0
+        self.seek_enabled = True
+        self.open()
+
+    def open(self):
+        self.release()
+        self.cap = cv2.VideoCapture(self.video_path)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"Could not open video: {self.video_path}")
+        if not self.fps:
+            self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 0.0
+        # Container frame count (0 if unknown); seeks past it would only fail
+        self.frame_count = max(0, int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0))
+        self.position = 0
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    @property
+    def seek_min_gap(self):
+        return max(SEEK_MIN_GAP_FRAMES, int((self.fps or 0) * SEEK_MIN_GAP_SECONDS))
+
+    def _seek(self, index):
+        """Seek so the next grab() returns frame index; False (capture reopened at 0) if the container can't"""
+        if self.cap.set(cv2.CAP_PROP_POS_FRAMES, index) and self.cap.grab():
+            landed_ms = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+            expected_ms = index * 1000.0 / self.fps if self.fps else None
+            if expected_ms is not None and abs(landed_ms - expected_ms) <= SEEK_TOLERANCE_FRAMES * 1000.0 / self.fps:
+                self.position = index + 1
+                return True
+        # Inaccurate or failed seek: the capture position is unknown now, start over sequentially
+        self.seek_enabled = False
+        self.open()
+        return False
+
+    def _can_seek(self, index):
+        return (self.seek_enabled and self.fps and index - self.position >= self.seek_min_gap
+                and (not self.frame_count or index < self.frame_count))
+
+    def _check_grid(self, selection):
+        # Only called for the frame just grabbed, i.e. index position - 1
+        pts_ms = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+        if selection.timestamp(self.position - 1, pts_ms) != selection.nominal_ms(self.position - 1):
+            raise TimeMismatch(f"Frame {self.position - 1} at {pts_ms:.3f}ms is off the {self.fps:g} fps grid")
+
+    def frames(self, indices, grid=None):
+        """Yield (index, BGR frame) for increasing frame indices, stopping at the end of the video
+
+        With grid (a TimeSelection), every grabbed frame's timestamp is checked against index / fps
+        and TimeMismatch is raised for the first one that is off.
+        """
+        for index in indices:
+            if index < self.position:
+                continue
+
+            grabbed = self._seek(index) if self._can_seek(index) else False
+            if grabbed and grid is not None:
+                self._check_grid(grid)
+
+            if not grabbed:
+                # Skipped frames are grabbed only, never converted to BGR or copied
+                while self.position <= index:
+                    if not self.cap.grab():
+                        return
+                    self.position += 1
+                    if grid is not None:
+                        self._check_grid(grid)
+
+            ok, frame = self.cap.retrieve()
+            if not ok:
+                return
+            yield index, frame
+
+    def scan(self, selection):
+        """Yield (index, BGR frame) of the frames selection keeps, judged on each frame's own timestamp"""
+        judge = selection.judge()
+        first = selection.first_index()
+        grabbed = self._seek(first) if first > self.position and self._can_seek(first) else False
+        previous_ms = None
+        while True:
+            if not grabbed:
+                if not self.cap.grab():
+                    return
+                self.position += 1
+            grabbed = False
+
+            index = self.position - 1
+            pts_ms = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+            if previous_ms is not None and pts_ms <= previous_ms:
+                # No usable timestamps from this container: fall back to the nominal grid
+                pts_ms = selection.nominal_ms(index)
+            previous_ms = pts_ms
+
+            decision = judge(selection.timestamp(index, pts_ms))
+            if decision == STOP:
+                return
+            if decision == SKIP:
+                continue
+            ok, frame = self.cap.retrieve()
+            if not ok:
+                return
+            yield index, frame
+            if decision == KEEP_LAST:
+                return
+
+
+def _decode_segment(sampler, indices, first_slot, end_slot, buffer, prepare, grid):
+    """Decode indices into slots first_slot.. of buffer; frames past end_slot are returned instead"""
+    filled, overflow = 0, []
+    with sampler:
+        for index, frame in sampler.frames(indices, grid):
+            if prepare is not None:
+                frame = prepare(frame)
+            if first_slot + filled < end_slot:
+                buffer.store(first_slot + filled, frame)
+            else:
+                overflow.append(frame)
+            filled += 1
+        return filled, overflow, sampler.position
+
+
+def _scan_into(sampler, selection, buffer, prepare):
+    with sampler:
+        for index, frame in sampler.scan(selection):
+            buffer.append_bgr(prepare(frame) if prepare is not None else frame)
+        return sampler.position
+
+
+def decode_selected_frames(sampler, selection, buffer, prepare=None, threads=1):
+    """Decode the frames selection (a TimeSelection) keeps into buffer, in order
+
+    prepare(frame) is applied to each kept BGR frame before it is stored (resizing). With threads > 1
+    and a known frame count, the kept frames are split into contiguous segments, one capture per
+    thread, each seeking to its first frame. Segments select frames by index on the constant frame rate
+    grid and verify every timestamp; a variable frame rate clip falls back to the sequential scan, so the
+    result is always identical to the sequential path.
+    Returns the number of frames the decode went through, for the clip duration.
+    """
+    total = selection.expected_count(sampler.frame_count) if sampler.frame_count else 0
+    threads = min(max(1, threads), MAX_DECODE_THREADS, total // MIN_SEGMENT_FRAMES if total else 1)
+    if threads <= 1:
+        return _scan_into(sampler, selection, buffer, prepare)
+
+    indices = list(selection.nominal_indices(sampler.frame_count))
+    total = len(indices)
+    bounds = [total * k // threads for k in range(threads + 1)]
+    segments = []
+    for k in range(threads):
+        if k == threads - 1:
+            # The last segment runs on past the container frame count, which is only an estimate
+            segment = itertools.islice(selection.nominal_indices(), bounds[k], None)
+        else:
+            segment = indices[bounds[k]:bounds[k + 1]]
+        segments.append((segment, bounds[k], bounds[k + 1]))
+
+    def run(k):
+        segment, first_slot, end_slot = segments[k]
+        segment_sampler = sampler if k == 0 else FrameSampler(sampler.video_path, sampler.fps)
+        return _decode_segment(segment_sampler, segment, first_slot, end_slot, buffer, prepare, selection)
+
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(run, range(threads)))
+    except TimeMismatch as e:
+        print(f"Variable frame rate, decoding sequentially: {e}")
+        buffer.count = 0
+        sampler.open()
+        return _scan_into(sampler, selection, buffer, prepare)
+
+    # A segment that came up short hit the real end of the clip: later segments can't continue it
+    count, position, overflow = 0, 0, []
+    for (segment, first_slot, end_slot), (filled, extra, segment_position) in zip(segments, results):
+        count += min(filled, end_slot - first_slot)
+        position = max(position, segment_position)
+        if filled < end_slot - first_slot:
+            break
+        overflow = extra
+    buffer.count = count
+    for frame in overflow:
+        buffer.append_bgr(frame)
+    return position
+
+
+def _frame_duration(info):
+    duration = info.get("duration") or 0
+    return duration if duration > MIN_ANIMATION_DURATION_MS else DEFAULT_ANIMATION_DURATION_MS
+
+
+class AnimatedImage:
+    """Frames of an animated WebP/GIF/APNG, read in order with PIL
+
+    A frame's timestamp is the sum of the durations of the frames before it. fps starts out from the
+    first frame's duration and, after scan(), is the mean rate of the frames it went through;
+    duration_ms is the whole animation's length once a scan reached the end.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.image = Image.open(path)
+        # WebP only reports a frame's duration once it is decoded
+        self.image.load()
+        self.format = self.image.format
+        self.width, self.height = self.image.size
+        self.frame_count = getattr(self.image, "n_frames", 1)
+        self.fps = 1000.0 / _frame_duration(self.image.info)
+        self.duration_ms = None
+        self.position = 0
+
+    def release(self):
+        if self.image is not None:
+            self.image.close()
+            self.image = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def scan(self, selection):
+        """Yield (index, RGB uint8 frame) of the frames selection keeps"""
+        judge = selection.judge()
+        elapsed_ms = 0.0
+        for index, frame in enumerate(ImageSequence.Iterator(self.image)):
+            frame.load()
+            decision = judge(elapsed_ms)
+            elapsed_ms += _frame_duration(frame.info)
+            self.position = index + 1
+            self.fps = self.position * 1000.0 / elapsed_ms
+            if decision == STOP:
+                return
+            if decision != SKIP:
+                # Only kept frames are composited to RGB and copied out
+                yield index, np.asarray(frame.convert("RGB"))
+            if decision == KEEP_LAST:
+                return
+        self.duration_ms = elapsed_ms
+
+
+def decode_animated_frames(animation, selection, buffer, prepare=None):
+    """Decode the frames selection keeps from an AnimatedImage into buffer; returns the frames gone through"""
+    with animation:
+        for index, frame in animation.scan(selection):
+            buffer.append_rgb(prepare(frame) if prepare is not None else frame)
+        return animation.position
+
+
+class FrameCache:
+    """Decoded RGB uint8 clips as <key>.npy (+ <key>.json info) files, evicted least recently used first
+
+    Entries are keyed by the video's content fingerprint and the decode settings. Hits touch the file,
+    so eviction by access time works on filesystems mounted with noatime/relatime too.
+    """
+
+    def __init__(self, directory=None):
+        self._directory = directory
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self):
+        if self._directory is None:
+            input_dir = os.path.abspath(folder_paths.get_input_directory())
+            self._directory = os.path.join(os.path.dirname(input_dir), FRAME_CACHE_DIR)
+        return self._directory
+
+    def key(self, video_path, *settings):
+        source = f"{file_fingerprint(video_path)}|{'|'.join(str(s) for s in settings)}"
+        return hashlib.blake2b(source.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return f"{base}.npy", f"{base}.json"
+
+    def load(self, key):
+        """(memory-mapped (N, H, W, 3) uint8 array, info dict) or None"""
+        npy_path, info_path = self._paths(key)
+        try:
+            frames = np.load(npy_path, mmap_mode="r")
+            with open(info_path, "r", encoding="utf-8") as f:
+                info = json.load(f)
+            os.utime(npy_path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Ignoring unreadable frame cache entry {npy_path}: {e}")
+            return None
+        return frames, info
+
+    def store(self, key, frames, info, max_bytes):
+        """Write an entry, then evict the oldest ones until the cache fits max_bytes"""
+        if frames.nbytes > max_bytes:
+            return False
+        npy_path, info_path = self._paths(key)
+        tmp_suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # The .npy is moved into place last: once it exists, so does its info
+            with open(info_path + tmp_suffix, "w", encoding="utf-8") as f:
+                json.dump(info, f)
+            os.replace(info_path + tmp_suffix, info_path)
+            with open(npy_path + tmp_suffix, "wb") as f:
+                np.save(f, frames)
+            os.replace(npy_path + tmp_suffix, npy_path)
+        except OSError as e:
+            print(f"Could not write frame cache entry {npy_path}: {e}")
+            return False
+        self.evict(max_bytes)
+        return True
+
+    def evict(self, max_bytes):
+        with self._lock:
+            entries = []
+            try:
+                with os.scandir(self.directory) as it:
+                    for entry in it:
+                        if entry.name.endswith(".npy") and entry.is_file():
+                            st = entry.stat()
+                            entries.append((st.st_atime, st.st_size, entry.path))
+            except OSError as e:
+                print(f"Error listing frame cache {self.directory}: {e}")
+                return
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= max_bytes:
+                    break
+                for stale in (path, path[:-len(".npy")] + ".json"):
+                    try:
+                        os.remove(stale)
+                    except OSError:
+                        pass
+                total -= size
+
+
+frame_cache = FrameCache()
@@ -0,0 +1,79 @@
+import os
+import time
+import threading
+import folder_paths
+
+# Shared, change-aware listing of the input folder for the loader nodes' INPUT_TYPES.
+# /object_info asks every node for its inputs; instead of listing (and stat-ing) the folder once per
+# node and request, one sorted listing is kept per directory and rebuilt only when the directory
+# mtime changes, which happens whenever an entry is added, removed or renamed.
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.jfif', '.webp', '.bmp', '.tif', '.tiff', '.gif')
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.mkv', '.webm', '.avi', '.m4v', '.wmv', '.flv', '.mpg', '.mpeg')
+# Animated image formats the video node can also read
+ANIMATED_EXTENSIONS = ('.gif', '.webp', '.apng')
+# A listing taken this soon after the directory changed isn't reused: on filesystems with coarse
+# mtimes (NFS, FAT, 1-2s) a later change within the same tick would keep the same mtime.
+# Measured on the local monotonic clock from when the mtime was first seen, never against the
+# mtime itself, which comes from the file server's clock.
+RACY_WINDOW_NS = 2_000_000_000
+
+
+class DirectoryListing:
+    """Sorted file names of a directory, split into images and videos, cached by directory mtime
+
+    The image list is every file that isn't a video, as PIL may open more formats than IMAGE_EXTENSIONS.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _scan(self, directory):
+        files = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                # DirEntry.is_file() uses the type from the directory read itself, no stat per file
+                if entry.is_file():
+                    files.append(entry.name)
+        files.sort()
+        images = [f for f in files if not f.lower().endswith(VIDEO_EXTENSIONS)]
+        videos = [f for f in files if f.lower().endswith(VIDEO_EXTENSIONS + ANIMATED_EXTENSIONS)]
+        return {"all": files, "image": images, "video": videos}
+
+    def files(self, directory, kind="all"):
+        """File names in directory ("all", "image" or "video"), re-listed only if the directory changed"""
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError as e:
+            print(f"Error listing {directory}: {e}")
+            return []
+
+        now = time.monotonic_ns()
+        with self._lock:
+            cached = self._entries.get(directory)
+        # cached: (mtime_ns, when that mtime was first seen, when the listing was taken, listing)
+        if cached is not None and cached[0] == mtime_ns:
+            first_seen = cached[1]
+            # Trusted once taken a full window after the mtime appeared, until then every call lists again
+            stale = cached[2] - first_seen < RACY_WINDOW_NS
+        else:
+            first_seen, stale = now, True
+        if stale:
+            cached = (mtime_ns, first_seen, now, self._scan(directory))
+            with self._lock:
+                self._entries[directory] = cached
+        # Copy so callers can't modify the cached list
+        return list(cached[3][kind])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+directory_listing = DirectoryListing()
+
+
+def input_files(kind="all"):
+    """Sorted files of the ComfyUI input folder, for the image/video combo inputs"""
+    return directory_listing.files(folder_paths.get_input_directory(), kind)
@@ -1,13 +1,22 @@
 import torch
 import os
 import folder_paths
-from PIL import Image, ImageOps
+from PIL import Image
 import numpy as np
-import hashlib
-import json
 import re
+import textwrap
+from .Simple_Readable_Metadata_Reader_SG import read_image_header
+from .Simple_Readable_Metadata_Cache_SG import file_fingerprint, result_cache
+from .Simple_Readable_Metadata_Pixels_SG import image_to_tensors
+from .Simple_Readable_Metadata_Document_SG import MetadataDocument, outputs_connected
+from .Simple_Readable_Metadata_Listing_SG import input_files
+from .Simple_Readable_Metadata_Parameters_SG import WEBUI_GENERATION_PARAMS
+from .Simple_Readable_Metadata_Samplers_SG import sampler_table
 import comfy.samplers
 
+# Prompts in the readable text are indented under their label, every line of multi-line ones
+PROMPT_INDENT = " " * 11
+
 class SimpleReadableMetadataMAXSG:
     """Load image with drag-and-drop, automatically extract properties and metadata"""
     
@@ -15,14 +24,20 @@ class SimpleReadableMetadataMAXSG:
     
     @classmethod
     def INPUT_TYPES(cls):
-        input_dir = folder_paths.get_input_directory()
-        files = [f for f in os.listdir(input_dir) if os.path.isfile(os.path.join(input_dir, f))]
+        files = input_files("image")
         return {
             "required": {
-                "image": (sorted(files), {"image_upload": True}),
+                "image": (files, {"image_upload": True}),
                 "show_info": (["on", "off"],),  # <--- Added this line
                 "emoji_in_readable_text": ("BOOLEAN", {"default": True})
             },
+            "optional": {
+                "decode_pixels": (["auto", "always", "never"], {"default": "auto", "tooltip": "auto: only decode the image when the image/mask outputs are connected"}),
+            },
+            "hidden": {
+                "prompt": "PROMPT",
+                "unique_id": "UNIQUE_ID",
+            },
             "ui": {
                 "image": {"min_width": 450},
             },
@@ -34,13 +49,24 @@ class SimpleReadableMetadataMAXSG:
     FUNCTION = "load_analyze_extract"
     OUTPUT_NODE = True
     
+    # Positions of the image and mask outputs in RETURN_TYPES
+    PIXEL_OUTPUTS = (1, 2)
+    
     @classmethod
-    def IS_CHANGED(cls, image, emoji_in_readable_text):
+    def IS_CHANGED(cls, image, show_info="on", emoji_in_readable_text=True, decode_pixels="auto", prompt=None, unique_id=None):
+        # ComfyUI passes an empty PROMPT here, so the "auto" decode decision can't be made here; it is made at
+        # execution, and the result cache key carries it
         image_path = folder_paths.get_annotated_filepath(image)
-        m = hashlib.sha256()
-        with open(image_path, 'rb') as f:
-            m.update(f.read())
-        return m.digest().hex()
+        return file_fingerprint(image_path)
+    
+    @classmethod
+    def should_decode_pixels(cls, decode_pixels, prompt, unique_id):
+        """Decide whether the image/mask tensors have to be built"""
+        if decode_pixels == "always":
+            return True
+        if decode_pixels == "never":
+            return False
+        return outputs_connected(prompt, unique_id, cls.PIXEL_OUTPUTS)
     
     @classmethod
     def VALIDATE_INPUTS(cls, image, emoji_in_readable_text):
@@ -82,118 +108,26 @@ class SimpleReadableMetadataMAXSG:
         return self.safely_convert_to_string(value)
     
     def convert_sampler_string_to_comfyui_type(self, sampler_str):
-        """Convert sampler string to ComfyUI SAMPLER type"""
-        try:
-            sampler_str = self.safely_process_value(sampler_str)
-            samplers_data = comfy.samplers.KSampler.SAMPLERS
-            if isinstance(samplers_data, dict):
-                available_samplers = list(samplers_data.keys())
-            elif isinstance(samplers_data, (list, tuple)):
-                available_samplers = list(samplers_data)
-            else:
-                available_samplers = ["euler"]
-        except Exception as e:
-            print(f"Error getting samplers: {e}")
-            available_samplers = ["euler"]
-        
-        if sampler_str == 'N/A' or sampler_str == "" or not sampler_str:
-            return available_samplers[0] if available_samplers else "euler"
-        
-        try:
-            sampler_str_normalized = sampler_str.lower().strip()
-            for sampler in available_samplers:
-                if sampler.lower() == sampler_str_normalized:
-                    return sampler
-            for sampler in available_samplers:
-                if sampler_str_normalized in sampler.lower():
-                    return sampler
-        except:
-            pass
-        
-        return available_samplers[0] if available_samplers else "euler"
+        """Convert sampler string (ComfyUI or A1111/Forge name) to ComfyUI SAMPLER type"""
+        return sampler_table.resolve(self.safely_process_value(sampler_str))[0]
     
-    def convert_scheduler_string_to_comfyui_type(self, scheduler_str):
-        """Convert scheduler string to ComfyUI SCHEDULER type"""
-        try:
-            scheduler_str = self.safely_process_value(scheduler_str)
-            schedulers_data = comfy.samplers.KSampler.SCHEDULERS
-            if isinstance(schedulers_data, dict):
-                available_schedulers = list(schedulers_data.keys())
-            elif isinstance(schedulers_data, (list, tuple)):
-                available_schedulers = list(schedulers_data)
-            else:
-                available_schedulers = ["normal"]
-        except Exception as e:
-            print(f"Error getting schedulers: {e}")
-            available_schedulers = ["normal"]
-        
-        if scheduler_str == 'N/A' or scheduler_str == "" or not scheduler_str:
-            return available_schedulers[0] if available_schedulers else "normal"
-        
-        try:
-            scheduler_str_normalized = scheduler_str.lower().strip()
-            for scheduler in available_schedulers:
-                if scheduler.lower() == scheduler_str_normalized:
-                    return scheduler
-            for scheduler in available_schedulers:
-                if scheduler_str_normalized in scheduler.lower():
-                    return scheduler
-        except:
-            pass
-        
-        return available_schedulers[0] if available_schedulers else "normal"
+    def convert_scheduler_string_to_comfyui_type(self, scheduler_str, sampler_str=None):
+        """Convert scheduler string to ComfyUI SCHEDULER type (a schedule named in sampler_str, e.g. "DPM++ 2M Karras", is the fallback)"""
+        sampler_str = self.safely_process_value(sampler_str) if sampler_str is not None else None
+        return sampler_table.resolve(sampler_str, self.safely_process_value(scheduler_str))[1]
     
-    def _get_prompt_data_from_image(self, img):
-        """Helper method to extract prompt data from both PNG and WebP formats"""
-        try:
-            # First check direct img.info (works for PNG)
-            if hasattr(img, 'info') and img.info:
-                if "prompt" in img.info:
-                    try:
-                        prompt_str = img.info["prompt"]
-                        if isinstance(prompt_str, str):
-                            return json.loads(prompt_str)
-                        return prompt_str
-                    except:
-                        pass
-                
-                # Check EXIF data for WebP
-                if "exif" in img.info:
-                    try:
-                        exif_bytes = img.info["exif"]
-                        if isinstance(exif_bytes, bytes):
-                            exif_string = exif_bytes.decode('utf-8', errors='ignore')
-                            # Look for prompt: marker
-                            if "prompt:" in exif_string:
-                                prompt_start = exif_string.find("prompt:")
-                                if prompt_start != -1:
-                                    prompt_data = exif_string[prompt_start + 7:]
-                                    prompt_data = prompt_data.split('\x00')[0]
-                                    try:
-                                        return json.loads(prompt_data)
-                                    except:
-                                        pass
-                    except Exception as e:
-                        print(f"Error parsing WebP EXIF for prompt: {e}")
-        except Exception as e:
-            print(f"Error extracting prompt data: {e}")
-        return None
-    
-    def extract_model_name(self, img):
-        """Extract model name from image metadata"""
+    def extract_model_name(self, doc):
+        """Extract model name from image metadata (MetadataDocument)"""
         model_name = "N/A"
         try:
-            if not hasattr(img, 'info') or not img.info:
+            if not doc.info:
                 return model_name
             
-            # Try to get prompt data (works for both PNG and WebP)
-            prompt_data = self._get_prompt_data_from_image(img)
+            # Prompt data is parsed once by the document (works for both PNG and WebP)
+            prompt_data = doc.prompt
             if prompt_data:
                 try:
-                    for node_id, node_data in prompt_data.items():
-                        class_type = node_data.get('class_type', '')
-                        inputs = node_data.get('inputs', {})
-                        
+                    for node_id, node_data, class_type, inputs in doc.prompt_graph.nodes_in("loader"):
                         if 'CheckpointLoader' in class_type and 'ckpt_name' in inputs:
                             model_name = inputs['ckpt_name']
                             break
@@ -214,9 +148,9 @@ class SimpleReadableMetadataMAXSG:
                     print(f"Error parsing prompt metadata: {e}")
             
             # Try workflow format (PNG direct access)
-            if model_name == "N/A" and 'workflow' in img.info:
+            if model_name == "N/A" and 'workflow' in doc.info:
                 try:
-                    workflow_data = json.loads(img.info['workflow'])
+                    workflow_data = doc.workflow
                     for node in workflow_data.get('nodes', []):
                         node_type = node.get('type', '')
                         if 'Checkpoint' in node_type or 'Loader' in node_type:
@@ -228,13 +162,10 @@ class SimpleReadableMetadataMAXSG:
                     print(f"Error parsing workflow metadata: {e}")
             
             # Try A1111 format (PNG direct access)
-            if model_name == "N/A" and 'parameters' in img.info:
+            if model_name == "N/A" and 'parameters' in doc.info:
                 try:
-                    params = img.info['parameters']
-                    model_pattern = r'Model:\s*([^,\n]+)'
-                    match = re.search(model_pattern, params)
-                    if match:
-                        model_name = match.group(1).strip()
+                    if doc.parameters.get('Model'):
+                        model_name = doc.parameters.get('Model')
                 except Exception as e:
                     print(f"Error parsing A1111 metadata: {e}")
         
@@ -243,8 +174,8 @@ class SimpleReadableMetadataMAXSG:
         
         return model_name
     
-    def extract_generation_params(self, img):
-        """Extract generation parameters (seed, steps, cfg, sampler, scheduler) from image metadata"""
+    def extract_generation_params(self, doc):
+        """Extract generation parameters (seed, steps, cfg, sampler, scheduler) from image metadata (MetadataDocument)"""
         params = {
             'seed': 'N/A',
             'steps': 'N/A',
@@ -254,26 +185,25 @@ class SimpleReadableMetadataMAXSG:
         }
         
         try:
-            if not hasattr(img, 'info') or not img.info:
+            if not doc.info:
                 return params
             
-            # Try to get prompt data (works for both PNG and WebP)
-            prompt_data = self._get_prompt_data_from_image(img)
+            # Prompt data is parsed once by the document (works for both PNG and WebP)
+            prompt_data = doc.prompt
             if prompt_data:
                 try:
-                    for node_id, node_data in prompt_data.items():
-                        class_type = node_data.get('class_type', '')
-                        inputs = node_data.get('inputs', {})
-                        
-                        # KSampler node has all the info we need
-                        if class_type == "KSampler":
-                            params['seed'] = inputs.get('seed', 'N/A')
-                            params['steps'] = inputs.get('steps', 'N/A')
-                            params['cfg'] = inputs.get('cfg', 'N/A')
-                            params['sampler'] = inputs.get('sampler_name', 'N/A')
-                            params['scheduler'] = inputs.get('scheduler', 'N/A')
-                            return params
-                        
+                    graph = doc.prompt_graph
+
+                    # KSampler node has all the info we need
+                    for node_id, node_data, class_type, inputs in graph.nodes_in("ksampler"):
+                        params['seed'] = inputs.get('seed', 'N/A')
+                        params['steps'] = inputs.get('steps', 'N/A')
+                        params['cfg'] = inputs.get('cfg', 'N/A')
+                        params['sampler'] = inputs.get('sampler_name', 'N/A')
+                        params['scheduler'] = inputs.get('scheduler', 'N/A')
+                        return params
+
+                    for node_id, node_data, class_type, inputs in graph.nodes:
                         # Check individual nodes for distributed sampler setup
                         if 'seed' in inputs or 'noise_seed' in inputs:
                             params['seed'] = inputs.get('seed', inputs.get('noise_seed', params['seed']))
@@ -290,29 +220,16 @@ class SimpleReadableMetadataMAXSG:
                     print(f"Error parsing ComfyUI generation params: {e}")
             
             # Try A1111/Forge format (PNG direct access)
-            if 'parameters' in img.info and any(v == 'N/A' for v in params.values()):
+            if 'parameters' in doc.info and any(v == 'N/A' for v in params.values()):
                 try:
-                    metadata_text = img.info['parameters']
-                    
-                    seed_match = re.search(r'Seed:\s*(\d+)', metadata_text)
-                    if seed_match:
-                        params['seed'] = int(seed_match.group(1))
-                    
-                    steps_match = re.search(r'Steps:\s*(\d+)', metadata_text)
-                    if steps_match:
-                        params['steps'] = int(steps_match.group(1))
-                    
-                    cfg_match = re.search(r'CFG scale:\s*([\d.]+)', metadata_text)
-                    if cfg_match:
-                        params['cfg'] = float(cfg_match.group(1))
-                    
-                    sampler_match = re.search(r'Sampler:\s*([^,\n]+)', metadata_text)
-                    if sampler_match:
-                        params['sampler'] = sampler_match.group(1).strip()
-                    
-                    scheduler_match = re.search(r'Schedule type:\s*([^,\n]+)', metadata_text)
-                    if scheduler_match:
-                        params['scheduler'] = scheduler_match.group(1).strip()
+                    # Settings line tokenized once by the document
+                    for key, setting, convert in WEBUI_GENERATION_PARAMS:
+                        value = doc.parameters.get(setting)
+                        if value:
+                            try:
+                                params[key] = convert(value)
+                            except ValueError:
+                                pass
                 
                 except Exception as e:
                     print(f"Error parsing A1111 generation params: {e}")
@@ -322,35 +239,51 @@ class SimpleReadableMetadataMAXSG:
         
         return params
     
-    def load_analyze_extract(self, image, show_info="on", emoji_in_readable_text=True):
+    def load_analyze_extract(self, image, show_info="on", emoji_in_readable_text=True, decode_pixels="auto", prompt=None, unique_id=None):
 
         """Combined function that loads image, analyzes properties, and extracts metadata"""
+        return self.analyze(image, show_info, emoji_in_readable_text, decode_pixels, prompt, unique_id)[0]
+
+    def analyze(self, image, show_info="on", emoji_in_readable_text=True, decode_pixels="auto", prompt=None, unique_id=None):
+        """(node result, model name) of load_analyze_extract, for callers that also need the model"""
         try:
             image_path = folder_paths.get_annotated_filepath(image)
-            img = Image.open(image_path)
-            
-            model_name = self.extract_model_name(img)
-            gen_params = self.extract_generation_params(img)
-            
-            img = ImageOps.exif_transpose(img)
-            metadata_raw = self.extract_raw_metadata(img)
-            
-            if img.mode == 'I':
-                img = img.point(lambda i: i * (1 / 255))
-            
-            original_img = img
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            image_tensor = torch.from_numpy(np.array(img).astype(np.float32) / 255.0).unsqueeze(0)
-            
-            if 'A' in original_img.getbands():
-                mask = np.array(original_img.getchannel('A')).astype(np.float32) / 255.0
-                mask = 1. - torch.from_numpy(mask)
-            else:
-                mask = torch.zeros((original_img.size[1], original_img.size[0]), dtype=torch.float32, device="cpu")
-            
-            batch_size, height, width, channels = image_tensor.shape
+            decode = self.should_decode_pixels(decode_pixels, prompt, unique_id)
+
+            # Same file content and options give the same outputs, reuse them without decoding or parsing again
+            cache_key = ("SimpleReadableMetadataMAXSG", image_path, file_fingerprint(image_path), emoji_in_readable_text, show_info, decode)
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+            # Metadata comes straight from the PNG/WebP chunks, PIL is only the fallback for other formats
+            header = read_image_header(image_path)
+            # PIL is only needed to decode the pixels, or for the metadata of formats without a header reader
+            img = Image.open(image_path) if header is None or decode else None
+            try:
+                # Parsed once here, every later stage reads from this document
+                doc = MetadataDocument.from_image(header if header is not None else img)
+                
+                model_name = self.extract_model_name(doc)
+                gen_params = self.extract_generation_params(doc)
+                metadata_raw = doc.raw
+                
+                if decode:
+                    image_tensor, mask = image_to_tensors(img, image_path, header)
+                    
+                    batch_size, height, width, channels = image_tensor.shape
+                else:
+                    # Metadata-only: nothing reads image/mask, so take the size from the header and skip the decode
+                    source = header if header is not None else img
+                    width, height = source.size
+                    if source.getexif().get(0x0112) in (5, 6, 7, 8):
+                        # Same axis swap exif_transpose would apply
+                        width, height = height, width
+                    image_tensor = torch.zeros((1, 64, 64, 3), dtype=torch.float32, device="cpu")
+                    mask = torch.zeros((64, 64), dtype=torch.float32, device="cpu")
+            finally:
+                if img is not None:
+                    img.close()
             total_pixels = width * height
             resolution_mp = float(total_pixels / 1_000_000)
             
@@ -429,7 +362,7 @@ class SimpleReadableMetadataMAXSG:
             line6 = f"Sampler: {gen_params['sampler']} | Scheduler: {gen_params['scheduler']}"
             lines.append(line6)
             
-            Simple_Readable_Metadata, positive, negative = self.parse_metadata(metadata_raw, emoji_in_readable_text)
+            Simple_Readable_Metadata, positive, negative = self.parse_metadata(doc, emoji_in_readable_text)
             
             seed_value = gen_params['seed']
             if seed_value == 'N/A' or seed_value is None:
@@ -459,20 +392,20 @@ class SimpleReadableMetadataMAXSG:
                     cfg_float = 0.0
             
             sampler_str = gen_params['sampler']
-            sampler_converted = self.convert_sampler_string_to_comfyui_type(sampler_str)
-            
             scheduler_str = gen_params['scheduler']
-            scheduler_converted = self.convert_scheduler_string_to_comfyui_type(scheduler_str)
+            sampler_converted, scheduler_converted = sampler_table.resolve(self.safely_process_value(sampler_str), self.safely_process_value(scheduler_str))
             
         # Check if show_info is "off"
             if show_info == "off":
                 lines = []
 
-            return {
+            result = {
                 "ui": {"text": lines},
                 "result": (Simple_Readable_Metadata, image_tensor, mask, width, height, width_ratio, height_ratio, resolution_mp,
                         metadata_raw, positive, negative, seed_int, steps_int, cfg_float, sampler_converted, scheduler_converted, file_name_text_without_ext)
             }
+            result_cache.put(cache_key, (result, model_name))
+            return result, model_name
 
 
 
@@ -480,105 +413,26 @@ class SimpleReadableMetadataMAXSG:
             print(f"Error in load_analyze_extract: {e}")
             raise
     
-    def extract_raw_metadata(self, img):
-        """Extract raw metadata in format compatible with conversion - supports PNG and WebP"""
-        png_info = img.info if hasattr(img, 'info') else {}
-        if not png_info:
-            return "No metadata found in image"
-        
-        # Check for ComfyUI prompt metadata (works for PNG)
-        if "prompt" in png_info:
-            try:
-                prompt_data = png_info["prompt"]
-                if isinstance(prompt_data, str):
-                    json.loads(prompt_data)  # Validate JSON
-                    return prompt_data
-                else:
-                    return json.dumps(prompt_data)
-            except:
-                pass
-        
-        # Check for A1111/Forge parameters (works for PNG)
-        if "parameters" in png_info:
-            return png_info["parameters"]
-        
-        # Check for EXIF data in WebP
-        if "exif" in png_info:
-            try:
-                exif_bytes = png_info["exif"]
-                if isinstance(exif_bytes, bytes):
-                    # Decode the EXIF bytes to string
-                    exif_string = exif_bytes.decode('utf-8', errors='ignore')
-                    
-                    # Look for prompt: or workflow: markers in the EXIF data
-                    if "prompt:" in exif_string:
-                        # Extract the JSON after "prompt:"
-                        prompt_start = exif_string.find("prompt:")
-                        if prompt_start != -1:
-                            # Extract everything after "prompt:"
-                            prompt_data = exif_string[prompt_start + 7:]  # Skip "prompt:"
-                            
-                            # Find the end of the JSON (look for the null terminator or end)
-                            # Try to extract valid JSON
-                            try:
-                                # Remove any trailing null bytes or extra data
-                                prompt_data = prompt_data.split('\x00')[0]
-                                # Validate it's proper JSON
-                                json.loads(prompt_data)
-                                return prompt_data
-                            except:
-                                pass
-                    
-                    # If no valid prompt found, try to extract workflow
-                    if "workflow:" in exif_string:
-                        workflow_start = exif_string.find("workflow:")
-                        if workflow_start != -1:
-                            workflow_data = exif_string[workflow_start + 9:]  # Skip "workflow:"
-                            try:
-                                workflow_data = workflow_data.split('\x00')[0]
-                                workflow_json = json.loads(workflow_data)
-                                # Return workflow as a fallback
-                                return json.dumps({"workflow": workflow_json})
-                            except:
-                                pass
-            
-            except Exception as e:
-                print(f"Error parsing WebP EXIF metadata: {e}")
-        
-        # Fallback: Try using PIL's getexif() method for standard EXIF tags
-        if hasattr(img, 'getexif'):
-            try:
-                exif_data = img.getexif()
-                if exif_data:
-                    # Try to find UserComment tag (0x9286)
-                    user_comment = exif_data.get(0x9286)
-                    if user_comment:
-                        if isinstance(user_comment, bytes):
-                            user_comment = user_comment.decode('utf-8', errors='ignore')
-                        try:
-                            json.loads(user_comment)
-                            return user_comment
-                        except:
-                            return user_comment
-            except Exception as e:
-                print(f"Error reading EXIF via getexif(): {e}")
-        
-        return "No ComfyUI or WebUI format metadata found. Image may be from a different source."
+    def as_metadata_document(self, value):
+        """Accept a MetadataDocument or any raw metadata value (str, bytes, dict, node reference...)"""
+        if isinstance(value, (MetadataDocument, bytes, bytearray)):
+            return MetadataDocument.coerce(value)
+        return MetadataDocument(self.safely_process_value(value))
     
     def parse_metadata(self, metadata_raw, include_emojis=True):
         """Main parsing function that detects format and routes to appropriate converter"""
         try:
-            metadata_raw = self.safely_process_value(metadata_raw)
-            format_type = self.detect_format(metadata_raw)
+            doc = self.as_metadata_document(metadata_raw)
+            format_type = doc.format
             
             if format_type == "comfyui":
-                Simple_Readable_Metadata = self.parse_comfyui_format(metadata_raw, include_emojis, image_path=getattr(self, '_current_image_path', None), file_size_mb=getattr(self, '_current_file_size', None))
+                Simple_Readable_Metadata = self.parse_comfyui_format(doc, include_emojis, image_path=getattr(self, '_current_image_path', None), file_size_mb=getattr(self, '_current_file_size', None))
             elif format_type == "webui":
-                Simple_Readable_Metadata = self.parse_webui_format(metadata_raw, include_emojis)
+                Simple_Readable_Metadata = self.parse_webui_format(doc, include_emojis)
             else:
                 Simple_Readable_Metadata = "Unable to detect metadata format."
             
-            positive, negative = self.extract_individual_params(metadata_raw, format_type)
+            positive, negative = self.extract_individual_params(doc, format_type)
             positive = self.safely_convert_to_string(positive)
             negative = self.safely_convert_to_string(negative)
             
@@ -591,20 +445,7 @@ class SimpleReadableMetadataMAXSG:
     def detect_format(self, text):
         """Detect whether the input is ComfyUI JSON or WebUI text format"""
         try:
-            text = self.safely_process_value(text).strip()
-            
-            if text.startswith("Prompt: "):
-                text = text[8:]
-            
-            try:
-                json.loads(text)
-                return "comfyui"
-            except json.JSONDecodeError:
-                pass
-            
-            if re.search(r'Steps:\s*\d+', text) or re.search(r'Sampler:\s*\w+', text):
-                return "webui"
-        
+            return self.as_metadata_document(text).format
         except Exception as e:
             print(f"Error detecting format: {e}")
         
@@ -613,7 +454,7 @@ class SimpleReadableMetadataMAXSG:
     def parse_webui_format(self, text, include_emojis=True):
         """Parse A1111/WebUI Forge text format metadata"""
         try:
-            text = self.safely_process_value(text)
+            parameters = self.as_metadata_document(text).parameters
             
             emoji_map = {
                 "sampling": "🎯",
@@ -627,112 +468,59 @@ class SimpleReadableMetadataMAXSG:
             output = []
             output.append("=== WebUI Forge/A1111 Generation Parameters ===\n")
             
-            lines = text.strip().split('\n')
-            positive_prompt = ""
-            negative_prompt = ""
-            metadata_line = ""
-            
-            for i, line in enumerate(lines):
-                if line.startswith("Negative prompt:"):
-                    negative_prompt = line.replace("Negative prompt:", "").strip()
-                elif re.search(r'Steps:\s*\d+', line):
-                    metadata_line = line
-                elif not metadata_line and not line.startswith("Negative prompt:"):
-                    positive_prompt += line + " "
-            
-            positive_prompt = positive_prompt.strip()
+            positive_prompt = parameters.positive
+            negative_prompt = parameters.negative
             
             output.append(f"{emoji_map['prompts']} PROMPTS: |If empty, Check fail-safe below|\n")
-            output.append(f"  Positive:\n           {positive_prompt if positive_prompt else '(empty)'}\n")
+            output.append(f"  Positive:\n{textwrap.indent(positive_prompt if positive_prompt else '(empty)', PROMPT_INDENT)}\n")
             if negative_prompt:
-                output.append(f"  Negative:\n           {negative_prompt}")
+                output.append(f"  Negative:\n{textwrap.indent(negative_prompt, PROMPT_INDENT)}")
             output.append("")
             
-            if metadata_line:
-                params = {}
-                patterns = {
-                    'steps': r'Steps:\s*(\d+)',
-                    'sampler': r'Sampler:\s*([^,]+)',
-                    'cfg': r'CFG scale:\s*([\d.]+)',
-                    'seed': r'Seed:\s*(\d+)',
-                    'size': r'Size:\s*(\d+x\d+)',
-                    'model': r'Model:\s*([^,]+)',
-                    'model_hash': r'Model hash:\s*([^,]+)',
-                    'denoising': r'Denoising strength:\s*([\d.]+)',
-                    'clip_skip': r'Clip skip:\s*(\d+)',
-                    'scheduler': r'Schedule type:\s*([^,]+)',
-                    'version': r'Version:\s*([^,]+)',
-                }
-                
-                for key, pattern in patterns.items():
-                    match = re.search(pattern, metadata_line)
-                    if match:
-                        params[key] = match.group(1).strip()
+            if parameters:
+                params = parameters.settings
                 
                 output.append(f"{emoji_map['sampling']} SAMPLING SETTINGS:")
-                if 'seed' in params:
-                    output.append(f"  Seed: {params['seed']}")
-                if 'steps' in params:
-                    output.append(f"  Steps: {params['steps']}")
-                if 'cfg' in params:
-                    output.append(f"  CFG Scale: {params['cfg']}")
-                if 'sampler' in params:
-                    output.append(f"  Sampler: {params['sampler']}")
-                if 'scheduler' in params:
-                    output.append(f"  Scheduler: {params['scheduler']}")
-                if 'denoising' in params:
-                    output.append(f"  Denoise: {params['denoising']}")
+                if 'Seed' in params:
+                    output.append(f"  Seed: {params['Seed']}")
+                if 'Steps' in params:
+                    output.append(f"  Steps: {params['Steps']}")
+                if 'CFG scale' in params:
+                    output.append(f"  CFG Scale: {params['CFG scale']}")
+                if 'Sampler' in params:
+                    output.append(f"  Sampler: {params['Sampler']}")
+                if 'Schedule type' in params:
+                    output.append(f"  Scheduler: {params['Schedule type']}")
+                if 'Denoising strength' in params:
+                    output.append(f"  Denoise: {params['Denoising strength']}")
                 output.append("")
                 
-                if 'size' in params:
+                if 'Size' in params:
                     output.append(f"{emoji_map['dimensions']} IMAGE DIMENSIONS:")
-                    output.append(f"  Resolution: {params['size']}")
+                    output.append(f"  Resolution: {params['Size']}")
                     output.append("")
                 
-                if 'model' in params or 'model_hash' in params:
+                if 'Model' in params or 'Model hash' in params:
                     output.append(f"{emoji_map['models']} MODELS & COMPONENTS:")
-                    if 'model' in params:
-                        output.append(f"  Checkpoint: {params['model']}")
-                    if 'model_hash' in params:
-                        output.append(f"  Model Hash: {params['model_hash']}")
+                    if 'Model' in params:
+                        output.append(f"  Checkpoint: {params['Model']}")
+                    if 'Model hash' in params:
+                        output.append(f"  Model Hash: {params['Model hash']}")
                     output.append("")
                 
-                lora_pattern = r'<lora:([^:]+):([^>]+)>'
-                lora_matches = re.findall(lora_pattern, text)
-                if lora_matches:
+                if parameters.loras:
                     output.append(f"{emoji_map['lora']} LORA MODELS:")
-                    for lora_name, lora_strength in lora_matches:
+                    for lora_name, lora_strength in parameters.loras:
                         output.append(f"  {lora_name} (Strength: {lora_strength})")
                     output.append("")
                 
-                if metadata_line:
-                    params_check = {}
-                    patterns = {
-                        'steps': r'Steps:\s*(\d+)',
-                        'sampler': r'Sampler:\s*([^,]+)',
-                        'cfg': r'CFG scale:\s*([\d.]+)',
-                        'seed': r'Seed:\s*(\d+)',
-                        'size': r'Size:\s*(\d+x\d+)',
-                        'model': r'Model:\s*([^,]+)',
-                        'model_hash': r'Model hash:\s*([^,]+)',
-                        'denoising': r'Denoising strength:\s*([\d.]+)',
-                        'clip_skip': r'Clip skip:\s*(\d+)',
-                        'scheduler': r'Schedule type:\s*([^,]+)',
-                        'version': r'Version:\s*([^,]+)',
-                    }
-                    
-                    for key, pattern in patterns.items():
-                        match = re.search(pattern, metadata_line)
-                        if match:
-                            params_check[key] = match.group(1).strip()
-                    
-                    if 'clip_skip' in params_check or 'version' in params_check:
-                        output.append(f"{emoji_map['advanced']} ADVANCED SETTINGS:")
-                        if 'clip_skip' in params_check:
-                            output.append(f"  Clip Skip: {params_check['clip_skip']}")
-                        if 'version' in params_check:
-                            output.append(f"  WebUI Version: {params_check['version']}")
-                        output.append("")
+                if 'Clip skip' in params or 'Version' in params:
+                    output.append(f"{emoji_map['advanced']} ADVANCED SETTINGS:")
+                    if 'Clip skip' in params:
+                        output.append(f"  Clip Skip: {params['Clip skip']}")
+                    if 'Version' in params:
+                        output.append(f"  WebUI Version: {params['Version']}")
+                    output.append("")
             
             return "\n".join(output)
         
@@ -761,15 +549,11 @@ class SimpleReadableMetadataMAXSG:
         
         """Parse ComfyUI JSON format metadata - FULL VERSION WITH LORA AND MODELS"""
         try:
-            metadata_raw = self.safely_process_value(metadata_raw)
-            clean_text = metadata_raw.strip()
-            if clean_text.startswith("Prompt: "):
-                clean_text = clean_text[8:]
-            
-            try:
-                data = json.loads(clean_text)
-            except json.JSONDecodeError as e:
-                return f"Error parsing JSON: {str(e)}"
+            doc = self.as_metadata_document(metadata_raw)
+            data = doc.data
+            graph = doc.graph
+            if data is None:
+                return f"Error parsing JSON: {str(doc.parse_error)}"
             
             output = []
             emoji_map = {
@@ -789,15 +573,13 @@ class SimpleReadableMetadataMAXSG:
             height = 'N/A'
             batch_size = 'N/A'
             
-            for node_id, node_data in data.items():
+            for node_id, node_data, class_type, inputs in graph.nodes_in("latent"):
                 try:
-                    class_type = node_data.get("class_type", "")
-                    if "LatentImage" in class_type or "EmptyLatent" in class_type:
-                        latent_data = node_data["inputs"]
-                        width = self.resolve_node_reference(data, latent_data.get('width', 'N/A'))
-                        height = self.resolve_node_reference(data, latent_data.get('height', 'N/A'))
-                        batch_size = latent_data.get('batch_size', 'N/A')
-                        break
+                    latent_data = node_data["inputs"]
+                    width = self.resolve_node_reference(graph, latent_data.get('width', 'N/A'))
+                    height = self.resolve_node_reference(graph, latent_data.get('height', 'N/A'))
+                    batch_size = latent_data.get('batch_size', 'N/A')
+                    break
                 except Exception as e:
                     print(f"Error processing latent: {e}")
                     continue
@@ -878,10 +660,7 @@ class SimpleReadableMetadataMAXSG:
             
             # Extract model name for display at the top
             model_name_display = "N/A"
-            for node_id, node_data in data.items():
-                class_type = node_data.get("class_type", "")
-                inputs = node_data.get("inputs", {})
-                
+            for node_id, node_data, class_type, inputs in graph.nodes_in("loader"):
                 if 'CheckpointLoader' in class_type and 'ckpt_name' in inputs:
                     model_name_display = inputs['ckpt_name']
                     break
@@ -910,51 +689,44 @@ class SimpleReadableMetadataMAXSG:
             }
             
             ksampler_data = None
-            for node_id, node_data in data.items():
+            for node_id, node_data, class_type, inputs in graph.nodes_in("ksampler"):
                 try:
-                    if node_data.get("class_type") == "KSampler":
-                        ksampler_data = node_data.get("inputs", {})
-                        sampling_params['seed'] = self.safely_process_value(ksampler_data.get('seed', 'N/A'))
-                        sampling_params['steps'] = self.safely_process_value(ksampler_data.get('steps', 'N/A'))
-                        sampling_params['cfg'] = self.safely_process_value(ksampler_data.get('cfg', 'N/A'))
-                        sampling_params['sampler'] = self.safely_process_value(ksampler_data.get('sampler_name', 'N/A'))
-                        sampling_params['scheduler'] = self.safely_process_value(ksampler_data.get('scheduler', 'N/A'))
-                        sampling_params['denoise'] = self.safely_process_value(ksampler_data.get('denoise', 'N/A'))
-                        break
+                    ksampler_data = inputs
+                    sampling_params['seed'] = self.safely_process_value(ksampler_data.get('seed', 'N/A'))
+                    sampling_params['steps'] = self.safely_process_value(ksampler_data.get('steps', 'N/A'))
+                    sampling_params['cfg'] = self.safely_process_value(ksampler_data.get('cfg', 'N/A'))
+                    sampling_params['sampler'] = self.safely_process_value(ksampler_data.get('sampler_name', 'N/A'))
+                    sampling_params['scheduler'] = self.safely_process_value(ksampler_data.get('scheduler', 'N/A'))
+                    sampling_params['denoise'] = self.safely_process_value(ksampler_data.get('denoise', 'N/A'))
+                    break
                 except Exception as e:
                     print(f"Error processing KSampler: {e}")
                     continue
             
+            # If no KSampler found, look for distributed nodes
             if not ksampler_data:
-                for node_id, node_data in data.items():
-                    try:
-                        class_type = node_data.get("class_type", "")
-                        inputs = node_data.get("inputs", {})
-                        
-                        if "Noise" in class_type and "noise_seed" in inputs:
-                            sampling_params['seed'] = self.safely_process_value(inputs.get('noise_seed', 'N/A'))
-                        elif "Noise" in class_type and "seed" in inputs:
-                            sampling_params['seed'] = self.safely_process_value(inputs.get('seed', 'N/A'))
-                        
-                        if "Scheduler" in class_type:
-                            if 'steps' in inputs:
-                                sampling_params['steps'] = self.safely_process_value(inputs.get('steps', 'N/A'))
-                            if 'scheduler' in inputs:
-                                sampling_params['scheduler'] = self.safely_process_value(inputs.get('scheduler', 'N/A'))
-                            if 'denoise' in inputs:
-                                sampling_params['denoise'] = self.safely_process_value(inputs.get('denoise', 'N/A'))
-                        
-                        if "CFG" in class_type and 'cfg' in inputs:
-                            sampling_params['cfg'] = self.safely_process_value(inputs.get('cfg', 'N/A'))
-                        
-                        if "KSamplerSelect" in class_type and 'sampler_name' in inputs:
-                            sampling_params['sampler'] = self.safely_process_value(inputs.get('sampler_name', 'N/A'))
-                        elif "Sampler" in class_type and 'sampler_name' in inputs:
-                            sampling_params['sampler'] = self.safely_process_value(inputs.get('sampler_name', 'N/A'))
-                    
-                    except Exception as e:
-                        print(f"Error processing sampling params: {e}")
-                        continue
+                for node_id, node_data, class_type, inputs in graph.nodes_in("noise"):
+                    if "noise_seed" in inputs:
+                        sampling_params['seed'] = self.safely_process_value(inputs.get('noise_seed', 'N/A'))
+                    elif "seed" in inputs:
+                        sampling_params['seed'] = self.safely_process_value(inputs.get('seed', 'N/A'))
+                
+                for node_id, node_data, class_type, inputs in graph.nodes_in("scheduler"):
+                    if 'steps' in inputs:
+                        sampling_params['steps'] = self.safely_process_value(inputs.get('steps', 'N/A'))
+                    if 'scheduler' in inputs:
+                        sampling_params['scheduler'] = self.safely_process_value(inputs.get('scheduler', 'N/A'))
+                    if 'denoise' in inputs:
+                        sampling_params['denoise'] = self.safely_process_value(inputs.get('denoise', 'N/A'))
+                
+                for node_id, node_data, class_type, inputs in graph.nodes_in("cfg"):
+                    if 'cfg' in inputs:
+                        sampling_params['cfg'] = self.safely_process_value(inputs.get('cfg', 'N/A'))
+                
+                # Covers KSamplerSelect as well as other *Sampler* nodes
+                for node_id, node_data, class_type, inputs in graph.nodes_in("sampler"):
+                    if 'sampler_name' in inputs:
+                        sampling_params['sampler'] = self.safely_process_value(inputs.get('sampler_name', 'N/A'))
             
             if any(v != 'N/A' for v in sampling_params.values()):
                 output.append(f"{emoji_map['sampling']} SAMPLING SETTINGS:")
@@ -966,24 +738,21 @@ class SimpleReadableMetadataMAXSG:
                 output.append(f"  Denoise     : {sampling_params['denoise']}")
                 output.append("")
             
-            # Extract prompts
-            positive_prompt = ""
-            negative_prompt = ""
+            # Extract prompts by following the samplers' positive/negative links
+            positive_prompt, negative_prompt = graph.sampler_prompts()
+            linked_prompts = bool(positive_prompt or negative_prompt)
             flux_prompts = {}
             guidance = None
             
             positive_candidates = []
             negative_candidates = []
             
-            for node_id, node_data in data.items():
+            for node_id, node_data, class_type, inputs in graph.nodes_in("text_encode"):
                 try:
-                    class_type = node_data.get("class_type", "")
-                    inputs = node_data.get("inputs", {})
-                    
                     if class_type == "CLIPTextEncodeFlux":
                         if isinstance(inputs, dict):
-                            clip_l = inputs.get("clip_l", "")
-                            t5xxl = inputs.get("t5xxl", "")
+                            clip_l = graph.resolve_value(inputs.get("clip_l", ""))
+                            t5xxl = graph.resolve_value(inputs.get("t5xxl", ""))
                             
                             if isinstance(clip_l, dict):
                                 if clip_l.get('on', True):
@@ -1002,11 +771,12 @@ class SimpleReadableMetadataMAXSG:
                                 flux_prompts["t5xxl"] = self.safely_process_value(t5xxl)
                                 guidance = inputs.get("guidance")
                     
-                    elif "CLIPTextEncode" in class_type or "TextEncode" in class_type or "Prompt" in class_type:
+                    # No sampler links could be followed: guess polarity from titles and content
+                    elif not linked_prompts:
                         title = node_data.get("_meta", {}).get("title", "").lower()
-                        text_value = inputs.get("text", "")
+                        text_value = graph.resolve_value(inputs.get("text", ""))
                         
-                        if self.is_node_reference(text_value):
+                        if text_value is None:
                             continue
                         
                         text_value = self.safely_process_value(text_value)
@@ -1052,112 +822,15 @@ class SimpleReadableMetadataMAXSG:
                 if guidance is not None:
                     output.append(f"  Guidance: {guidance}")
             else:
-                output.append(f"  Positive:\n           {positive_prompt if positive_prompt else '(empty)'}\n")
+                output.append(f"  Positive:\n{textwrap.indent(positive_prompt if positive_prompt else '(empty)', PROMPT_INDENT)}\n")
                 if negative_prompt:
-                    output.append(f"  Negative:\n           {negative_prompt}")
+                    output.append(f"  Negative:\n{textwrap.indent(negative_prompt, PROMPT_INDENT)}")
                 output.append("")
             
             # Extract LoRA models
-            loras = []
-            lora_files = set()
-            processed_keys = set()
-            
-            for node_id, node_data in data.items():
-                try:
-                    class_type = node_data.get("class_type", "")
-                    inputs = node_data.get("inputs", {})
-                    
-                    if "lora" in class_type.lower():
-                        for key in inputs:
-                            node_key = f"{node_id}_{key}"
-                            if node_key in processed_keys:
-                                continue
-                            
-                            key_lower = key.lower()
-                            if 'lora' in key_lower and inputs.get(key) not in [None, "", "None"]:
-                                lora_value = inputs.get(key, "")
-                                
-                                if isinstance(lora_value, dict):
-                                    if 'on' in lora_value and not lora_value.get('on'):
-                                        processed_keys.add(node_key)
-                                        continue
-                                    
-                                    if 'lora' in lora_value:
-                                        actual_lora_name = lora_value.get('lora', '')
-                                        actual_strength = lora_value.get('strength', 1.0)
-                                        
-                                        if actual_lora_name and actual_lora_name != "None":
-                                            display_name = os.path.basename(self.safely_process_value(actual_lora_name))
-                                            loras.append(f"  {display_name} (Strength: {actual_strength})")
-                                            lora_files.add(actual_lora_name)
-                                        processed_keys.add(node_key)
-                                        continue
-                                
-                                if isinstance(lora_value, (int, float)):
-                                    continue
-                                
-                                if isinstance(lora_value, str) and lora_value.replace('.', '').replace('-', '').replace('_', '').isdigit():
-                                    continue
-                                
-                                if isinstance(lora_value, dict) and lora_value.get('type'):
-                                    processed_keys.add(node_key)
-                                    continue
-                                
-                                strength = 1.0
-                                
-                                if '_' in key:
-                                    parts = key.rsplit('_', 1)
-                                    if len(parts) == 2:
-                                        prefix, suffix = parts
-                                        strength_patterns = [
-                                            f"strength_{suffix}",
-                                            f"strength{suffix}",
-                                            f"{prefix}_strength_{suffix}",
-                                            f"str_{suffix}",
-                                        ]
-                                        for pattern in strength_patterns:
-                                            if pattern in inputs:
-                                                strength = inputs.get(pattern, 1.0)
-                                                processed_keys.add(pattern)
-                                                break
-                                
-                                if strength == 1.0:
-                                    strength_patterns = [
-                                        "strength_model",
-                                        "strength",
-                                        "model_strength",
-                                        "lora_strength"
-                                    ]
-                                    for pattern in strength_patterns:
-                                        if pattern in inputs:
-                                            strength = inputs.get(pattern, 1.0)
-                                            processed_keys.add(pattern)
-                                            break
-                                
-                                numbers = re.findall(r'\d+', key)
-                                if numbers and strength == 1.0:
-                                    num = numbers[-1]
-                                    possible_keys = [
-                                        f"strength_{num}",
-                                        f"strength{num}",
-                                        f"str_{num}",
-                                        f"lora_strength_{num}"
-                                    ]
-                                    for possible_key in possible_keys:
-                                        if possible_key in inputs:
-                                            strength = inputs.get(possible_key, 1.0)
-                                            processed_keys.add(possible_key)
-                                            break
-                                
-                                if lora_value and lora_value != "None":
-                                    display_name = os.path.basename(self.safely_process_value(lora_value))
-                                    loras.append(f"  {display_name} (Strength: {strength})")
-                                    lora_files.add(lora_value)
-                                    processed_keys.add(node_key)
-                
-                except Exception as e:
-                    print(f"Error processing LoRA: {e}")
-                    continue
+            lora_entries = self.extract_loras(graph)
+            loras = [f"  {os.path.basename(self.safely_process_value(name))} (Strength: {strength})" for name, strength in lora_entries]
+            lora_files = {name for name, _ in lora_entries if isinstance(name, str)}
             
             # Extract models
             models = {}
@@ -1173,104 +846,98 @@ class SimpleReadableMetadataMAXSG:
                 'hypernetwork': ['hypernetwork_name', 'hypernetwork'],
             }
             
-            for node_id, node_data in data.items():
+            # LoRA nodes are excluded by the "model" category
+            for node_id, node_data, class_type, inputs in graph.nodes_in("model"):
                 try:
-                    class_type = node_data.get("class_type", "")
-                    inputs = node_data.get("inputs", {})
-                    
-                    if "lora" in class_type.lower():
-                        continue
-                    
-                    if "loader" in class_type.lower() or "load" in class_type.lower() or any(keyword in class_type.lower() for keyword in ['checkpoint', 'unet', 'clip', 'vae', 'model']):
-                        for model_type, param_names in model_keywords.items():
-                            for param_name in param_names:
-                                if param_name in inputs:
-                                    model_value = inputs.get(param_name)
-                                    
-                                    if isinstance(model_value, list) and len(model_value) == 2:
-                                        ref_node_id = str(model_value[0])
-                                        if ref_node_id in data:
-                                            ref_node = data[ref_node_id]
-                                            ref_inputs = ref_node.get("inputs", {})
-                                            for ref_param in param_names:
-                                                if ref_param in ref_inputs:
-                                                    model_value = ref_inputs.get(ref_param)
-                                                    break
-                                    
-                                    if isinstance(model_value, dict):
-                                        if 'on' in model_value and not model_value.get('on'):
-                                            continue
-                                        model_value = model_value.get('model', model_value.get('name', model_value.get('value', '')))
-                                    
-                                    if isinstance(model_value, list):
-                                        continue
-                                    
-                                    if model_value in lora_files:
-                                        continue
-                                    
-                                    if model_value and model_value != "None":
-                                        display_type = model_type.upper()
-                                        if model_type == 'clip':
-                                            if param_name == 'clip_name1':
-                                                display_type = "CLIP-1"
-                                            elif param_name == 'clip_name2':
-                                                display_type = "CLIP-2"
-                                            elif param_name.startswith('clip_name') and param_name[-1].isdigit():
-                                                num = param_name.replace('clip_name', '')
-                                                display_type = f"CLIP-{num}"
-                                            else:
-                                                display_type = "CLIP"
-                                        
-                                        if display_type not in models:
-                                            models[display_type] = self.safely_process_value(model_value)
-                                        
-                                        if model_type != 'clip':
-                                            break
-                        
-                        for key, value in inputs.items():
-                            try:
-                                if key in ['model', 'clip', 'vae']:
-                                    continue
+                    for model_type, param_names in model_keywords.items():
+                        for param_name in param_names:
+                            if param_name in inputs:
+                                model_value = inputs.get(param_name)
                                 
-                                if isinstance(value, list) and len(value) == 2:
-                                    continue
+                                if isinstance(model_value, list) and len(model_value) == 2:
+                                    ref_node_id = str(model_value[0])
+                                    if ref_node_id in data:
+                                        ref_node = data[ref_node_id]
+                                        ref_inputs = ref_node.get("inputs", {})
+                                        for ref_param in param_names:
+                                            if ref_param in ref_inputs:
+                                                model_value = ref_inputs.get(ref_param)
+                                                break
                                 
-                                if isinstance(value, dict):
-                                    if 'on' in value and not value.get('on'):
+                                if isinstance(model_value, dict):
+                                    if 'on' in model_value and not model_value.get('on'):
                                         continue
-                                    value = value.get('model', value.get('name', value.get('value', '')))
+                                    model_value = model_value.get('model', model_value.get('name', model_value.get('value', '')))
                                 
-                                if value in lora_files:
+                                if isinstance(model_value, list):
                                     continue
                                 
-                                value_str = self.safely_process_value(value)
+                                if model_value in lora_files:
+                                    continue
                                 
-                                if isinstance(value_str, str) and any(ext in value_str.lower() for ext in ['.safetensors', '.ckpt', '.pt', '.pth', '.bin', '.gguf']):
-                                    key_lower = key.lower()
-                                    inferred_type = "Model"
+                                if model_value and model_value != "None":
+                                    display_type = model_type.upper()
+                                    if model_type == 'clip':
+                                        if param_name == 'clip_name1':
+                                            display_type = "CLIP-1"
+                                        elif param_name == 'clip_name2':
+                                            display_type = "CLIP-2"
+                                        elif param_name.startswith('clip_name') and param_name[-1].isdigit():
+                                            num = param_name.replace('clip_name', '')
+                                            display_type = f"CLIP-{num}"
+                                        else:
+                                            display_type = "CLIP"
                                     
-                                    if 'unet' in key_lower or 'unet' in class_type.lower():
-                                        inferred_type = "UNET"
-                                    elif 'vae' in key_lower or 'vae' in class_type.lower():
-                                        inferred_type = "VAE"
-                                    elif 'clip' in key_lower or 'clip' in class_type.lower():
-                                        inferred_type = "CLIP"
-                                    elif 't5' in key_lower:
-                                        inferred_type = "T5"
-                                    elif 'checkpoint' in key_lower or 'ckpt' in key_lower:
-                                        inferred_type = "Checkpoint"
-                                    elif 'control' in key_lower:
-                                        inferred_type = "ControlNet"
-                                    elif 'upscale' in key_lower:
-                                        inferred_type = "Upscaler"
+                                    if display_type not in models:
+                                        models[display_type] = self.safely_process_value(model_value)
                                     
-                                    if inferred_type not in models:
-                                        models[inferred_type] = value_str
+                                    if model_type != 'clip':
+                                        break
+                    
+                    for key, value in inputs.items():
+                        try:
+                            if key in ['model', 'clip', 'vae']:
+                                continue
                             
-                            except Exception as e:
-                                print(f"Error processing model value: {e}")
+                            if isinstance(value, list) and len(value) == 2:
                                 continue
-                
+                            
+                            if isinstance(value, dict):
+                                if 'on' in value and not value.get('on'):
+                                    continue
+                                value = value.get('model', value.get('name', value.get('value', '')))
+                            
+                            if value in lora_files:
+                                continue
+                            
+                            value_str = self.safely_process_value(value)
+                            
+                            if isinstance(value_str, str) and any(ext in value_str.lower() for ext in ['.safetensors', '.ckpt', '.pt', '.pth', '.bin', '.gguf']):
+                                key_lower = key.lower()
+                                inferred_type = "Model"
+                                
+                                if 'unet' in key_lower or 'unet' in class_type.lower():
+                                    inferred_type = "UNET"
+                                elif 'vae' in key_lower or 'vae' in class_type.lower():
+                                    inferred_type = "VAE"
+                                elif 'clip' in key_lower or 'clip' in class_type.lower():
+                                    inferred_type = "CLIP"
+                                elif 't5' in key_lower:
+                                    inferred_type = "T5"
+                                elif 'checkpoint' in key_lower or 'ckpt' in key_lower:
+                                    inferred_type = "Checkpoint"
+                                elif 'control' in key_lower:
+                                    inferred_type = "ControlNet"
+                                elif 'upscale' in key_lower:
+                                    inferred_type = "Upscaler"
+                                
+                                if inferred_type not in models:
+                                    models[inferred_type] = value_str
+                        
+                        except Exception as e:
+                            print(f"Error processing model value: {e}")
+                            continue
+            
                 except Exception as e:
                     print(f"Error processing model node: {e}")
                     continue
@@ -1306,7 +973,7 @@ class SimpleReadableMetadataMAXSG:
             output.append("=== ALL DETECTED TEXT IN WORKFLOW ===")
             output.append("(Fail-safe dump of all text-like values)")
             output.append("")
-            all_text_dump = self.extract_all_text_content(data)
+            all_text_dump = self.extract_all_text_content(graph)
             output.append(all_text_dump)               
             
             return "\n".join(output)
@@ -1315,14 +982,108 @@ class SimpleReadableMetadataMAXSG:
             print(f"Error in parse_comfyui_format: {e}")
             return f"Error processing parameters: {str(e)}"
     
-    def resolve_node_reference(self, data, reference):
-        """Helper function to resolve node references like ["124", 0]"""
+    def extract_loras(self, graph):
+        """Enabled LoRAs of a prompt graph as (lora file, strength) pairs, in graph order"""
+        loras = []
+        processed_keys = set()
+        
+        for node_id, node_data, class_type, inputs in graph.nodes_in("lora"):
+            try:
+                for key in inputs:
+                    node_key = f"{node_id}_{key}"
+                    if node_key in processed_keys:
+                        continue
+                    
+                    key_lower = key.lower()
+                    if 'lora' in key_lower and inputs.get(key) not in [None, "", "None"]:
+                        lora_value = inputs.get(key, "")
+                        
+                        if isinstance(lora_value, dict):
+                            if 'on' in lora_value and not lora_value.get('on'):
+                                processed_keys.add(node_key)
+                                continue
+                            
+                            if 'lora' in lora_value:
+                                actual_lora_name = lora_value.get('lora', '')
+                                actual_strength = lora_value.get('strength', 1.0)
+                                
+                                if actual_lora_name and actual_lora_name != "None":
+                                    loras.append((actual_lora_name, actual_strength))
+                                processed_keys.add(node_key)
+                                continue
+                        
+                        if isinstance(lora_value, (int, float)):
+                            continue
+                        
+                        if isinstance(lora_value, str) and lora_value.replace('.', '').replace('-', '').replace('_', '').isdigit():
+                            continue
+                        
+                        if isinstance(lora_value, dict) and lora_value.get('type'):
+                            processed_keys.add(node_key)
+                            continue
+                        
+                        strength = 1.0
+                        
+                        if '_' in key:
+                            parts = key.rsplit('_', 1)
+                            if len(parts) == 2:
+                                prefix, suffix = parts
+                                strength_patterns = [
+                                    f"strength_{suffix}",
+                                    f"strength{suffix}",
+                                    f"{prefix}_strength_{suffix}",
+                                    f"str_{suffix}",
+                                ]
+                                for pattern in strength_patterns:
+                                    if pattern in inputs:
+                                        strength = inputs.get(pattern, 1.0)
+                                        processed_keys.add(pattern)
+                                        break
+                        
+                        if strength == 1.0:
+                            strength_patterns = [
+                                "strength_model",
+                                "strength",
+                                "model_strength",
+                                "lora_strength"
+                            ]
+                            for pattern in strength_patterns:
+                                if pattern in inputs:
+                                    strength = inputs.get(pattern, 1.0)
+                                    processed_keys.add(pattern)
+                                    break
+                        
+                        numbers = re.findall(r'\d+', key)
+                        if numbers and strength == 1.0:
+                            num = numbers[-1]
+                            possible_keys = [
+                                f"strength_{num}",
+                                f"strength{num}",
+                                f"str_{num}",
+                                f"lora_strength_{num}"
+                            ]
+                            for possible_key in possible_keys:
+                                if possible_key in inputs:
+                                    strength = inputs.get(possible_key, 1.0)
+                                    processed_keys.add(possible_key)
+                                    break
+                        
+                        if lora_value and lora_value != "None":
+                            loras.append((lora_value, strength))
+                            processed_keys.add(node_key)
+        
+            except Exception as e:
+                print(f"Error processing LoRA: {e}")
+                continue
+        
+        return loras
+    
+    def resolve_node_reference(self, graph, reference):
+        """Helper function to resolve node references like ["124", 0] by following links through the prompt graph"""
         if isinstance(reference, list) and len(reference) == 2:
-            node_id = str(reference[0])
-            if node_id in data:
-                node_data = data[node_id]
-                if node_data.get("class_type") == "easy int":
-                    return node_data["inputs"].get("value")
+            value = graph.resolve_value(reference)
+            if value is not None and not self.is_node_reference(value):
+                return value
             # If we can't resolve the reference, return a string representation
             return f"[Node Reference: {reference[0]}]"
         return reference
@@ -1333,23 +1094,25 @@ class SimpleReadableMetadataMAXSG:
         negative = ""
         
         try:
-            text = self.safely_process_value(text)
+            doc = self.as_metadata_document(text)
             
             if format_type == "comfyui":
-                clean_text = text.strip()
-                if clean_text.startswith("Prompt: "):
-                    clean_text = clean_text[8:]
-                
                 try:
-                    data = json.loads(clean_text)
+                    data = doc.data
+                    graph = doc.graph
+                    
+                    # Follow the samplers' positive/negative links to the text that fed them
+                    positive, negative = graph.sampler_prompts()
                     
-                    for node_id, node_data in data.items():
+                    positive_candidates = []
+                    negative_candidates = []
+                    
+                    # Guess from titles and content only when no sampler links could be followed
+                    text_encoders = [] if positive or negative else graph.nodes_in("text_encode")
+                    for node_id, node_data, class_type, inputs in text_encoders:
                         try:
-                            class_type = node_data.get("class_type", "")
-                            
                             if class_type == "CLIPTextEncodeFlux":
-                                inputs = node_data["inputs"]
-                                positive = self.safely_process_value(inputs.get("t5xxl", inputs.get("clip_l", "")))
+                                positive = self.safely_process_value(graph.resolve_value(inputs.get("t5xxl", inputs.get("clip_l", ""))))
                             
                             elif class_type == "CLIPTextEncode" or "TextEncode" in class_type or "Prompt" in class_type:
                                 title = node_data.get("_meta", {}).get("title", "").lower()
@@ -1357,8 +1120,8 @@ class SimpleReadableMetadataMAXSG:
                                 # Try multiple text field names
                                 text_content = None
                                 for text_key in ["text", "prompt", "conditioning", "string"]:
-                                    if text_key in node_data["inputs"]:
-                                        text_content = node_data["inputs"].get(text_key)
+                                    if text_key in inputs:
+                                        text_content = graph.resolve_value(inputs.get(text_key))
                                         break
                                 
                                 if text_content is None:
@@ -1370,8 +1133,8 @@ class SimpleReadableMetadataMAXSG:
                                 text_content = self.safely_process_value(text_content)
                                 
                                 # Handle dict-wrapped text values
-                                if isinstance(node_data["inputs"].get("text"), dict):
-                                    text_dict = node_data["inputs"]["text"]
+                                if isinstance(inputs.get("text"), dict):
+                                    text_dict = inputs["text"]
                                     if "on" in text_dict and not text_dict.get("on"):
                                         continue
                                     text_content = self.safely_process_value(text_dict.get("text", text_dict.get("value", text_dict.get("prompt", ""))))
@@ -1402,18 +1165,18 @@ class SimpleReadableMetadataMAXSG:
                         except Exception as e:
                             print(f"Error processing node in extract_individual: {e}")
                             continue
+                    
+                    if positive_candidates and not positive:
+                        positive = positive_candidates[0]
+                    if negative_candidates:
+                        negative = negative_candidates[0]
                 
                 except Exception as e:
                     print(f"Error parsing JSON in extract_individual: {e}")
             
             elif format_type == "webui":
-                lines = text.strip().split('\n')
-                for line in lines:
-                    if line.startswith("Negative prompt:"):
-                        negative = line.replace("Negative prompt:", "").strip()
-                    elif not line.startswith("Negative prompt:"):
-                        positive += line + " "
-                positive = positive.strip()
+                positive = doc.parameters.positive
+                negative = doc.parameters.negative
         
         except Exception as e:
             print(f"Error in extract_individual_params: {e}")
@@ -1423,14 +1186,12 @@ class SimpleReadableMetadataMAXSG:
         
         return positive, negative
     
-    def extract_all_text_content(self, data):
+    def extract_all_text_content(self, graph):
         """Extract ALL text strings from the workflow as a fail-safe"""
         all_texts = []
         seen_texts = set()
         try:
-            for node_id, node_data in data.items():
-                inputs = node_data.get("inputs", {})
-                class_type = node_data.get("class_type", "")
+            for node_id, node_data, class_type, inputs in graph.nodes:
                 
                 # Check for common text keys (Added Flux keys: t5xxl, clip_l)
                 candidates = []
@@ -1446,7 +1207,7 @@ class SimpleReadableMetadataMAXSG:
 
                         # Try to resolve if reference
                         if self.is_node_reference(val):
-                            val = self.resolve_node_reference(data, val)
+                            val = self.resolve_node_reference(graph, val)
                         
                         val = self.safely_process_value(val)
                         if val and val != "N/A" and isinstance(val, str):
@@ -0,0 +1,98 @@
+import re
+import json
+
+# Tokenizer for A1111/Forge "parameters" text:
+#
+#   <positive prompt, any number of lines>
+#   Negative prompt: <negative prompt, any number of lines>
+#   Steps: 20, Sampler: DPM++ 2M, CFG scale: 7, Seed: 1, Size: 512x768, Lora hashes: "a: 1f2e, b: 3c4d", Version: v1.9.4
+#
+# The text is split into lines once and the settings line is tokenized with one precompiled pattern,
+# so format detection, parameter extraction and the readable text all share a single parse.
+
+# key: value pairs of the settings line, values may be double-quoted and contain commas
+SETTINGS_PARAM = re.compile(r'\s*(\w[\w \-/]+):\s*("(?:\\.|[^\\"])*"|[^,]*)(?:,|$)')
+# Fallback settings line when the last line doesn't look like one
+SETTINGS_START = re.compile(r'\s*Steps:\s*\d')
+LORA_TAG = re.compile(r'<lora:([^:>]+):([^>]+)>')
+NEGATIVE_PREFIX = "Negative prompt:"
+# The last line is the settings line if it holds at least this many pairs (the rule A1111 itself uses)
+MIN_SETTINGS_PARAMS = 3
+# (generation param, settings key, conversion) read by the loader nodes' extract_generation_params
+WEBUI_GENERATION_PARAMS = [
+    ('seed', 'Seed', int),
+    ('steps', 'Steps', int),
+    ('cfg', 'CFG scale', float),
+    ('sampler', 'Sampler', str),
+    ('scheduler', 'Schedule type', str),
+]
+
+
+class WebUIParameters:
+    """Tokenized parameters text
+
+    positive : positive prompt, line breaks kept
+    negative : negative prompt (all of its lines), line breaks kept
+    settings : settings line as {key: value} in file order, quoted values unquoted
+    loras    : (name, strength) pairs of the <lora:...> tags in the prompts
+    """
+
+    __slots__ = ("positive", "negative", "settings", "loras")
+
+    def __init__(self, positive="", negative="", settings=None, loras=None):
+        self.positive = positive
+        self.negative = negative
+        self.settings = settings if settings is not None else {}
+        self.loras = loras if loras is not None else []
+
+    def __bool__(self):
+        return bool(self.settings)
+
+    def get(self, key, default=None):
+        return self.settings.get(key, default)
+
+
+def _unquote(value):
+    if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value[1:-1]
+    return value
+
+
+def tokenize_settings(line):
+    """{key: value} of a settings line"""
+    settings = {}
+    for match in SETTINGS_PARAM.finditer(line):
+        settings[match.group(1).strip()] = _unquote(match.group(2).strip())
+    return settings
+
+
+def parse_parameters(text):
+    """Split parameters text into positive, negative and settings (see WebUIParameters)"""
+    if not isinstance(text, str) or not text.strip():
+        return WebUIParameters()
+
+    lines = text.strip().split('\n')
+    settings_index = len(lines) - 1
+    settings = tokenize_settings(lines[-1])
+    if len(settings) < MIN_SETTINGS_PARAMS and not SETTINGS_START.match(lines[-1]):
+        settings_index, settings = None, {}
+        for i, line in enumerate(lines):
+            if SETTINGS_START.match(line):
+                settings_index, settings = i, tokenize_settings(line)
+                break
+
+    positive, negative = [], []
+    target = positive
+    for line in lines[:settings_index]:
+        if line.startswith(NEGATIVE_PREFIX):
+            target = negative
+            line = line[len(NEGATIVE_PREFIX):]
+        target.append(line)
+
+    positive = "\n".join(positive).strip()
+    negative = "\n".join(negative).strip()
+    loras = LORA_TAG.findall(positive) + LORA_TAG.findall(negative)
+    return WebUIParameters(positive, negative, settings, loras)
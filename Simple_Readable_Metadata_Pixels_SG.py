@@ -0,0 +1,108 @@
+import torch
+import numpy as np
+import cv2
+from PIL import ImageOps
+
+# PIL image -> ComfyUI IMAGE/MASK tensors.
+# Pixels are decoded once into a uint8 array; RGB and alpha are views of that array and are
+# scaled straight into preallocated float32 tensors, so no intermediate full-size buffers are made.
+# 16-bit sources are normalized from their full-precision values instead of being squashed to 8 bits.
+
+# Modes with an alpha band that convert to RGBA without changing their colour channels
+ALPHA_MODES = ("RGBA", "LA", "PA")
+
+# Single-channel high bit depth modes, PIL keeps these at full precision
+HIGH_BIT_DEPTH_MODES = ("I;16", "I;16B", "I;16L", "I;16N", "I")
+
+# 16-bit PNG colour types (ImageHeader.mode) that PIL reduces to 8 bits on load, decoded with OpenCV instead
+DEEP_PNG_MODES = ("RGB;16", "RGBA;16", "LA;16")
+
+UINT8_MAX = np.float32(255.0)
+UINT16_MAX = np.float32(65535.0)
+EXIF_ORIENTATION = 0x0112
+
+
+def _scale_into(tensor, view, scale):
+    """tensor[...] = view / scale in float32, written in place"""
+    np.divide(view, scale, out=tensor.numpy(), dtype=np.float32)
+    return tensor
+
+
+def _pixels_to_tensors(pixels, alpha, scale):
+    """IMAGE/MASK tensors from an (H, W, 3) or (H, W) colour view and an optional (H, W) alpha view"""
+    height, width = pixels.shape[:2]
+    if pixels.ndim == 2:
+        # Grayscale broadcasts over the three channels
+        pixels = pixels[..., None]
+    image_tensor = _scale_into(torch.empty((1, height, width, 3), dtype=torch.float32), pixels[None], scale)
+
+    if alpha is not None:
+        mask = _scale_into(torch.empty((height, width), dtype=torch.float32), alpha, scale)
+        np.subtract(np.float32(1.0), mask.numpy(), out=mask.numpy())
+    else:
+        mask = torch.zeros((height, width), dtype=torch.float32, device="cpu")
+
+    return image_tensor, mask
+
+
+def _orient(pixels, orientation):
+    """Apply an EXIF orientation to an (H, W, ...) array as a view, matching ImageOps.exif_transpose"""
+    if orientation == 2:
+        return pixels[:, ::-1]
+    if orientation == 3:
+        return pixels[::-1, ::-1]
+    if orientation == 4:
+        return pixels[::-1]
+    if orientation == 5:
+        return pixels.swapaxes(0, 1)
+    if orientation == 6:
+        return np.rot90(pixels, -1)
+    if orientation == 7:
+        return pixels[::-1, ::-1].swapaxes(0, 1)
+    if orientation == 8:
+        return np.rot90(pixels)
+    return pixels
+
+
+def _deep_png_to_tensors(image_path, header):
+    """Decode a 16-bit RGB(A)/LA PNG at full precision, or None to fall back to PIL"""
+    try:
+        pixels = cv2.imdecode(np.fromfile(image_path, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+    except Exception as e:
+        print(f"Error decoding 16-bit PNG: {e}")
+        return None
+    if pixels is None or pixels.dtype != np.uint16:
+        return None
+
+    pixels = _orient(pixels, header.getexif().get(EXIF_ORIENTATION))
+    if pixels.ndim == 2:
+        return _pixels_to_tensors(pixels, None, UINT16_MAX)
+    # OpenCV hands back BGR(A); reorder with a view
+    alpha = pixels[..., 3] if pixels.shape[2] == 4 else None
+    return _pixels_to_tensors(pixels[..., 2::-1], alpha, UINT16_MAX)
+
+
+def pil_to_tensors(img):
+    """Convert a PIL image into a (1, H, W, 3) IMAGE tensor and an (H, W) MASK tensor (inverted alpha)"""
+    if img.mode in HIGH_BIT_DEPTH_MODES:
+        image_tensor, mask = _pixels_to_tensors(np.asarray(img), None, UINT16_MAX)
+        if img.mode == "I":
+            # 32-bit integer data can fall outside the 16-bit range
+            np.clip(image_tensor.numpy(), 0.0, 1.0, out=image_tensor.numpy())
+        return image_tensor, mask
+
+    if img.mode in ALPHA_MODES:
+        pixels = np.asarray(img if img.mode == "RGBA" else img.convert("RGBA"))
+        return _pixels_to_tensors(pixels[..., :3], pixels[..., 3], UINT8_MAX)
+
+    pixels = np.asarray(img if img.mode == "RGB" else img.convert("RGB"))
+    return _pixels_to_tensors(pixels, None, UINT8_MAX)
+
+
+def image_to_tensors(img, image_path=None, header=None):
+    """IMAGE/MASK tensors for an opened image (EXIF orientation applied), keeping 16-bit PNGs at full precision"""
+    if image_path and header is not None and header.mode in DEEP_PNG_MODES:
+        tensors = _deep_png_to_tensors(image_path, header)
+        if tensors is not None:
+            return tensors
+    return pil_to_tensors(ImageOps.exif_transpose(img))
@@ -0,0 +1,211 @@
+import os
+import struct
+import zlib
+
+# Header-only metadata reader for PNG and WebP files.
+# Walks the container chunks straight from the file bytes and never touches pixel data,
+# so metadata lookups cost a few small reads instead of a full image decode.
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Same ceiling PIL uses for decompressed text chunks
+MAX_TEXT_MEMORY = 64 * 1024 * 1024
+
+PNG_MODES = {
+    (1, 0): "1", (2, 0): "L", (4, 0): "L", (8, 0): "L", (16, 0): "I;16",
+    (8, 2): "RGB", (16, 2): "RGB;16",
+    (1, 3): "P", (2, 3): "P", (4, 3): "P", (8, 3): "P",
+    (8, 4): "LA", (16, 4): "LA;16",
+    (8, 6): "RGBA", (16, 6): "RGBA;16",
+}
+
+# VP8X feature flags
+WEBP_FLAG_ALPHA = 0x10
+WEBP_FLAG_EXIF = 0x08
+WEBP_FLAG_XMP = 0x04
+WEBP_IMAGE_CHUNKS = (b"VP8 ", b"VP8L", b"ANMF")
+
+
+class ImageHeader:
+    """Metadata and dimensions of an image file, read without decoding any pixels.
+
+    Exposes an ``info`` dict with the same keys PIL fills in (``prompt``, ``workflow``,
+    ``parameters``, ``exif``, ``xmp``...) so it can be handed to the extractors in place of an image.
+    """
+
+    def __init__(self, format, width, height, mode=None, info=None):
+        self.format = format
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.info = info if info is not None else {}
+
+    @property
+    def size(self):
+        return (self.width, self.height)
+
+    def getexif(self):
+        """Parse the raw EXIF block the same way PIL's Image.getexif() does"""
+        from PIL import Image
+        exif = Image.Exif()
+        exif_bytes = self.info.get("exif")
+        if exif_bytes:
+            exif.load(exif_bytes)
+        return exif
+
+
+def _decompress_text(data):
+    decompressor = zlib.decompressobj()
+    text = decompressor.decompress(data, MAX_TEXT_MEMORY)
+    if decompressor.unconsumed_tail:
+        raise ValueError("Decompressed text chunk too large")
+    return text
+
+
+def _parse_png_text_chunk(chunk_type, data):
+    """Decode a tEXt/zTXt/iTXt payload into (key, value), or None if malformed"""
+    try:
+        key, rest = data.split(b"\x00", 1)
+    except ValueError:
+        return None
+    key = key.decode("latin-1")
+
+    if chunk_type == b"tEXt":
+        return key, rest.decode("latin-1")
+
+    if chunk_type == b"zTXt":
+        if not rest or rest[0] != 0:
+            return None
+        return key, _decompress_text(rest[1:]).decode("latin-1")
+
+    # iTXt: compression flag, compression method, language tag, translated keyword, text
+    if len(rest) < 2:
+        return None
+    compressed, method, rest = rest[0], rest[1], rest[2:]
+    try:
+        _lang, _translated, text = rest.split(b"\x00", 2)
+    except ValueError:
+        return None
+    if compressed:
+        if method != 0:
+            return None
+        text = _decompress_text(text)
+    if key == "XML:com.adobe.xmp":
+        return "xmp", text
+    return key, text.decode("utf-8")
+
+
+def _read_png_header(f):
+    """Walk PNG chunks up to the first IDAT, collecting text and EXIF chunks"""
+    width = height = None
+    mode = None
+    info = {}
+
+    while True:
+        chunk_head = f.read(8)
+        if len(chunk_head) < 8:
+            break
+        length, chunk_type = struct.unpack(">I4s", chunk_head)
+
+        if chunk_type in (b"IDAT", b"IEND"):
+            break
+
+        if chunk_type == b"IHDR":
+            data = f.read(length)
+            width, height, bit_depth, color_type = struct.unpack(">IIBB", data[:10])
+            mode = PNG_MODES.get((bit_depth, color_type))
+        elif chunk_type in (b"tEXt", b"zTXt", b"iTXt"):
+            data = f.read(length)
+            try:
+                parsed = _parse_png_text_chunk(chunk_type, data)
+            except (ValueError, UnicodeDecodeError, zlib.error) as e:
+                print(f"Skipping unreadable PNG {chunk_type.decode()} chunk: {e}")
+                parsed = None
+            if parsed:
+                info[parsed[0]] = parsed[1]
+        elif chunk_type == b"eXIf":
+            info["exif"] = f.read(length)
+        else:
+            f.seek(length, os.SEEK_CUR)
+
+        # Skip CRC
+        f.seek(4, os.SEEK_CUR)
+
+    if width is None:
+        return None
+    return ImageHeader("PNG", width, height, mode, info)
+
+
+def _read_webp_dimensions(chunk_type, data):
+    """Read canvas size from the first bytes of a VP8/VP8L bitstream chunk"""
+    if chunk_type == b"VP8 " and len(data) >= 10 and data[3:6] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", data[6:10])
+        return width & 0x3FFF, height & 0x3FFF, False
+    if chunk_type == b"VP8L" and len(data) >= 5 and data[0] == 0x2F:
+        bits = struct.unpack("<I", data[1:5])[0]
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1, bool((bits >> 28) & 1)
+    return None, None, False
+
+
+def _read_webp_header(f):
+    """Walk RIFF chunks, seeking over bitstream chunks to reach EXIF/XMP"""
+    width = height = None
+    has_alpha = False
+    flags = None
+    info = {}
+
+    while True:
+        chunk_head = f.read(8)
+        if len(chunk_head) < 8:
+            break
+        chunk_type, length = struct.unpack("<4sI", chunk_head)
+        padded = length + (length & 1)
+
+        if chunk_type == b"VP8X":
+            data = f.read(length)
+            f.seek(padded - length, os.SEEK_CUR)
+            flags = data[0]
+            has_alpha = bool(flags & WEBP_FLAG_ALPHA)
+            width = 1 + int.from_bytes(data[4:7], "little")
+            height = 1 + int.from_bytes(data[7:10], "little")
+        elif chunk_type in WEBP_IMAGE_CHUNKS:
+            if width is None:
+                data = f.read(min(length, 10))
+                width, height, has_alpha = _read_webp_dimensions(chunk_type, data)
+                f.seek(padded - len(data), os.SEEK_CUR)
+            else:
+                f.seek(padded, os.SEEK_CUR)
+            # Simple (non-VP8X) files end here, extended files only carry EXIF/XMP if flagged
+            if flags is None or not flags & (WEBP_FLAG_EXIF | WEBP_FLAG_XMP):
+                break
+        elif chunk_type == b"EXIF":
+            info["exif"] = f.read(length)
+            f.seek(padded - length, os.SEEK_CUR)
+        elif chunk_type == b"XMP ":
+            info["xmp"] = f.read(length)
+            f.seek(padded - length, os.SEEK_CUR)
+        else:
+            f.seek(padded, os.SEEK_CUR)
+
+    if width is None:
+        return None
+    return ImageHeader("WEBP", width, height, "RGBA" if has_alpha else "RGB", info)
+
+
+def read_image_header(image_path):
+    """Read metadata and dimensions from a PNG or WebP file without decoding pixels.
+
+    Returns an ImageHeader, or None if the file is not a PNG/WebP or could not be parsed,
+    in which case callers should fall back to PIL.
+    """
+    try:
+        with open(image_path, "rb") as f:
+            signature = f.read(12)
+            if signature[:8] == PNG_SIGNATURE:
+                f.seek(8)
+                return _read_png_header(f)
+            if signature[:4] == b"RIFF" and signature[8:12] == b"WEBP":
+                return _read_webp_header(f)
+    except (OSError, struct.error) as e:
+        print(f"Error reading image header: {e}")
+    return None
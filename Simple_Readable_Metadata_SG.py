@@ -1,11 +1,19 @@
 import torch
 import os
 import folder_paths
-from PIL import Image, ImageOps
+from PIL import Image
 import numpy as np
-import hashlib
-import json
 import re
+import textwrap
+from .Simple_Readable_Metadata_Reader_SG import read_image_header
+from .Simple_Readable_Metadata_Cache_SG import file_fingerprint, result_cache
+from .Simple_Readable_Metadata_Pixels_SG import image_to_tensors
+from .Simple_Readable_Metadata_Document_SG import MetadataDocument
+from .Simple_Readable_Metadata_Listing_SG import input_files
+from .Simple_Readable_Metadata_Parameters_SG import WEBUI_GENERATION_PARAMS
+
+# Prompts in the readable text are indented under their label, every line of multi-line ones
+PROMPT_INDENT = " " * 11
 
 class SimpleReadableMetadataSG:
     """Load image with drag-and-drop, automatically extract properties and metadata"""
@@ -14,11 +22,10 @@ class SimpleReadableMetadataSG:
 
     @classmethod
     def INPUT_TYPES(cls):
-        input_dir = folder_paths.get_input_directory()
-        files = [f for f in os.listdir(input_dir) if os.path.isfile(os.path.join(input_dir, f))]
+        files = input_files("image")
         return {
             "required": {
-                "image": (sorted(files), {"image_upload": True}),
+                "image": (files, {"image_upload": True}),
                 "emoji_in_readable_text": ("BOOLEAN", {"default": True}),
                 "show_info": (["both", "properties", "metadata", "none"], {"default": "both"}),               
             },
@@ -35,10 +42,7 @@ class SimpleReadableMetadataSG:
     @classmethod
     def IS_CHANGED(cls, image, emoji_in_readable_text, show_info="both"):
         image_path = folder_paths.get_annotated_filepath(image)
-        m = hashlib.sha256()
-        with open(image_path, 'rb') as f:
-            m.update(f.read())
-        return m.digest().hex()
+        return file_fingerprint(image_path)
 
     @classmethod
     def VALIDATE_INPUTS(cls, image, emoji_in_readable_text, show_info="both"):
@@ -80,57 +84,18 @@ class SimpleReadableMetadataSG:
         """Master wrapper - ensures value is ALWAYS a string before any operations"""
         return self.safely_convert_to_string(value)
 
-    def _get_prompt_data_from_image(self, img):
-        """Helper method to extract prompt data from both PNG and WebP formats"""
-        try:
-            # First check direct img.info (works for PNG)
-            if hasattr(img, 'info') and img.info:
-                if "prompt" in img.info:
-                    try:
-                        prompt_str = img.info["prompt"]
-                        if isinstance(prompt_str, str):
-                            return json.loads(prompt_str)
-                        return prompt_str
-                    except:
-                        pass
-
-                # Check EXIF data for WebP
-                if "exif" in img.info:
-                    try:
-                        exif_bytes = img.info["exif"]
-                        if isinstance(exif_bytes, bytes):
-                            exif_string = exif_bytes.decode('utf-8', errors='ignore')
-                            # Look for prompt: marker
-                            if "prompt:" in exif_string:
-                                prompt_start = exif_string.find("prompt:")
-                                if prompt_start != -1:
-                                    prompt_data = exif_string[prompt_start + 7:]
-                                    prompt_data = prompt_data.split('\x00')[0]
-                                    try:
-                                        return json.loads(prompt_data)
-                                    except:
-                                        pass
-                    except Exception as e:
-                        print(f"Error parsing WebP EXIF for prompt: {e}")
-        except Exception as e:
-            print(f"Error extracting prompt data: {e}")
-        return None
-
-    def extract_model_name(self, img):
-        """Extract model name from image metadata"""
+    def extract_model_name(self, doc):
+        """Extract model name from image metadata (MetadataDocument)"""
         model_name = "N/A"
         try:
-            if not hasattr(img, 'info') or not img.info:
+            if not doc.info:
                 return model_name
 
-            # Try to get prompt data (works for both PNG and WebP)
-            prompt_data = self._get_prompt_data_from_image(img)
+            # Prompt data is parsed once by the document (works for both PNG and WebP)
+            prompt_data = doc.prompt
             if prompt_data:
                 try:
-                    for node_id, node_data in prompt_data.items():
-                        class_type = node_data.get('class_type', '')
-                        inputs = node_data.get('inputs', {})
-
+                    for node_id, node_data, class_type, inputs in doc.prompt_graph.nodes_in("loader"):
                         if 'CheckpointLoader' in class_type and 'ckpt_name' in inputs:
                             model_name = inputs['ckpt_name']
                             break
@@ -151,9 +116,9 @@ class SimpleReadableMetadataSG:
                     print(f"Error parsing prompt metadata: {e}")
 
             # Try workflow format (PNG direct access)
-            if model_name == "N/A" and 'workflow' in img.info:
+            if model_name == "N/A" and 'workflow' in doc.info:
                 try:
-                    workflow_data = json.loads(img.info['workflow'])
+                    workflow_data = doc.workflow
                     for node in workflow_data.get('nodes', []):
                         node_type = node.get('type', '')
                         if 'Checkpoint' in node_type or 'Loader' in node_type:
@@ -165,13 +130,10 @@ class SimpleReadableMetadataSG:
                     print(f"Error parsing workflow metadata: {e}")
 
             # Try A1111 format (PNG direct access)
-            if model_name == "N/A" and 'parameters' in img.info:
+            if model_name == "N/A" and 'parameters' in doc.info:
                 try:
-                    params = img.info['parameters']
-                    model_pattern = r'Model:\s*([^,\n]+)'
-                    match = re.search(model_pattern, params)
-                    if match:
-                        model_name = match.group(1).strip()
+                    if doc.parameters.get('Model'):
+                        model_name = doc.parameters.get('Model')
                 except Exception as e:
                     print(f"Error parsing A1111 metadata: {e}")
 
@@ -180,8 +142,8 @@ class SimpleReadableMetadataSG:
 
         return model_name
 
-    def extract_generation_params(self, img):
-        """Extract generation parameters (seed, steps, cfg, sampler, scheduler) from image metadata"""
+    def extract_generation_params(self, doc):
+        """Extract generation parameters (seed, steps, cfg, sampler, scheduler) from image metadata (MetadataDocument)"""
         params = {
             'seed': 'N/A',
             'steps': 'N/A',
@@ -191,26 +153,25 @@ class SimpleReadableMetadataSG:
         }
 
         try:
-            if not hasattr(img, 'info') or not img.info:
+            if not doc.info:
                 return params
 
-            # Try to get prompt data (works for both PNG and WebP)
-            prompt_data = self._get_prompt_data_from_image(img)
+            # Prompt data is parsed once by the document (works for both PNG and WebP)
+            prompt_data = doc.prompt
             if prompt_data:
                 try:
-                    for node_id, node_data in prompt_data.items():
-                        class_type = node_data.get('class_type', '')
-                        inputs = node_data.get('inputs', {})
-
-                        # KSampler node has all the info we need
-                        if class_type == "KSampler":
-                            params['seed'] = inputs.get('seed', 'N/A')
-                            params['steps'] = inputs.get('steps', 'N/A')
-                            params['cfg'] = inputs.get('cfg', 'N/A')
-                            params['sampler'] = inputs.get('sampler_name', 'N/A')
-                            params['scheduler'] = inputs.get('scheduler', 'N/A')
-                            return params
-
+                    graph = doc.prompt_graph
+
+                    # KSampler node has all the info we need
+                    for node_id, node_data, class_type, inputs in graph.nodes_in("ksampler"):
+                        params['seed'] = inputs.get('seed', 'N/A')
+                        params['steps'] = inputs.get('steps', 'N/A')
+                        params['cfg'] = inputs.get('cfg', 'N/A')
+                        params['sampler'] = inputs.get('sampler_name', 'N/A')
+                        params['scheduler'] = inputs.get('scheduler', 'N/A')
+                        return params
+
+                    for node_id, node_data, class_type, inputs in graph.nodes:
                         # Check individual nodes for distributed sampler setup
                         if 'seed' in inputs or 'noise_seed' in inputs:
                             params['seed'] = inputs.get('seed', inputs.get('noise_seed', params['seed']))
@@ -227,29 +188,16 @@ class SimpleReadableMetadataSG:
                     print(f"Error parsing ComfyUI generation params: {e}")
 
             # Try A1111/Forge format (PNG direct access)
-            if 'parameters' in img.info and any(v == 'N/A' for v in params.values()):
+            if 'parameters' in doc.info and any(v == 'N/A' for v in params.values()):
                 try:
-                    metadata_text = img.info['parameters']
-
-                    seed_match = re.search(r'Seed:\s*(\d+)', metadata_text)
-                    if seed_match:
-                        params['seed'] = int(seed_match.group(1))
-
-                    steps_match = re.search(r'Steps:\s*(\d+)', metadata_text)
-                    if steps_match:
-                        params['steps'] = int(steps_match.group(1))
-
-                    cfg_match = re.search(r'CFG scale:\s*([\d.]+)', metadata_text)
-                    if cfg_match:
-                        params['cfg'] = float(cfg_match.group(1))
-
-                    sampler_match = re.search(r'Sampler:\s*([^,\n]+)', metadata_text)
-                    if sampler_match:
-                        params['sampler'] = sampler_match.group(1).strip()
-
-                    scheduler_match = re.search(r'Schedule type:\s*([^,\n]+)', metadata_text)
-                    if scheduler_match:
-                        params['scheduler'] = scheduler_match.group(1).strip()
+                    # Settings line tokenized once by the document
+                    for key, setting, convert in WEBUI_GENERATION_PARAMS:
+                        value = doc.parameters.get(setting)
+                        if value:
+                            try:
+                                params[key] = convert(value)
+                            except ValueError:
+                                pass
 
                 except Exception as e:
                     print(f"Error parsing A1111 generation params: {e}")
@@ -263,29 +211,25 @@ class SimpleReadableMetadataSG:
         """Combined function that loads image, analyzes properties, and extracts metadata"""
         try:
             image_path = folder_paths.get_annotated_filepath(image)
-            img = Image.open(image_path)
-
-            model_name = self.extract_model_name(img)
-            gen_params = self.extract_generation_params(img)
 
-            img = ImageOps.exif_transpose(img)
+            # Same file content and options give the same outputs, reuse them without decoding or parsing again
+            cache_key = ("SimpleReadableMetadataSG", image_path, file_fingerprint(image_path), emoji_in_readable_text, show_info)
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-            metadata_raw = self.extract_raw_metadata(img)
-
-            if img.mode == 'I':
-                img = img.point(lambda i: i * (1 / 255))
+            # Metadata comes straight from the PNG/WebP chunks, PIL is only the fallback for other formats
+            header = read_image_header(image_path)
+            img = Image.open(image_path)
+            # Parsed once here, every later stage reads from this document
+            doc = MetadataDocument.from_image(header if header is not None else img)
 
-            original_img = img
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
+            model_name = self.extract_model_name(doc)
+            gen_params = self.extract_generation_params(doc)
 
-            image_tensor = torch.from_numpy(np.array(img).astype(np.float32) / 255.0).unsqueeze(0)
+            metadata_raw = doc.raw
 
-            if 'A' in original_img.getbands():
-                mask = np.array(original_img.getchannel('A')).astype(np.float32) / 255.0
-                mask = 1. - torch.from_numpy(mask)
-            else:
-                mask = torch.zeros((original_img.size[1], original_img.size[0]), dtype=torch.float32, device="cpu")
+            image_tensor, mask = image_to_tensors(img, image_path, header)
 
             # Build display info for UI
             batch_size, height, width, channels = image_tensor.shape
@@ -368,7 +312,7 @@ class SimpleReadableMetadataSG:
             line6 = f"Sampler: {gen_params['sampler']} | Scheduler: {gen_params['scheduler']}"
             lines.append(line6)
 
-            Simple_Readable_Metadata, positive, negative = self.parse_metadata(metadata_raw, emoji_in_readable_text)
+            Simple_Readable_Metadata, positive, negative = self.parse_metadata(doc, emoji_in_readable_text)
 
             # Convert seed to integer, use 0 if N/A
             seed_value = gen_params['seed']
@@ -380,130 +324,43 @@ class SimpleReadableMetadataSG:
                 except (ValueError, TypeError):
                     seed_int = 0
 
-            return {
+            result = {
                 "ui": {"text": lines},
                 "result": (Simple_Readable_Metadata, image_tensor, mask, metadata_raw, positive, negative, seed_int, file_name_text_without_ext)
             }
+            result_cache.put(cache_key, result)
+            return result
 
         except Exception as e:
             print(f"Error in load_analyze_extract: {e}")
             raise
 
-    def extract_raw_metadata(self, img):
-        """Extract raw metadata in format compatible with conversion - supports PNG and WebP"""
-        png_info = img.info if hasattr(img, 'info') else {}
-
-        if not png_info:
-            return "No metadata found in image"
-
-        # Check for ComfyUI prompt metadata (works for PNG)
-        if "prompt" in png_info:
-            try:
-                prompt_data = png_info["prompt"]
-                if isinstance(prompt_data, str):
-                    json.loads(prompt_data)  # Validate JSON
-                    return prompt_data
-                else:
-                    return json.dumps(prompt_data)
-            except:
-                pass
-
-        # Check for A1111/Forge parameters (works for PNG)
-        if "parameters" in png_info:
-            return png_info["parameters"]
-
-        # Check for EXIF data in WebP
-        if "exif" in png_info:
-            try:
-                exif_bytes = png_info["exif"]
-                if isinstance(exif_bytes, bytes):
-                    # Decode the EXIF bytes to string
-                    exif_string = exif_bytes.decode('utf-8', errors='ignore')
-
-                    # Look for prompt: or workflow: markers in the EXIF data
-                    if "prompt:" in exif_string:
-                        # Extract the JSON after "prompt:"
-                        prompt_start = exif_string.find("prompt:")
-                        if prompt_start != -1:
-                            # Extract everything after "prompt:"
-                            prompt_data = exif_string[prompt_start + 7:]  # Skip "prompt:"
-
-                            # Find the end of the JSON (look for the null terminator or end)
-                            # Try to extract valid JSON
-                            try:
-                                # Remove any trailing null bytes or extra data
-                                prompt_data = prompt_data.split('\x00')[0]
-                                # Validate it's proper JSON
-                                json.loads(prompt_data)
-                                return prompt_data
-                            except:
-                                pass
-
-                    # If no valid prompt found, try to extract workflow
-                    if "workflow:" in exif_string:
-                        workflow_start = exif_string.find("workflow:")
-                        if workflow_start != -1:
-                            workflow_data = exif_string[workflow_start + 9:]  # Skip "workflow:"
-                            try:
-                                workflow_data = workflow_data.split('\x00')[0]
-                                workflow_json = json.loads(workflow_data)
-                                # Return workflow as a fallback
-                                return json.dumps({"workflow": workflow_json})
-                            except:
-                                pass
-
-            except Exception as e:
-                print(f"Error parsing WebP EXIF metadata: {e}")
-
-        # Fallback: Try using PIL's getexif() method for standard EXIF tags
-        if hasattr(img, 'getexif'):
-            try:
-                exif_data = img.getexif()
-                if exif_data:
-                    # Try to find UserComment tag (0x9286)
-                    user_comment = exif_data.get(0x9286)
-                    if user_comment:
-                        if isinstance(user_comment, bytes):
-                            user_comment = user_comment.decode('utf-8', errors='ignore')
-                        try:
-                            json.loads(user_comment)
-                            return user_comment
-                        except:
-                            return user_comment
-            except Exception as e:
-                print(f"Error reading EXIF via getexif(): {e}")
-
-        return "No ComfyUI or WebUI format metadata found. Image may be from a different source."
+    def as_metadata_document(self, value):
+        """Accept a MetadataDocument or any raw metadata value (str, bytes, dict, node reference...)"""
+        if isinstance(value, (MetadataDocument, bytes, bytearray)):
+            return MetadataDocument.coerce(value)
+        # Convert to string safely (handles dict/list/node references)
+        return MetadataDocument(self.safely_process_value(value))
 
     def parse_metadata(self, metadata_raw, include_emojis=True):
         """Main parsing function that detects format and routes to appropriate converter"""
         try:
-            # Handle bytes (WebP EXIF data can be bytes)
-            if isinstance(metadata_raw, (bytes, bytearray)):
-                try:
-                    metadata_raw = metadata_raw.decode("utf-8", errors="ignore")
-                except Exception:
-                    metadata_raw = str(metadata_raw)
-
-            # Convert to string safely (handles dict/list/node references)
-            metadata_raw = self.safely_process_value(metadata_raw)
-
-            # Now detect format and parse
-            format_type = self.detect_format(metadata_raw)
+            doc = self.as_metadata_document(metadata_raw)
+            format_type = doc.format
 
             if format_type == "comfyui":
                 Simple_Readable_Metadata = self.parse_comfyui_format(
-                    metadata_raw,
+                    doc,
                     include_emojis,
                     image_path=getattr(self, '_current_image_path', None),
                     file_size_mb=getattr(self, '_current_file_size', None)
                 )
             elif format_type == "webui":
-                Simple_Readable_Metadata = self.parse_webui_format(metadata_raw, include_emojis)
+                Simple_Readable_Metadata = self.parse_webui_format(doc, include_emojis)
             else:
                 Simple_Readable_Metadata = "Unable to detect metadata format. Please ensure the input is from ComfyUI or WebUI Forge/A1111."
 
-            positive, negative = self.extract_individual_params(metadata_raw, format_type)
+            positive, negative = self.extract_individual_params(doc, format_type)
 
             positive = self.safely_convert_to_string(positive)
             negative = self.safely_convert_to_string(negative)
@@ -517,24 +374,7 @@ class SimpleReadableMetadataSG:
     def detect_format(self, text):
         """Detect whether the input is ComfyUI JSON or WebUI text format"""
         try:
-            text = self.safely_process_value(text).strip()
-            if text.startswith("Prompt: "):
-                text = text[8:]
-
-            # Try JSON first
-            try:
-                json.loads(text)
-                return "comfyui"
-            except json.JSONDecodeError:
-                pass
-
-            # Then try A1111/WebUI pattern detection
-            if (re.search(r'Steps:\s*\d+', text) or 
-                re.search(r'Sampler:\s*\w+', text) or 
-                re.search(r'CFG scale:\s*[\d.]+', text)):
-                return "webui"
-
-            return "unknown"
+            return self.as_metadata_document(text).format
         except Exception as e:
             print(f"Error detecting format: {e}")
             return "unknown"
@@ -542,7 +382,7 @@ class SimpleReadableMetadataSG:
     def parse_webui_format(self, text, include_emojis=True):
         """Parse A1111/WebUI Forge text format metadata"""
         try:
-            text = self.safely_process_value(text)
+            parameters = self.as_metadata_document(text).parameters
 
             emoji_map = {
                 "sampling": "🎯",
@@ -556,116 +396,64 @@ class SimpleReadableMetadataSG:
             output = []
             output.append("=== WebUI Forge/A1111 Generation Parameters ===\n")
 
-            # Parse lines first to extract metadata_line
-            lines = text.strip().split('\n')
-            positive_prompt = ""
-            negative_prompt = ""
-            metadata_line = ""
-
-            for i, line in enumerate(lines):
-                if line.startswith("Negative prompt:"):
-                    negative_prompt = line.replace("Negative prompt:", "").strip()
-                elif re.search(r'Steps:\s*\d+', line):
-                    metadata_line = line
-                elif not metadata_line and not line.startswith("Negative prompt:"):
-                    positive_prompt += line + " "
-
-            positive_prompt = positive_prompt.strip()
-
-            # Extract model name from metadata for display at the top
-            model_name_display = "N/A"
-            if metadata_line:
-                model_match = re.search(r'Model:\s*([^,\n]+)', metadata_line)
-                if model_match:
-                    model_name_display = model_match.group(1).strip()
+            positive_prompt = parameters.positive
+            negative_prompt = parameters.negative
+            params = parameters.settings
 
             # Display model at the top
+            model_name_display = params.get('Model') or "N/A"
             output.append(f"{emoji_map['models']} MODEL: {model_name_display}\n")
 
             output.append(f"{emoji_map['prompts']} PROMPTS: |If empty, Check fail-safe below|\n")
-            output.append(f"  Positive:\n           {positive_prompt if positive_prompt else '(empty)'}\n")
+            output.append(f"  Positive:\n{textwrap.indent(positive_prompt if positive_prompt else '(empty)', PROMPT_INDENT)}\n")
             if negative_prompt:
-                output.append(f"  Negative:\n           {negative_prompt}")
+                output.append(f"  Negative:\n{textwrap.indent(negative_prompt, PROMPT_INDENT)}")
             output.append("")
 
-            if metadata_line:
-                params = {}
-                patterns = {
-                    'steps': r'Steps:\s*(\d+)',
-                    'sampler': r'Sampler:\s*([^,]+)',
-                    'cfg': r'CFG scale:\s*([\d.]+)',
-                    'seed': r'Seed:\s*(\d+)',
-                    'size': r'Size:\s*(\d+x\d+)',
-                    'model': r'Model:\s*([^,]+)',
-                    'model_hash': r'Model hash:\s*([^,]+)',
-                    'denoising': r'Denoising strength:\s*([\d.]+)',
-                    'clip_skip': r'Clip skip:\s*(\d+)',
-                    'scheduler': r'Schedule type:\s*([^,]+)',
-                    'version': r'Version:\s*([^,]+)',
-                }
-
-                for key, pattern in patterns.items():
-                    match = re.search(pattern, metadata_line)
-                    if match:
-                        params[key] = match.group(1).strip()
-
+            if parameters:
                 output.append(f"{emoji_map['sampling']} SAMPLING SETTINGS:")
-                if 'seed' in params:
-                    output.append(f"  Seed: {params['seed']}")
-                if 'steps' in params:
-                    output.append(f"  Steps: {params['steps']}")
-                if 'cfg' in params:
-                    output.append(f"  CFG Scale: {params['cfg']}")
-                if 'sampler' in params:
-                    output.append(f"  Sampler: {params['sampler']}")
-                if 'scheduler' in params:
-                    output.append(f"  Scheduler: {params['scheduler']}")
-                if 'denoising' in params:
-                    output.append(f"  Denoise: {params['denoising']}")
+                if 'Seed' in params:
+                    output.append(f"  Seed: {params['Seed']}")
+                if 'Steps' in params:
+                    output.append(f"  Steps: {params['Steps']}")
+                if 'CFG scale' in params:
+                    output.append(f"  CFG Scale: {params['CFG scale']}")
+                if 'Sampler' in params:
+                    output.append(f"  Sampler: {params['Sampler']}")
+                if 'Schedule type' in params:
+                    output.append(f"  Scheduler: {params['Schedule type']}")
+                if 'Denoising strength' in params:
+                    output.append(f"  Denoise: {params['Denoising strength']}")
                 output.append("")
 
-                if 'size' in params:
+                if 'Size' in params:
                     output.append(f"{emoji_map['dimensions']} IMAGE DIMENSIONS:")
-                    output.append(f"  Resolution: {params['size']}")
+                    output.append(f"  Resolution: {params['Size']}")
                     output.append("")
 
-                if 'model' in params or 'model_hash' in params:
+                if 'Model' in params or 'Model hash' in params:
                     output.append(f"{emoji_map['models']} MODELS & COMPONENTS:")
-                    if 'model' in params:
-                        output.append(f"  Checkpoint: {params['model']}")
-                    if 'model_hash' in params:
-                        output.append(f"  Model Hash: {params['model_hash']}")
+                    if 'Model' in params:
+                        output.append(f"  Checkpoint: {params['Model']}")
+                    if 'Model hash' in params:
+                        output.append(f"  Model Hash: {params['Model hash']}")
                     output.append("")
 
                 # Extract LoRAs
-                lora_pattern = r'<lora:([^:]+):([\d.]+)>'
-                lora_matches = re.findall(lora_pattern, text)
-                if lora_matches:
+                if parameters.loras:
                     output.append(f"{emoji_map['lora']} LORA MODELS:")
-                    for lora_name, lora_strength in lora_matches:
+                    for lora_name, lora_strength in parameters.loras:
                         output.append(f"  {lora_name} (Strength: {lora_strength})")
                     output.append("")
 
                 # Advanced settings
-                if metadata_line:
-                    params_check = {}
-                    patterns = {
-                        'clip_skip': r'Clip skip:\s*(\d+)',
-                        'version': r'Version:\s*([^,]+)',
-                    }
-
-                    for key, pattern in patterns.items():
-                        match = re.search(pattern, metadata_line)
-                        if match:
-                            params_check[key] = match.group(1).strip()
-
-                    if 'clip_skip' in params_check or 'version' in params_check:
-                        output.append(f"{emoji_map['advanced']} ADVANCED SETTINGS:")
-                        if 'clip_skip' in params_check:
-                            output.append(f"  Clip Skip: {params_check['clip_skip']}")
-                        if 'version' in params_check:
-                            output.append(f"  WebUI Version: {params_check['version']}")
-                        output.append("")
+                if 'Clip skip' in params or 'Version' in params:
+                    output.append(f"{emoji_map['advanced']} ADVANCED SETTINGS:")
+                    if 'Clip skip' in params:
+                        output.append(f"  Clip Skip: {params['Clip skip']}")
+                    if 'Version' in params:
+                        output.append(f"  WebUI Version: {params['Version']}")
+                    output.append("")
 
             return "\n".join(output)
 
@@ -676,17 +464,11 @@ class SimpleReadableMetadataSG:
     def parse_comfyui_format(self, metadata_raw, include_emojis=True, image_path=None, file_size_mb=None):
         """Parse ComfyUI JSON format metadata"""
         try:
-            # Safely convert to string FIRST
-            metadata_raw = self.safely_process_value(metadata_raw)
-
-            clean_text = metadata_raw.strip()
-            if clean_text.startswith("Prompt: "):
-                clean_text = clean_text[8:]
-
-            try:
-                data = json.loads(clean_text)
-            except json.JSONDecodeError as e:
-                return f"Error parsing JSON: {str(e)}\n\nPlease ensure the input is valid JSON format."
+            doc = self.as_metadata_document(metadata_raw)
+            data = doc.data
+            graph = doc.graph
+            if data is None:
+                return f"Error parsing JSON: {str(doc.parse_error)}\n\nPlease ensure the input is valid JSON format."
 
             # Create output and emoji_map
             output = []
@@ -708,15 +490,13 @@ class SimpleReadableMetadataSG:
             height = 'N/A'
             batch_size = 'N/A'
 
-            for node_id, node_data in data.items():
+            for node_id, node_data, class_type, inputs in graph.nodes_in("latent"):
                 try:
-                    class_type = node_data.get("class_type", "")
-                    if "LatentImage" in class_type or "EmptyLatent" in class_type:
-                        latent_data = node_data["inputs"]
-                        width = self.resolve_node_reference(data, latent_data.get('width', 'N/A'))
-                        height = self.resolve_node_reference(data, latent_data.get('height', 'N/A'))
-                        batch_size = latent_data.get('batch_size', 'N/A')
-                        break
+                    latent_data = node_data["inputs"]
+                    width = self.resolve_node_reference(graph, latent_data.get('width', 'N/A'))
+                    height = self.resolve_node_reference(graph, latent_data.get('height', 'N/A'))
+                    batch_size = latent_data.get('batch_size', 'N/A')
+                    break
                 except Exception as e:
                     continue
 
@@ -784,10 +564,7 @@ class SimpleReadableMetadataSG:
 
             # Extract model name for display at the top
             model_name_display = "N/A"
-            for node_id, node_data in data.items():
-                class_type = node_data.get("class_type", "")
-                inputs = node_data.get("inputs", {})
-
+            for node_id, node_data, class_type, inputs in graph.nodes_in("loader"):
                 if 'CheckpointLoader' in class_type and 'ckpt_name' in inputs:
                     model_name_display = inputs['ckpt_name']
                     break
@@ -816,49 +593,43 @@ class SimpleReadableMetadataSG:
             }
 
             ksampler_data = None
-            for node_id, node_data in data.items():
+            for node_id, node_data, class_type, inputs in graph.nodes_in("ksampler"):
                 try:
-                    if node_data.get("class_type") == "KSampler":
-                        ksampler_data = node_data.get("inputs", {})
-                        sampling_params['seed'] = self.safely_process_value(ksampler_data.get('seed', 'N/A'))
-                        sampling_params['steps'] = self.safely_process_value(ksampler_data.get('steps', 'N/A'))
-                        sampling_params['cfg'] = self.safely_process_value(ksampler_data.get('cfg', 'N/A'))
-                        sampling_params['sampler'] = self.safely_process_value(ksampler_data.get('sampler_name', 'N/A'))
-                        sampling_params['scheduler'] = self.safely_process_value(ksampler_data.get('scheduler', 'N/A'))
-                        sampling_params['denoise'] = self.safely_process_value(ksampler_data.get('denoise', 'N/A'))
-                        break
+                    ksampler_data = inputs
+                    sampling_params['seed'] = self.safely_process_value(ksampler_data.get('seed', 'N/A'))
+                    sampling_params['steps'] = self.safely_process_value(ksampler_data.get('steps', 'N/A'))
+                    sampling_params['cfg'] = self.safely_process_value(ksampler_data.get('cfg', 'N/A'))
+                    sampling_params['sampler'] = self.safely_process_value(ksampler_data.get('sampler_name', 'N/A'))
+                    sampling_params['scheduler'] = self.safely_process_value(ksampler_data.get('scheduler', 'N/A'))
+                    sampling_params['denoise'] = self.safely_process_value(ksampler_data.get('denoise', 'N/A'))
+                    break
                 except Exception as e:
                     continue
 
             # If no KSampler found, look for distributed nodes
             if not ksampler_data:
-                for node_id, node_data in data.items():
-                    try:
-                        class_type = node_data.get("class_type", "")
-                        inputs = node_data.get("inputs", {})
-
-                        if "Noise" in class_type and "noise_seed" in inputs:
-                            sampling_params['seed'] = self.safely_process_value(inputs.get('noise_seed', 'N/A'))
-                        elif "Noise" in class_type and "seed" in inputs:
-                            sampling_params['seed'] = self.safely_process_value(inputs.get('seed', 'N/A'))
-
-                        if "Scheduler" in class_type:
-                            if 'steps' in inputs:
-                                sampling_params['steps'] = self.safely_process_value(inputs.get('steps', 'N/A'))
-                            if 'scheduler' in inputs:
-                                sampling_params['scheduler'] = self.safely_process_value(inputs.get('scheduler', 'N/A'))
-                            if 'denoise' in inputs:
-                                sampling_params['denoise'] = self.safely_process_value(inputs.get('denoise', 'N/A'))
-
-                        if "CFG" in class_type and 'cfg' in inputs:
-                            sampling_params['cfg'] = self.safely_process_value(inputs.get('cfg', 'N/A'))
-
-                        if "KSamplerSelect" in class_type and 'sampler_name' in inputs:
-                            sampling_params['sampler'] = self.safely_process_value(inputs.get('sampler_name', 'N/A'))
-                        elif "Sampler" in class_type and 'sampler_name' in inputs:
-                            sampling_params['sampler'] = self.safely_process_value(inputs.get('sampler_name', 'N/A'))
-                    except Exception as e:
-                        continue
+                for node_id, node_data, class_type, inputs in graph.nodes_in("noise"):
+                    if "noise_seed" in inputs:
+                        sampling_params['seed'] = self.safely_process_value(inputs.get('noise_seed', 'N/A'))
+                    elif "seed" in inputs:
+                        sampling_params['seed'] = self.safely_process_value(inputs.get('seed', 'N/A'))
+
+                for node_id, node_data, class_type, inputs in graph.nodes_in("scheduler"):
+                    if 'steps' in inputs:
+                        sampling_params['steps'] = self.safely_process_value(inputs.get('steps', 'N/A'))
+                    if 'scheduler' in inputs:
+                        sampling_params['scheduler'] = self.safely_process_value(inputs.get('scheduler', 'N/A'))
+                    if 'denoise' in inputs:
+                        sampling_params['denoise'] = self.safely_process_value(inputs.get('denoise', 'N/A'))
+
+                for node_id, node_data, class_type, inputs in graph.nodes_in("cfg"):
+                    if 'cfg' in inputs:
+                        sampling_params['cfg'] = self.safely_process_value(inputs.get('cfg', 'N/A'))
+
+                # Covers KSamplerSelect as well as other *Sampler* nodes
+                for node_id, node_data, class_type, inputs in graph.nodes_in("sampler"):
+                    if 'sampler_name' in inputs:
+                        sampling_params['sampler'] = self.safely_process_value(inputs.get('sampler_name', 'N/A'))
 
             if any(v != 'N/A' for v in sampling_params.values()):
                 output.append(f"{emoji_map['sampling']} SAMPLING SETTINGS:")
@@ -870,22 +641,20 @@ class SimpleReadableMetadataSG:
                 output.append(f"  Denoise: {sampling_params['denoise']}")
                 output.append("")
 
-            # Extract prompts
-            positive_prompt = ""
-            negative_prompt = ""
+            # Extract prompts by following the samplers' positive/negative links
+            positive_prompt, negative_prompt = graph.sampler_prompts()
+            linked_prompts = bool(positive_prompt or negative_prompt)
             positive_candidates = []
             negative_candidates = []
 
-            for node_id, node_data in data.items():
+            for node_id, node_data, class_type, inputs in graph.nodes_in("text_encode"):
                 try:
-                    class_type = node_data.get("class_type", "")
-                    inputs = node_data.get("inputs", {})
-
-                    if "CLIPTextEncode" in class_type or "TextEncode" in class_type or "Prompt" in class_type:
+                    # No sampler links could be followed: guess polarity from titles and content
+                    if not linked_prompts:
                         title = node_data.get("_meta", {}).get("title", "").lower()
-                        text_value = inputs.get("text", "")
+                        text_value = graph.resolve_value(inputs.get("text", ""))
                         
-                        if self.is_node_reference(text_value):
+                        if text_value is None:
                             continue
                             
                         text_value = self.safely_process_value(text_value)
@@ -928,9 +697,9 @@ class SimpleReadableMetadataSG:
                 negative_prompt = negative_candidates[0]
 
             output.append(f"{emoji_map['prompts']} PROMPTS: |If empty, Check fail-safe below|\n")
-            output.append(f"  Positive:\n           {positive_prompt if positive_prompt else '(empty)'}\n")
+            output.append(f"  Positive:\n{textwrap.indent(positive_prompt if positive_prompt else '(empty)', PROMPT_INDENT)}\n")
             if negative_prompt:
-                output.append(f"  Negative:\n           {negative_prompt}")
+                output.append(f"  Negative:\n{textwrap.indent(negative_prompt, PROMPT_INDENT)}")
             output.append("")
 
                         # Extract LoRA models
@@ -938,71 +707,53 @@ class SimpleReadableMetadataSG:
             lora_files = set()
             processed_keys = set()
             
-            for node_id, node_data in data.items():
+            for node_id, node_data, class_type, inputs in graph.nodes_in("lora"):
                 try:
-                    class_type = node_data.get("class_type", "")
-                    inputs = node_data.get("inputs", {})
-                    
-                    if "lora" in class_type.lower():
-                        for key in inputs:
-                            node_key = f"{node_id}_{key}"
-                            if node_key in processed_keys:
-                                continue
+                    for key in inputs:
+                        node_key = f"{node_id}_{key}"
+                        if node_key in processed_keys:
+                            continue
+                        
+                        key_lower = key.lower()
+                        if 'lora' in key_lower and inputs.get(key) not in [None, "", "None"]:
+                            lora_value = inputs.get(key, "")
                             
-                            key_lower = key.lower()
-                            if 'lora' in key_lower and inputs.get(key) not in [None, "", "None"]:
-                                lora_value = inputs.get(key, "")
-                                
-                                # Handle dict-wrapped LoRA values
-                                if isinstance(lora_value, dict):
-                                    if 'on' in lora_value and not lora_value.get('on'):
-                                        processed_keys.add(node_key)
-                                        continue
-                                    if 'lora' in lora_value:
-                                        actual_lora_name = lora_value.get('lora', '')
-                                        actual_strength = lora_value.get('strength', 1.0)
-                                        if actual_lora_name and actual_lora_name != "None":
-                                            display_name = os.path.basename(self.safely_process_value(actual_lora_name))
-                                            loras.append(f"  {display_name} (Strength: {actual_strength})")
-                                            lora_files.add(actual_lora_name)
-                                        processed_keys.add(node_key)
-                                        continue
-                                
-                                # Skip numeric values
-                                if isinstance(lora_value, (int, float)):
-                                    continue
-                                if isinstance(lora_value, str) and lora_value.replace('.', '').replace('-', '').replace('_', '').isdigit():
+                            # Handle dict-wrapped LoRA values
+                            if isinstance(lora_value, dict):
+                                if 'on' in lora_value and not lora_value.get('on'):
+                                    processed_keys.add(node_key)
                                     continue
-                                if isinstance(lora_value, dict) and lora_value.get('type'):
+                                if 'lora' in lora_value:
+                                    actual_lora_name = lora_value.get('lora', '')
+                                    actual_strength = lora_value.get('strength', 1.0)
+                                    if actual_lora_name and actual_lora_name != "None":
+                                        display_name = os.path.basename(self.safely_process_value(actual_lora_name))
+                                        loras.append(f"  {display_name} (Strength: {actual_strength})")
+                                        lora_files.add(actual_lora_name)
                                     processed_keys.add(node_key)
                                     continue
-                                
-                                # Find corresponding strength value
-                                strength = 1.0
-                                
-                                if '_' in key:
-                                    parts = key.rsplit('_', 1)
-                                    if len(parts) == 2:
-                                        prefix, suffix = parts
-                                        strength_patterns = [
-                                            f"strength_{suffix}",
-                                            f"strength{suffix}",
-                                            f"{prefix}_strength_{suffix}",
-                                            f"str_{suffix}",
-                                        ]
-                                        
-                                        for pattern in strength_patterns:
-                                            if pattern in inputs:
-                                                strength = inputs.get(pattern, 1.0)
-                                                processed_keys.add(pattern)
-                                                break
-                                
-                                if strength == 1.0:
+                            
+                            # Skip numeric values
+                            if isinstance(lora_value, (int, float)):
+                                continue
+                            if isinstance(lora_value, str) and lora_value.replace('.', '').replace('-', '').replace('_', '').isdigit():
+                                continue
+                            if isinstance(lora_value, dict) and lora_value.get('type'):
+                                processed_keys.add(node_key)
+                                continue
+                            
+                            # Find corresponding strength value
+                            strength = 1.0
+                            
+                            if '_' in key:
+                                parts = key.rsplit('_', 1)
+                                if len(parts) == 2:
+                                    prefix, suffix = parts
                                     strength_patterns = [
-                                        "strength_model",
-                                        "strength",
-                                        "model_strength",
-                                        "lora_strength"
+                                        f"strength_{suffix}",
+                                        f"strength{suffix}",
+                                        f"{prefix}_strength_{suffix}",
+                                        f"str_{suffix}",
                                     ]
                                     
                                     for pattern in strength_patterns:
@@ -1010,30 +761,44 @@ class SimpleReadableMetadataSG:
                                             strength = inputs.get(pattern, 1.0)
                                             processed_keys.add(pattern)
                                             break
+                            
+                            if strength == 1.0:
+                                strength_patterns = [
+                                    "strength_model",
+                                    "strength",
+                                    "model_strength",
+                                    "lora_strength"
+                                ]
                                 
-                                numbers = re.findall(r'\d+', key)
-                                if numbers and strength == 1.0:
-                                    num = numbers[-1]
-                                    possible_keys = [
-                                        f"strength_{num}",
-                                        f"strength{num}",
-                                        f"str_{num}",
-                                        f"lora_strength_{num}"
-                                    ]
-                                    
-                                    for possible_key in possible_keys:
-                                        if possible_key in inputs:
-                                            strength = inputs.get(possible_key, 1.0)
-                                            processed_keys.add(possible_key)
-                                            break
-                                
-                                if lora_value and lora_value != "None":
-                                    display_name = os.path.basename(self.safely_process_value(lora_value))
-                                    loras.append(f"  {display_name} (Strength: {strength})")
-                                    lora_files.add(lora_value)
+                                for pattern in strength_patterns:
+                                    if pattern in inputs:
+                                        strength = inputs.get(pattern, 1.0)
+                                        processed_keys.add(pattern)
+                                        break
+                            
+                            numbers = re.findall(r'\d+', key)
+                            if numbers and strength == 1.0:
+                                num = numbers[-1]
+                                possible_keys = [
+                                    f"strength_{num}",
+                                    f"strength{num}",
+                                    f"str_{num}",
+                                    f"lora_strength_{num}"
+                                ]
                                 
-                                processed_keys.add(node_key)
-                
+                                for possible_key in possible_keys:
+                                    if possible_key in inputs:
+                                        strength = inputs.get(possible_key, 1.0)
+                                        processed_keys.add(possible_key)
+                                        break
+                            
+                            if lora_value and lora_value != "None":
+                                display_name = os.path.basename(self.safely_process_value(lora_value))
+                                loras.append(f"  {display_name} (Strength: {strength})")
+                                lora_files.add(lora_value)
+                            
+                            processed_keys.add(node_key)
+            
                 except Exception as e:
                     print(f"Error processing LoRA: {e}")
                     continue
@@ -1052,59 +817,52 @@ class SimpleReadableMetadataSG:
                 'hypernetwork': ['hypernetwork_name', 'hypernetwork'],
             }
             
-            for node_id, node_data in data.items():
+            # LoRA nodes are excluded by the "model" category
+            for node_id, node_data, class_type, inputs in graph.nodes_in("model"):
                 try:
-                    class_type = node_data.get("class_type", "")
-                    inputs = node_data.get("inputs", {})
-                    
-                    # Skip LoRA nodes
-                    if "lora" in class_type.lower():
-                        continue
-                    
-                    if "loader" in class_type.lower() or "load" in class_type.lower() or any(keyword in class_type.lower() for keyword in ['checkpoint', 'unet', 'clip', 'vae', 'model']):
-                        for model_type, param_names in model_keywords.items():
-                            for param_name in param_names:
-                                if param_name in inputs:
-                                    model_value = inputs.get(param_name)
-                                    
-                                    # Skip node references
-                                    if isinstance(model_value, list) and len(model_value) == 2:
+                    for model_type, param_names in model_keywords.items():
+                        for param_name in param_names:
+                            if param_name in inputs:
+                                model_value = inputs.get(param_name)
+                                
+                                # Skip node references
+                                if isinstance(model_value, list) and len(model_value) == 2:
+                                    continue
+                                
+                                # Handle dict-wrapped values
+                                if isinstance(model_value, dict):
+                                    if 'on' in model_value and not model_value.get('on'):
                                         continue
+                                    model_value = model_value.get('model', model_value.get('name', model_value.get('value', '')))
+                                
+                                if isinstance(model_value, list):
+                                    continue
+                                
+                                # Don't add LoRA files to models
+                                if model_value in lora_files:
+                                    continue
+                                
+                                if model_value and model_value != "None":
+                                    display_type = model_type.upper()
                                     
-                                    # Handle dict-wrapped values
-                                    if isinstance(model_value, dict):
-                                        if 'on' in model_value and not model_value.get('on'):
-                                            continue
-                                        model_value = model_value.get('model', model_value.get('name', model_value.get('value', '')))
-                                    
-                                    if isinstance(model_value, list):
-                                        continue
+                                    # Special handling for CLIP
+                                    if model_type == 'clip':
+                                        if param_name == 'clip_name1':
+                                            display_type = "CLIP-1"
+                                        elif param_name == 'clip_name2':
+                                            display_type = "CLIP-2"
+                                        elif param_name.startswith('clip_name') and param_name[-1].isdigit():
+                                            num = param_name.replace('clip_name', '')
+                                            display_type = f"CLIP-{num}"
+                                        else:
+                                            display_type = "CLIP"
                                     
-                                    # Don't add LoRA files to models
-                                    if model_value in lora_files:
-                                        continue
+                                    if display_type not in models:
+                                        models[display_type] = self.safely_process_value(model_value)
                                     
-                                    if model_value and model_value != "None":
-                                        display_type = model_type.upper()
-                                        
-                                        # Special handling for CLIP
-                                        if model_type == 'clip':
-                                            if param_name == 'clip_name1':
-                                                display_type = "CLIP-1"
-                                            elif param_name == 'clip_name2':
-                                                display_type = "CLIP-2"
-                                            elif param_name.startswith('clip_name') and param_name[-1].isdigit():
-                                                num = param_name.replace('clip_name', '')
-                                                display_type = f"CLIP-{num}"
-                                            else:
-                                                display_type = "CLIP"
-                                        
-                                        if display_type not in models:
-                                            models[display_type] = self.safely_process_value(model_value)
-                                        
-                                        if model_type != 'clip':
-                                            break
-                
+                                    if model_type != 'clip':
+                                        break
+            
                 except Exception as e:
                     print(f"Error processing model node: {e}")
                     continue
@@ -1143,7 +901,7 @@ class SimpleReadableMetadataSG:
             output.append("(Fail-safe dump of all text-like values)")
             output.append("")
             
-            all_text_dump = self.extract_all_text_content(data)
+            all_text_dump = self.extract_all_text_content(graph)
             output.append(all_text_dump)
     
             return "\n".join(output)
@@ -1154,14 +912,12 @@ class SimpleReadableMetadataSG:
             print(f"Error in parse_comfyui_format: {e}")
             return f"Error processing parameters: {str(e)}"
 
-    def resolve_node_reference(self, data, reference):
-        """Helper function to resolve node references like ['124', 0]"""
+    def resolve_node_reference(self, graph, reference):
+        """Helper function to resolve node references like ['124', 0] by following links through the prompt graph"""
         if isinstance(reference, list) and len(reference) == 2:
-            node_id = str(reference[0])
-            if node_id in data:
-                node_data = data[node_id]
-                if node_data.get("class_type") == "easy int":
-                    return node_data["inputs"].get("value")
+            value = graph.resolve_value(reference)
+            if value is not None and not self.is_node_reference(value):
+                return value
             # If we can't resolve the reference, return a string representation
             return f"[Node Reference: {reference[0]}]"
         return reference
@@ -1172,64 +928,63 @@ class SimpleReadableMetadataSG:
         negative = ""
         
         try:
-            text = self.safely_process_value(text)
+            doc = self.as_metadata_document(text)
             
             if format_type == "comfyui":
-                clean_text = text.strip()
-                if clean_text.startswith("Prompt: "):
-                    clean_text = clean_text[8:]
-                
                 try:
-                    data = json.loads(clean_text)
+                    data = doc.data
+                    graph = doc.graph
+                    
+                    # Follow the samplers' positive/negative links to the text that fed them
+                    positive, negative = graph.sampler_prompts()
                     
                     positive_candidates = []
                     negative_candidates = []
                     
                     negative_keywords = ["watermark", "bad anatomy", "ugly", "deformed", "disfigured", "blurry", "low quality", "worst quality"]
 
-                    for node_id, node_data in data.items():
+                    # Guess polarity from titles and content only when no sampler links could be followed
+                    text_encoders = [] if positive or negative else graph.nodes_in("text_encode")
+                    for node_id, node_data, class_type, inputs in text_encoders:
                         try:
-                            class_type = node_data.get("class_type", "")
+                            title = node_data.get("_meta", {}).get("title", "").lower()
                             
-                            if "CLIPTextEncode" in class_type or "TextEncode" in class_type or "Prompt" in class_type:
-                                title = node_data.get("_meta", {}).get("title", "").lower()
-                                
-                                text_content = None
-                                for text_key in ["text", "prompt", "conditioning", "string"]:
-                                    if text_key in node_data["inputs"]:
-                                        text_content = node_data["inputs"].get(text_key)
-                                        break
-                                
-                                if text_content is None or self.is_node_reference(text_content):
-                                    continue
-                                
-                                text_content = self.safely_process_value(text_content)
-                                if not text_content or not text_content.strip():
-                                    continue
-                                
-                                # --- SMART LOGIC ---
-                                is_negative_content = any(keyword in text_content.lower() for keyword in negative_keywords)
-                                is_negative_title = any(neg_word in title for neg_word in ["negative", "neg"])
-                                is_positive_title = any(pos_word in title for pos_word in ["positive", "pos"])
+                            text_content = None
+                            for text_key in ["text", "prompt", "conditioning", "string"]:
+                                if text_key in inputs:
+                                    text_content = graph.resolve_value(inputs.get(text_key))
+                                    break
+                            
+                            if text_content is None or self.is_node_reference(text_content):
+                                continue
+                            
+                            text_content = self.safely_process_value(text_content)
+                            if not text_content or not text_content.strip():
+                                continue
+                            
+                            # --- SMART LOGIC ---
+                            is_negative_content = any(keyword in text_content.lower() for keyword in negative_keywords)
+                            is_negative_title = any(neg_word in title for neg_word in ["negative", "neg"])
+                            is_positive_title = any(pos_word in title for pos_word in ["positive", "pos"])
 
-                                is_negative = is_negative_title or is_negative_content
-                                if is_positive_title: is_negative = False
+                            is_negative = is_negative_title or is_negative_content
+                            if is_positive_title: is_negative = False
+                            
+                            # --- PRIORITY LOGIC ---
+                            # Check if this is one of your special "Save" nodes
+                            is_custom_save_node = "SavePositivePromptSG" in class_type or "SaveNegativePromptSG" in class_type
                                 
-                                # --- PRIORITY LOGIC ---
-                                # Check if this is one of your special "Save" nodes
-                                is_custom_save_node = "SavePositivePromptSG" in class_type or "SaveNegativePromptSG" in class_type
-                                    
-                                if is_negative:
-                                    if is_custom_save_node:
-                                        negative_candidates.insert(0, text_content) # High Priority
-                                    else:
-                                        negative_candidates.append(text_content)    # Normal Priority
+                            if is_negative:
+                                if is_custom_save_node:
+                                    negative_candidates.insert(0, text_content) # High Priority
                                 else:
-                                    if is_custom_save_node:
-                                        positive_candidates.insert(0, text_content) # High Priority
-                                    else:
-                                        positive_candidates.append(text_content)    # Normal Priority
-                                    
+                                    negative_candidates.append(text_content)    # Normal Priority
+                            else:
+                                if is_custom_save_node:
+                                    positive_candidates.insert(0, text_content) # High Priority
+                                else:
+                                    positive_candidates.append(text_content)    # Normal Priority
+                                
                         except Exception as e:
                             continue
                     
@@ -1242,16 +997,8 @@ class SimpleReadableMetadataSG:
                     print(f"Error parsing JSON in extract_individual: {e}")
             
             elif format_type == "webui":
-                lines = text.strip().split('\n')
-                metadata_line = ""
-                for line in lines:
-                    if line.startswith("Negative prompt:"):
-                        negative = line.replace("Negative prompt:", "").strip()
-                    elif re.search(r'Steps:\s*\d+', line):
-                        metadata_line = line
-                    elif not metadata_line and not line.startswith("Negative prompt:"):
-                        positive += line + " "
-                positive = positive.strip()
+                positive = doc.parameters.positive
+                negative = doc.parameters.negative
         
         except Exception as e:
             print(f"Error in extract_individual_params: {e}")
@@ -1260,15 +1007,13 @@ class SimpleReadableMetadataSG:
 
 
     
-    def extract_all_text_content(self, data):
+    def extract_all_text_content(self, graph):
         """Extract ALL text strings from the workflow as a fail-safe"""
         all_texts = []
         seen_texts = set()
         
         try:
-            for node_id, node_data in data.items():
-                inputs = node_data.get("inputs", {})
-                class_type = node_data.get("class_type", "")
+            for node_id, node_data, class_type, inputs in graph.nodes:
                 
                 # Check for common text keys
                 candidates = []
@@ -1277,7 +1022,7 @@ class SimpleReadableMetadataSG:
                         val = inputs[key]
                         # Try to resolve if reference
                         if self.is_node_reference(val):
-                            val = self.resolve_node_reference(data, val)
+                            val = self.resolve_node_reference(graph, val)
                         
                         val = self.safely_process_value(val)
                         if val and val != "N/A" and isinstance(val, str):
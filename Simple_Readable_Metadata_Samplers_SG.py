@@ -0,0 +1,146 @@
+import re
+import threading
+import comfy.samplers
+
+# Sampler/scheduler name resolution for the MAX node's typed SAMPLER/SCHEDULER outputs.
+# ComfyUI names and A1111/Forge display names ("DPM++ 2M Karras", "Euler a") are normalized into one
+# dict per kind, built once per process, so a name resolves with a single lookup instead of scans.
+
+# A1111/Forge sampler display names -> ComfyUI sampler
+A1111_SAMPLERS = {
+    "euler": "euler",
+    "euler a": "euler_ancestral",
+    "euler cfg++": "euler_cfg_pp",
+    "euler a cfg++": "euler_ancestral_cfg_pp",
+    "lms": "lms",
+    "heun": "heun",
+    "heunpp2": "heunpp2",
+    "dpm2": "dpm_2",
+    "dpm2 a": "dpm_2_ancestral",
+    "dpm++ 2s a": "dpmpp_2s_ancestral",
+    "dpm++ 2m": "dpmpp_2m",
+    "dpm++ 2m cfg++": "dpmpp_2m_cfg_pp",
+    "dpm++ sde": "dpmpp_sde",
+    "dpm++ 2m sde": "dpmpp_2m_sde",
+    "dpm++ 2m sde gpu": "dpmpp_2m_sde_gpu",
+    "dpm++ 2m sde heun": "dpmpp_2m_sde",
+    "dpm++ 3m sde": "dpmpp_3m_sde",
+    "dpm fast": "dpm_fast",
+    "dpm adaptive": "dpm_adaptive",
+    "lcm": "lcm",
+    "ddim": "ddim",
+    "ddpm": "ddpm",
+    "unipc": "uni_pc",
+    "deis": "deis",
+    "ipndm": "ipndm",
+    "ipndm v": "ipndm_v",
+    "res multistep": "res_multistep",
+}
+
+# A1111/Forge "Schedule type" values and sampler name suffixes -> ComfyUI scheduler
+A1111_SCHEDULERS = {
+    "automatic": None,
+    "uniform": "normal",
+    "karras": "karras",
+    "exponential": "exponential",
+    "sgm uniform": "sgm_uniform",
+    "simple": "simple",
+    "normal": "normal",
+    "ddim": "ddim_uniform",
+    "beta": "beta",
+    "kl optimal": "kl_optimal",
+    "linear quadratic": "linear_quadratic",
+    "align your steps": "align_your_steps",
+}
+
+# Older A1111 versions put the schedule in the sampler name ("DPM++ 2M Karras")
+SCHEDULER_SUFFIXES = ("karras", "exponential", "sgm uniform")
+
+_SEPARATORS = re.compile(r'[\s_\-]+')
+
+
+def normalize_name(name):
+    """Lowercase with '_', '-' and runs of whitespace folded to single spaces"""
+    return _SEPARATORS.sub(' ', name.lower()).strip()
+
+
+def _names(values, fallback):
+    if isinstance(values, dict):
+        return list(values.keys())
+    if isinstance(values, (list, tuple)):
+        return list(values)
+    return [fallback]
+
+
+class SamplerTable:
+    """Normalized name -> ComfyUI sampler/scheduler, rebuilt only if ComfyUI's lists change"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._source = None
+        self.samplers = {}
+        self.schedulers = {}
+        self.default_sampler = "euler"
+        self.default_scheduler = "normal"
+
+    def _ensure(self):
+        # Custom nodes may register extra samplers after we're imported; a length check catches that
+        try:
+            samplers = _names(comfy.samplers.KSampler.SAMPLERS, "euler")
+            schedulers = _names(comfy.samplers.KSampler.SCHEDULERS, "normal")
+        except Exception as e:
+            print(f"Error getting samplers: {e}")
+            samplers, schedulers = ["euler"], ["normal"]
+        source = (len(samplers), len(schedulers))
+        if source == self._source:
+            return
+
+        with self._lock:
+            sampler_table = {normalize_name(s): s for s in samplers}
+            available = set(samplers)
+            for alias, sampler in A1111_SAMPLERS.items():
+                if sampler in available:
+                    sampler_table.setdefault(alias, sampler)
+
+            scheduler_table = {normalize_name(s): s for s in schedulers}
+            available = set(schedulers)
+            for alias, scheduler in A1111_SCHEDULERS.items():
+                if scheduler is None or scheduler in available:
+                    scheduler_table.setdefault(alias, scheduler)
+
+            self.samplers = sampler_table
+            self.schedulers = scheduler_table
+            self.default_sampler = samplers[0] if samplers else "euler"
+            self.default_scheduler = schedulers[0] if schedulers else "normal"
+            self._source = source
+
+    def resolve(self, sampler_str, scheduler_str=None):
+        """(sampler, scheduler) ComfyUI names for sampler/scheduler strings from any supported source
+
+        A scheduler named inside the sampler ("DPM++ 2M Karras") is used when no explicit one is given.
+        Unknown names resolve to ComfyUI's first entry, as before.
+        """
+        self._ensure()
+        sampler, implied_scheduler = None, None
+
+        key = normalize_name(sampler_str) if isinstance(sampler_str, str) else ""
+        if key:
+            sampler = self.samplers.get(key)
+            if sampler is None:
+                for suffix in SCHEDULER_SUFFIXES:
+                    if key.endswith(" " + suffix):
+                        sampler = self.samplers.get(key[:-len(suffix) - 1])
+                        if sampler is not None:
+                            implied_scheduler = self.schedulers.get(suffix)
+                            break
+
+        scheduler = None
+        key = normalize_name(scheduler_str) if isinstance(scheduler_str, str) else ""
+        if key:
+            scheduler = self.schedulers.get(key)
+
+        return (sampler or self.default_sampler,
+                scheduler or implied_scheduler or self.default_scheduler)
+
+
+sampler_table = SamplerTable()
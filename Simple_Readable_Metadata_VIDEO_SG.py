@@ -5,9 +5,21 @@ import numpy as np
 import cv2
 import json
 import re
+import shutil
 import subprocess
 from types import SimpleNamespace
-from PIL import Image, ImageSequence
+from PIL import Image
+from .Simple_Readable_Metadata_Container_SG import read_container
+from .Simple_Readable_Metadata_Document_SG import MetadataDocument, outputs_connected
+from .Simple_Readable_Metadata_Exif_SG import parse_exif
+from .Simple_Readable_Metadata_Frames_SG import (
+    BUDGET_STRATEGIES, MAX_DECODE_THREADS, OUTPUT_DTYPES, AnimatedImage, FrameSampler, FrameBuffer, TimeSelection,
+    decode_animated_frames, decode_selected_frames, fit_memory_budget, frame_cache, ones_mask, resized_size, rgb_to_image,
+)
+from .Simple_Readable_Metadata_Listing_SG import ANIMATED_EXTENSIONS, input_files
+
+# ffprobe is only a fallback for containers read_container doesn't handle
+FFPROBE_TIMEOUT = 30
 
 class SimpleReadableMetadataVideoSG:
     """
@@ -20,34 +32,80 @@ class SimpleReadableMetadataVideoSG:
 
     @classmethod
     def INPUT_TYPES(cls):
-        input_dir = folder_paths.get_input_directory()
-        files = [f for f in os.listdir(input_dir) if os.path.isfile(os.path.join(input_dir, f))]
+        files = input_files("video")
         return {
             "required": {
-                "video": (sorted(files), {"video_upload": True}),
+                "video": (files, {"video_upload": True}),
                 "force_rate": ("INT", {"default": 0, "min": 0, "max": 60, "step": 1, "display": "number", "tooltip": "Target FPS. 0 = Original."}),
                 "max_frames": ("INT", {"default": 0, "min": 0, "max": 10000, "step": 1, "display": "number", "tooltip": "Limit total frames. 0 = All."}),
                 "resize_long_edge": ("INT", {"default": 0, "min": 0, "max": 4096, "step": 64, "display": "number", "tooltip": "Resize longest side. 0 = Original."}),
-                "emoji_in_readable_text": ("BOOLEAN", {"default": True})
+                "emoji_in_readable_text": ("BOOLEAN", {"default": True}),
+            },
+            "optional": {
+                "decode_frames": (["auto", "always", "never"], {"default": "auto", "tooltip": "auto: only decode frames when the frames/mask outputs are connected"}),
+                "memory_budget_mb": ("INT", {"default": 0, "min": 0, "max": 262144, "step": 64, "display": "number", "tooltip": "Max size of the frames output in MB. 0 = Unlimited."}),
+                "budget_strategy": (BUDGET_STRATEGIES, {"default": "reduce frames", "tooltip": "What to lower when the clip exceeds memory_budget_mb."}),
+                "output_dtype": (list(OUTPUT_DTYPES), {"default": "float32", "tooltip": "float16 halves the memory used by the frames."}),
+                "decode_threads": ("INT", {"default": 1, "min": 1, "max": MAX_DECODE_THREADS, "step": 1, "display": "number", "tooltip": "Decode segments of the clip in parallel. 1 = Sequential."}),
+                "disk_cache_mb": ("INT", {"default": 0, "min": 0, "max": 1048576, "step": 256, "display": "number", "tooltip": "Keep decoded frames on disk up to this many MB and reuse them on the next load. 0 = Off."}),
+                "start_time": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 86400.0, "step": 0.1, "display": "number", "tooltip": "Start of the range to load, in seconds."}),
+                "end_time": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 86400.0, "step": 0.1, "display": "number", "tooltip": "End of the range to load, in seconds. 0 = End of clip."}),
+            },
+            "hidden": {
+                "prompt": "PROMPT",
+                "unique_id": "UNIQUE_ID",
             },
             "ui": {
                 "text": {"min_width": 450},
             },
         }
 
-    RETURN_TYPES = ("STRING", "IMAGE", "MASK", "INT", "INT", "STRING", "STRING", "STRING", "STRING", "INT")
-    RETURN_NAMES = ("Simple_Readable_Metadata", "frames", "mask", "frame_count", "fps", "filename_text", "metadata_raw", "Positive_Prompt", "Negative_Prompt", "seed")
+    RETURN_TYPES = ("STRING", "IMAGE", "MASK", "INT", "INT", "STRING", "STRING", "STRING", "STRING", "INT", "FLOAT", "INT", "STRING", "INT", "STRING")
+    RETURN_NAMES = ("Simple_Readable_Metadata", "frames", "mask", "frame_count", "fps", "filename_text", "metadata_raw", "Positive_Prompt", "Negative_Prompt", "seed", "duration", "total_frames", "codec", "bitrate_kbps", "pix_fmt")
+    OUTPUT_TOOLTIPS = (
+        "Video information and readable generation metadata",
+        "Decoded frames",
+        "All-ones mask, one per frame. A read-only expanded view (no per-pixel memory): call .clone() before modifying it in place",
+        "Number of frames in the frames output",
+        "Frame rate of the frames output",
+        "File name",
+        "Raw embedded metadata",
+        "Positive prompt",
+        "Negative prompt",
+        "Seed (0 if unknown)",
+        "Duration of the whole file in seconds, from the container headers",
+        "Frames in the whole file, from the container headers",
+        "Video codec",
+        "Overall bitrate in kb/s",
+        "Pixel format (empty if unknown)",
+    )
     FUNCTION = "load_video_analyze"
     OUTPUT_NODE = True
 
+    # Positions of the frames and mask outputs in RETURN_TYPES
+    PIXEL_OUTPUTS = (1, 2)
+
     @classmethod
-    def IS_CHANGED(cls, video, force_rate, max_frames, resize_long_edge, emoji_in_readable_text):
+    def IS_CHANGED(cls, video, force_rate, max_frames, resize_long_edge, emoji_in_readable_text, decode_frames="auto",
+                   memory_budget_mb=0, budget_strategy="reduce frames", output_dtype="float32", decode_threads=1,
+                   disk_cache_mb=0, start_time=0.0, end_time=0.0, prompt=None, unique_id=None):
+        # decode_threads and disk_cache_mb don't change the output. ComfyUI passes an empty PROMPT here, so the
+        # "auto" decode decision is left to execution
         video_path = folder_paths.get_annotated_filepath(video)
         if os.path.exists(video_path):
             stat = os.stat(video_path)
-            return f"{video}_{stat.st_mtime}_{stat.st_size}_{force_rate}_{max_frames}_{resize_long_edge}"
+            return f"{video}_{stat.st_mtime}_{stat.st_size}_{force_rate}_{max_frames}_{resize_long_edge}_{memory_budget_mb}_{budget_strategy}_{output_dtype}_{start_time}_{end_time}_{decode_frames}"
         return "N/A"
 
+    @classmethod
+    def should_decode_frames(cls, decode_frames, prompt, unique_id):
+        """Decide whether the frames/mask tensors have to be built"""
+        if decode_frames == "always":
+            return True
+        if decode_frames == "never":
+            return False
+        return outputs_connected(prompt, unique_id, cls.PIXEL_OUTPUTS)
+
     @classmethod
     def VALIDATE_INPUTS(cls, video, **kwargs):
         if not folder_paths.exists_annotated_filepath(video):
@@ -56,8 +114,8 @@ class SimpleReadableMetadataVideoSG:
  
     # ============================METADATA EXTRACTION UTILS====================================
 
-    def extract_raw_video_metadata(self, video_path):
-        """Smart metadata extraction based on file type."""
+    def extract_raw_video_metadata(self, video_path, container=None):
+        """Smart metadata extraction based on file type. container: read_container() result, if already read."""
         ext = os.path.splitext(video_path)[1].lower()
         
         # STRATEGY A: PIL (WebP, APNG, GIF)
@@ -68,35 +126,75 @@ class SimpleReadableMetadataVideoSG:
                     if 'workflow' in img.info: return json.dumps({"workflow_only": img.info['workflow']})
                     if 'exif' in img.info:
                         try:
-                             exif_data = img.info['exif']
-                             if isinstance(exif_data, bytes):
-                                 exif_str = exif_data.decode('utf-8', errors='ignore')
-                                 if "prompt:" in exif_str: return exif_str.split("prompt:")[1].split("\x00")[0]
+                             exif = parse_exif(img.info['exif'])
+                             prompt_data = exif.marker_payload("prompt") if exif else None
+                             if prompt_data is not None: return str(prompt_data, 'utf-8', errors='ignore')
                         except: pass
             except: pass
 
-        # STRATEGY B: FFPROBE
+        # STRATEGY B: CONTAINER TAGS (MP4/MOV, MKV/WebM), read in-process without touching the media data
+        container = container or read_container(video_path)
+        if container is not None:
+            return self.find_metadata_tag([container.tags, container.stream_tags])
+
+        # STRATEGY C: FFPROBE, for other containers and only if it is installed
+        if shutil.which('ffprobe') is None: return None
         try:
             command = ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', '-show_streams', video_path]
-            result = subprocess.run(command, capture_output=True, text=True, encoding='utf-8')
+            result = subprocess.run(command, capture_output=True, text=True, encoding='utf-8', timeout=FFPROBE_TIMEOUT)
             if result.returncode == 0:
                 data = json.loads(result.stdout)
                 sources = []
-                if 'format' in data and 'tags' in data['format']: sources.append(data['format']['tags'])
+                if 'format' in data and 'tags' in data['format']: sources.append(data['format']['tags'].items())
                 if 'streams' in data:
                     for stream in data['streams']:
-                        if stream.get('codec_type') == 'video' and 'tags' in stream: sources.append(stream['tags'])
-                
-                for tags in sources:
-                    for key in ['comment', 'prompt', 'workflow', 'description', 'user_data']:
-                        for t_key, t_val in tags.items():
-                            if t_key.lower() == key:
-                                clean_val = t_val.strip()
-                                if clean_val.startswith('{') or "Prompt:" in clean_val: return clean_val
+                        if stream.get('codec_type') == 'video' and 'tags' in stream: sources.append(stream['tags'].items())
+                return self.find_metadata_tag(sources)
         except: pass
         return None
 
-    def get_concise_display_info(self, metadata_raw):
+    def find_metadata_tag(self, sources):
+        """First comment/prompt/workflow/... tag value holding generation metadata, sources are lists of (name, value)"""
+        for tags in sources:
+            tags = list(tags)
+            for key in ['comment', 'prompt', 'workflow', 'description', 'user_data']:
+                for t_key, t_val in tags:
+                    if t_key.lower() == key and isinstance(t_val, str):
+                        clean_val = t_val.strip()
+                        if clean_val.startswith('{') or "Prompt:" in clean_val: return clean_val
+        return None
+
+    def probe_stream(self, video_path, container, cap):
+        """(duration, total_frames, codec, bitrate_kbps, pix_fmt) from the container headers, falling back to
+        what the capture reports. Nothing is decoded, so these hold for the whole file whatever max_frames is."""
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        total_frames = (container and container.frame_count) or max(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 0)
+        duration = (container and container.duration) or (total_frames / fps if fps else 0.0)
+
+        codec = container and container.codec
+        if not codec:
+            fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+            codec = "".join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00 ").lower() if fourcc else ""
+
+        bit_rate = container and container.bit_rate
+        if bit_rate:
+            bitrate_kbps = round(bit_rate / 1000)
+        else:
+            bitrate_kbps = int(cap.get(cv2.CAP_PROP_BITRATE))
+            if not bitrate_kbps and duration:
+                try: bitrate_kbps = round(os.path.getsize(video_path) * 8 / duration / 1000)
+                except OSError: pass
+        return float(duration), int(total_frames), codec, int(bitrate_kbps), (container and container.pix_fmt) or ""
+
+    def probe_animation(self, video_path, animation):
+        """probe_stream() values for an AnimatedImage; the duration is exact once its frames were all read"""
+        duration = (animation.duration_ms / 1000.0 if animation.duration_ms is not None
+                    else animation.frame_count / animation.fps)
+        try: bitrate_kbps = round(os.path.getsize(video_path) * 8 / duration / 1000) if duration else 0
+        except OSError: bitrate_kbps = 0
+        return float(duration), int(animation.frame_count), (animation.format or "").lower(), int(bitrate_kbps), ""
+
+    def get_concise_display_info(self, doc):
         """Extracts specific fields for the CONCISE NODE DISPLAY (UI)."""
         info = {
             "model": "N/A",
@@ -107,11 +205,11 @@ class SimpleReadableMetadataVideoSG:
             "scheduler": "N/A"
         }
         
-        if not metadata_raw: return info
+        if not doc: return info
 
         try:
-            if metadata_raw.strip().startswith("Prompt:"): metadata_raw = metadata_raw.strip()[7:]
-            data = json.loads(metadata_raw)
+            data = doc.data
+            if data is None: return info
 
             # 1. MODEL EXTRACTION
             
@@ -182,18 +280,18 @@ class SimpleReadableMetadataVideoSG:
         except: pass
         return info
 
-    def extract_full_readable_text(self, metadata_raw, include_emojis=True):
+    def extract_full_readable_text(self, doc, include_emojis=True):
         """Generates the FULL DETAILED text output for the STRING output."""
-        if not metadata_raw: return "No metadata found."
+        if not doc: return "No metadata found."
         try:
-            if metadata_raw.strip().startswith("Prompt:"): metadata_raw = metadata_raw.strip()[7:]
-            data = json.loads(metadata_raw)
+            data = doc.data
+            if data is None: return doc.raw
             
             lines = []
             emoji_map = {"models": "🧠", "sampling": "🎯", "prompts": "📝", "lora": "🎨"} if include_emojis else {k: "" for k in ["models", "sampling", "prompts", "lora"]}
             
             # Model (Reuse concise logic to get the MAIN model name)
-            info = self.get_concise_display_info(metadata_raw)
+            info = self.get_concise_display_info(doc)
             lines.append(f"{emoji_map['models']} MODEL: {info['model']}\n")
 
             # Sampling
@@ -234,13 +332,13 @@ class SimpleReadableMetadataVideoSG:
 
             return "\n".join(lines)
         except:
-            return metadata_raw 
+            return doc.raw
 
-    def extract_individual_params(self, metadata_raw):
+    def extract_individual_params(self, doc):
         pos, neg, seed = "", "", 0
         try:
-            if metadata_raw and metadata_raw.strip().startswith("{"):
-                data = json.loads(metadata_raw)
+            if doc and doc.text.startswith("{"):
+                data = doc.data
                 if isinstance(data, dict) and "nodes" not in data:
                     for k, v in data.items():
                          if "Sampler" in v.get("class_type", ""):
@@ -271,42 +369,102 @@ class SimpleReadableMetadataVideoSG:
 
     # ==================================== MAIN EXECUTION========================================
 
-    def load_video_analyze(self, video, force_rate, max_frames, resize_long_edge, emoji_in_readable_text=True):
+    def load_video_analyze(self, video, force_rate, max_frames, resize_long_edge, emoji_in_readable_text=True, decode_frames="auto",
+                           memory_budget_mb=0, budget_strategy="reduce frames", output_dtype="float32", decode_threads=1,
+                           disk_cache_mb=0, start_time=0.0, end_time=0.0, prompt=None, unique_id=None):
         video_path = folder_paths.get_annotated_filepath(video)
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened(): raise RuntimeError(f"Could not open video: {video_path}")
+        # Animated WebP/GIF/APNG are read with PIL, cv2 can't decode animated WebP. The input list offers
+        # .apng by name only; an APNG saved as .png is accepted when given (upload, API), a still one is one frame
+        ext = os.path.splitext(video_path)[1].lower()
+        animated = ext in ANIMATED_EXTENSIONS or ext == '.png'
+        container, stream = None, None
+        if animated:
+            sampler = AnimatedImage(video_path)
+            original_fps, width, height = sampler.fps, sampler.width, sampler.height
+        else:
+            sampler = FrameSampler(video_path)
+            cap = sampler.cap
 
-        original_fps = cap.get(cv2.CAP_PROP_FPS)
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        
-        frames = []
-        step = 1
-        if force_rate > 0 and force_rate < original_fps: step = max(1, int(original_fps / force_rate))
-        effective_fps = original_fps / step if step > 1 else original_fps
-        if force_rate > 0: effective_fps = force_rate
-
-        count = 0
-        output_count = 0
-        while True:
-            ret, frame = cap.read()
-            if not ret: break
-            if count % step == 0:
-                if resize_long_edge > 0:
-                    h, w = frame.shape[:2]
-                    if max(h, w) > resize_long_edge:
-                        scale = resize_long_edge / max(h, w)
-                        frame = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB).astype(np.float32) / 255.0
-                frames.append(torch.from_numpy(frame))
-                output_count += 1
-                if max_frames > 0 and output_count >= max_frames: break
-            count += 1
-        cap.release()
+            original_fps = cap.get(cv2.CAP_PROP_FPS)
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+            # Header probe: the tags and the whole-file stream properties come from one read of the container
+            container = read_container(video_path)
+            stream = self.probe_stream(video_path, container, cap)
         
-        if not frames: raise RuntimeError("No frames extracted.")
-        output_frames = torch.stack(frames)
-        mask = torch.ones((output_frames.shape[0], output_frames.shape[1], output_frames.shape[2]), dtype=torch.float32)
+        # Frames are picked by timestamp: the start/end range, thinned to force_rate slots when it is below the clip's rate
+        start_ms, end_ms = start_time * 1000.0, end_time * 1000.0
+        selection = TimeSelection(original_fps, force_rate, start_ms, end_ms)
+        effective_fps = selection.target_rate
+
+        dtype = OUTPUT_DTYPES.get(output_dtype, torch.float32)
+        budget_note = ""
+        if memory_budget_mb > 0:
+            requested = (max_frames, resize_long_edge)
+            max_frames, resize_long_edge = fit_memory_budget(
+                memory_budget_mb, selection.expected_count(sampler.frame_count), width, height,
+                dtype, budget_strategy, max_frames, resize_long_edge)
+            if (max_frames, resize_long_edge) != requested:
+                out_w, out_h = resized_size(width, height, resize_long_edge)
+                budget_note = f"Memory Budget: {memory_budget_mb}MB -> max {max_frames} frames at {out_w}x{out_h}\n"
+        selection = TimeSelection(original_fps, force_rate, start_ms, end_ms, max_frames)
+        range_note = ""
+        if start_time > 0 or end_time > 0:
+            range_note = f"Range: {start_time:.2f}s - {f'{end_time:.2f}s' if end_time > start_time else 'end'}\n"
+
+        def resize(frame):
+            h, w = frame.shape[:2]
+            out_w, out_h = resized_size(w, h, resize_long_edge)
+            if (out_w, out_h) != (w, h):
+                frame = cv2.resize(frame, (out_w, out_h), interpolation=cv2.INTER_AREA)
+            return frame
+
+        # Disk cache entries hold the uint8 frames of exactly these decode settings
+        decode = self.should_decode_frames(decode_frames, prompt, unique_id)
+        cache_key, cached = None, None
+        if decode and disk_cache_mb > 0:
+            try:
+                cache_key = frame_cache.key(video_path, force_rate, max_frames, resize_long_edge, start_time, end_time)
+                cached = frame_cache.load(cache_key)
+            except Exception as e:
+                print(f"Error reading frame cache: {e}")
+
+        if not decode:
+            # Probe only: the capture was opened for fps, frame count and size, nothing reads frames/mask
+            sampler.release()
+            out_w, out_h = resized_size(width, height, resize_long_edge)
+            output_frames = torch.zeros((0, out_h, out_w, 3), dtype=dtype)
+            frame_count = selection.expected_count(sampler.frame_count)
+        elif cached is not None:
+            sampler.release()
+            rgb, _ = cached
+            output_frames = rgb_to_image(rgb, dtype)
+            frame_count = output_frames.shape[0]
+        else:
+            # Only the kept frames are retrieved and converted, skipped ones are grabbed or seeked over.
+            # Frames are decoded straight into one preallocated tensor sized from the container frame count,
+            # by decode_threads captures working on contiguous segments when more than one is asked for.
+            frames = FrameBuffer(selection.expected_count(sampler.frame_count), torch.uint8 if cache_key else dtype)
+            if animated:
+                count = decode_animated_frames(sampler, selection, frames, resize)
+            else:
+                count = decode_selected_frames(sampler, selection, frames, resize, decode_threads)
+
+            if not frames.count: raise RuntimeError("No frames extracted.")
+            output_frames = frames.tensor()
+            if cache_key:
+                rgb = output_frames.numpy()
+                frame_cache.store(cache_key, rgb, {"position": count}, disk_cache_mb * 1024 * 1024)
+                output_frames = rgb_to_image(rgb, dtype)
+            frame_count = output_frames.shape[0]
+        mask = ones_mask(*output_frames.shape[:3])
+
+        if animated:
+            # The decode measured the real frame durations
+            effective_fps = force_rate if 0 < force_rate < sampler.fps else sampler.fps
+            stream = self.probe_animation(video_path, sampler)
+        duration, total_frames, codec, bitrate_kbps, pix_fmt = stream
 
         # --- METADATA LOGIC ---
         
@@ -323,28 +481,30 @@ class SimpleReadableMetadataVideoSG:
         else: ratio_str += f" or {ar_dec:.2f}:1"
 
         # 2. Extract Raw Metadata
-        metadata_raw = self.extract_raw_video_metadata(video_path)
+        metadata_raw = self.extract_raw_video_metadata(video_path, container)
+        doc = MetadataDocument(metadata_raw) if metadata_raw else None
         
         # 3. GENERATE UI DISPLAY TEXT 
-        gen_info = self.get_concise_display_info(metadata_raw)
+        gen_info = self.get_concise_display_info(doc)
         ui_lines = []
         ui_lines.append(f"{width}x{height} | {resolution_mp:.2f}MP")
         ui_lines.append(f"Ratio: {ratio_str}")
         ui_lines.append(f"File Size: {file_size_mb:.2f}MB")
+        ui_lines.append(f"Duration: {duration:.1f}s | {total_frames} frames | {codec or 'unknown'}")
         ui_lines.append("") 
         ui_lines.append(f"Model: {gen_info['model']}")
         ui_lines.append(f"Seed: {gen_info['seed']} | Steps: {gen_info['steps']} | CFG: {gen_info['cfg']}")
         ui_lines.append(f"Sampler: {gen_info['sampler']} | Scheduler: {gen_info['scheduler']}")
 
         # 4. GENERATE OUTPUT STRING (Full/Rich)
-        full_readable_text = f"=== Video Information ===\nFilename: {os.path.basename(video_path)}\n{width}x{height} | {resolution_mp:.2f}MP | {file_size_mb:.2f}MB\nFPS: {int(effective_fps)} | Duration: {(count/original_fps if original_fps else 0):.1f}s\n\n"
+        full_readable_text = f"=== Video Information ===\nFilename: {os.path.basename(video_path)}\n{width}x{height} | {resolution_mp:.2f}MP | {file_size_mb:.2f}MB\nFPS: {int(effective_fps)} | Duration: {duration:.1f}s\nFrames: {total_frames} | Codec: {codec or 'unknown'}{f' ({pix_fmt})' if pix_fmt else ''} | Bitrate: {bitrate_kbps} kb/s\n{range_note}{budget_note}\n"
         if metadata_raw:
-            full_readable_text += self.extract_full_readable_text(metadata_raw, emoji_in_readable_text)
+            full_readable_text += self.extract_full_readable_text(doc, emoji_in_readable_text)
         else:
             full_readable_text += "(No embedded ComfyUI generation metadata detected in file)"
 
         # Return Values
-        pos, neg, seed = self.extract_individual_params(metadata_raw)
+        pos, neg, seed = self.extract_individual_params(doc)
         
         return {
             "ui": {"text": ui_lines},
@@ -352,13 +512,18 @@ class SimpleReadableMetadataVideoSG:
                 full_readable_text,    
                 output_frames, 
                 mask, 
-                len(frames), 
+                frame_count, 
                 int(effective_fps), 
                 os.path.basename(video_path), 
                 metadata_raw if metadata_raw else "", 
                 pos, 
                 neg, 
-                seed
+                seed,
+                duration,
+                total_frames,
+                codec,
+                bitrate_kbps,
+                pix_fmt
             )
         }
 
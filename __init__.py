@@ -1,6 +1,8 @@
 import os
 from .Simple_Readable_Metadata_MAX_SG import SimpleReadableMetadataMAXSG
 from .Simple_Readable_Metadata_SG import SimpleReadableMetadataSG
+from .Simple_Readable_Metadata_Batch_SG import SimpleReadableMetadataBatchSG
+from .Simple_Readable_Metadata_Catalog_SG import SimpleReadableMetadataCatalogSG
 from .Simple_Readable_Metadata_Text_Viewer_SG import SimpleReadableMetadataTextViewerSG
 from .Simple_Readable_Metadata_Save_Text_SG import SimpleReadableMetadataSaveTextSG
 from .Simple_Readable_Metadata_VIDEO_SG import SimpleReadableMetadataVideoSG
@@ -10,6 +12,8 @@ from .Simple_Readable_Metadata_Save_Prompt_SG import SaveNegativePromptSG
 NODE_CLASS_MAPPINGS = {
     "SimpleReadableMetadataMAXSG": SimpleReadableMetadataMAXSG,
     "SimpleReadableMetadataSG": SimpleReadableMetadataSG,
+    "SimpleReadableMetadataBatchSG": SimpleReadableMetadataBatchSG,
+    "SimpleReadableMetadataCatalogSG": SimpleReadableMetadataCatalogSG,
     "Simple Readable Metadata Text Viewer-SG": SimpleReadableMetadataTextViewerSG,
     "SimpleReadableMetadataSaveTextSG": SimpleReadableMetadataSaveTextSG,
     "SimpleReadableMetadataVideoSG": SimpleReadableMetadataVideoSG,
@@ -20,6 +24,8 @@ NODE_CLASS_MAPPINGS = {
 NODE_DISPLAY_NAME_MAPPINGS = {
     "SimpleReadableMetadataMAXSG": "Simple Readable Metadata MAX-SG",
     "SimpleReadableMetadataSG": "Simple Readable Metadata-SG",
+    "SimpleReadableMetadataBatchSG": "Simple Readable Metadata Batch-SG",
+    "SimpleReadableMetadataCatalogSG": "Simple Readable Metadata Catalog-SG",
     "Simple Readable Metadata Text Viewer-SG": "Simple Readable Metadata 🧾 Text Viewer-SG",
     "SimpleReadableMetadataSaveTextSG": "Simple Readable Metadata Save Text-SG",
     "SimpleReadableMetadataVideoSG": "Simple Readable Metadata (VIDEO)-SG",
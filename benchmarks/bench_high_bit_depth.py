@@ -0,0 +1,97 @@
+"""Throughput of the 16-bit PNG decode path against the old point()/convert('RGB') route.
+
+Run from the repository root (needs torch, numpy, Pillow and opencv-python):
+
+    python benchmarks/bench_high_bit_depth.py [--size 4096] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+import torch
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Simple_Readable_Metadata_Pixels_SG import image_to_tensors  # noqa: E402
+from Simple_Readable_Metadata_Reader_SG import read_image_header  # noqa: E402
+
+
+def legacy_to_tensors(image_path):
+    """The conversion the loader nodes used before (8-bit, PIL per-pixel point())"""
+    img = Image.open(image_path)
+    if img.mode == 'I':
+        img = img.point(lambda i: i * (1 / 255))
+    original_img = img
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    image_tensor = torch.from_numpy(np.array(img).astype(np.float32) / 255.0).unsqueeze(0)
+    if 'A' in original_img.getbands():
+        mask = np.array(original_img.getchannel('A')).astype(np.float32) / 255.0
+        mask = 1. - torch.from_numpy(mask)
+    else:
+        mask = torch.zeros((original_img.size[1], original_img.size[0]), dtype=torch.float32, device="cpu")
+    return image_tensor, mask
+
+
+def vectorized_to_tensors(image_path):
+    return image_to_tensors(Image.open(image_path), image_path, read_image_header(image_path))
+
+
+def make_samples(directory, size):
+    rng = np.random.default_rng(0)
+    samples = {}
+
+    gray = rng.integers(0, 65536, (size, size), dtype=np.uint16)
+    samples["gray16"] = (os.path.join(directory, "gray16.png"), gray)
+    cv2.imwrite(samples["gray16"][0], gray)
+
+    rgb = rng.integers(0, 65536, (size, size, 3), dtype=np.uint16)
+    samples["rgb16"] = (os.path.join(directory, "rgb16.png"), rgb)
+    cv2.imwrite(samples["rgb16"][0], rgb[..., ::-1])
+
+    rgba = rng.integers(0, 65536, (size, size, 4), dtype=np.uint16)
+    samples["rgba16"] = (os.path.join(directory, "rgba16.png"), rgba)
+    cv2.imwrite(samples["rgba16"][0], rgba[..., [2, 1, 0, 3]])
+    return samples
+
+
+def best_of(func, path, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(path)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def max_error(image_tensor, reference):
+    reference = reference if reference.ndim == 3 else reference[..., None]
+    expected = reference[..., :3].astype(np.float64) / 65535.0
+    return float(np.abs(image_tensor[0].numpy().astype(np.float64) - expected).max())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=2048, help="width and height of the test images")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per path, the best one is reported")
+    args = parser.parse_args()
+
+    megapixels = args.size * args.size / 1_000_000
+    with tempfile.TemporaryDirectory() as directory:
+        samples = make_samples(directory, args.size)
+        print(f"{args.size}x{args.size} ({megapixels:.1f} MP), best of {args.repeat}")
+        print(f"{'image':8} {'path':11} {'time':>9} {'MP/s':>8} {'max error':>10}")
+        for name, (path, reference) in samples.items():
+            for label, func in (("legacy", legacy_to_tensors), ("vectorized", vectorized_to_tensors)):
+                seconds, (image_tensor, _mask) = best_of(func, path, args.repeat)
+                print(f"{name:8} {label:11} {seconds * 1000:7.1f}ms {megapixels / seconds:8.1f} "
+                      f"{max_error(image_tensor, reference):10.2e}")
+
+
+if __name__ == "__main__":
+    main()